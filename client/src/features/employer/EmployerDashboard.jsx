@@ -11,7 +11,7 @@ const EmployerDashboard = () => {
     const fetchMyJobs = async () => {
       try {
         const res = await api.get('/employer/my-jobs');
-        setMyJobs(res.data);
+        setMyJobs(res.data.jobs);
       } catch (err) { console.error(err); }
     };
     fetchMyJobs();
@@ -15,7 +15,7 @@ const JobBoard = () => {
     try {
       // Member 4 built these query params in the backend!
       const response = await api.get(`/jobs?keyword=${search.keyword}&location=${search.location}`);
-      setJobs(response.data);
+      setJobs(response.data.jobs);
       setLoading(false);
     } catch (error) {
       console.error("Error fetching jobs:", error);
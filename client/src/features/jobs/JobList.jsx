@@ -17,9 +17,8 @@ const JobDetails = () => {
   useEffect(() => {
     const fetchJob = async () => {
       try {
-        const response = await api.get(`/jobs`); 
-        const selectedJob = response.data.find(j => j.id === parseInt(id));
-        setJob(selectedJob);
+        const response = await api.get(`/jobs/${id}`);
+        setJob(response.data);
       } catch (err) {
         console.error("Error fetching job details", err);
       } finally {
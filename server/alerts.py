@@ -0,0 +1,305 @@
+import logging
+import re
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+import click
+from flask.cli import AppGroup
+from sqlalchemy import select, text, bindparam, exists, and_
+from config import db
+from models import Job, SavedSearch, Notification
+
+logger = logging.getLogger(__name__)
+
+# ==========================================================
+# SAVED SEARCHES AND JOB ALERTS
+# ==========================================================
+# A saved search is a set of /jobs filters: keyword, category, location.
+# When jobs are created (POST /jobs, each bulk import batch), notify() checks
+# them against every saved search. Each job that matches lands in the owner's
+# inbox as a Notification, so seekers stop polling /jobs with the same query.
+#
+# Matching uses an in-memory inverted index. Each search is filed under one
+# key: its longest keyword term, else its category, else its location. A new
+# job looks up only the keys it could satisfy: every prefix of its words, its
+# category, and the substrings of its location. Only the searches found that
+# way are checked in full. Matching follows the /jobs filters: every keyword
+# term must be a prefix of a word in the title, company or description (no
+# stemming), category must be equal, and location is a case-insensitive
+# substring.
+#
+# The index is persisted with the rows (SavedSearch.terms and index_key), so
+# loading it is a single scan with no re-parsing. Each worker keeps its own
+# copy. Searches created elsewhere are picked up before every match, and the
+# whole index is reloaded every ALERT_INDEX_RELOAD_INTERVAL seconds so that
+# deletions do not pile up. A deleted search can never notify anyone, because
+# the notification insert joins saved_searches.
+#
+# After downtime, or if a notify() failed, re-match recent jobs with:
+#
+#     flask alerts catch-up [--hours 24 | --since-id N]
+
+MAX_TERMS = 8
+MAX_TERM_LENGTH = 32
+MATCH_COLUMNS = (Job.id, Job.title, Job.company, Job.description, Job.category, Job.location)
+
+Alert = namedtuple('Alert', ['id', 'seeker_id', 'terms', 'category', 'location'])
+
+
+def parse_terms(keyword):
+    terms = [t[:MAX_TERM_LENGTH] for t in re.findall(r'\w+', (keyword or '').lower())]
+    return list(dict.fromkeys(terms))[:MAX_TERMS]
+
+
+def index_key(terms, category, location):
+    if terms:
+        return 'term:' + max(terms, key=len)
+    if category:
+        return 'category:' + category
+    if location:
+        return 'location:' + location.lower()
+    return None
+
+
+def new_saved_search(seeker_id, keyword=None, category=None, location=None):
+    """A SavedSearch with its index columns filled in, or None when it has no
+    filter at all (it would match every job)."""
+    terms = parse_terms(keyword)
+    key = index_key(terms, category, location)
+    if key is None:
+        return None
+    return SavedSearch(seeker_id=seeker_id, keyword=keyword, category=category, location=location,
+                       terms=' '.join(terms), index_key=key)
+
+
+# ==========================================================
+# INVERTED INDEX
+# ==========================================================
+
+class AlertIndex:
+    def __init__(self, reload_interval=300.0):
+        self.reload_interval = reload_interval
+        self._alerts = {}   # id -> Alert
+        self._keys = {}     # index key -> set of alert ids
+        self._location_lengths = set()  # of location keys, bounds the substrings tried
+        self._lock = threading.Lock()
+        self._high_water = 0
+        self._loaded_at = None
+        self.jobs_matched = 0
+        self.candidates_checked = 0
+        self.notifications = 0
+
+    def _add(self, alert, key):
+        self._alerts[alert.id] = alert
+        self._keys.setdefault(key, set()).add(alert.id)
+        self._high_water = max(self._high_water, alert.id)
+        if key.startswith('location:'):
+            self._location_lengths.add(len(key) - len('location:'))
+
+    def _rows(self, after_id=0):
+        return db.session.execute(
+            select(SavedSearch.id, SavedSearch.seeker_id, SavedSearch.terms, SavedSearch.category,
+                   SavedSearch.location, SavedSearch.index_key)
+            .where(SavedSearch.id > after_id)
+        )
+
+    @staticmethod
+    def _alert(row):
+        return Alert(row.id, row.seeker_id, tuple(row.terms.split()), row.category,
+                     row.location.lower() if row.location else None)
+
+    def load(self):
+        rows = self._rows().all()
+        with self._lock:
+            self._alerts, self._keys, self._location_lengths, self._high_water = {}, {}, set(), 0
+            for row in rows:
+                self._add(self._alert(row), row.index_key)
+            self._loaded_at = time.monotonic()
+
+    def sync(self):
+        """Bring the index up to date: a full load when it is missing or
+        stale, otherwise only the searches created since the last look."""
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.reload_interval:
+            self.load()
+            return
+        rows = self._rows(self._high_water).all()
+        with self._lock:
+            for row in rows:
+                self._add(self._alert(row), row.index_key)
+
+    def add(self, search):
+        with self._lock:
+            self._add(self._alert(search), search.index_key)
+
+    def remove(self, search):
+        with self._lock:
+            self._alerts.pop(search.id, None)
+            ids = self._keys.get(search.index_key)
+            if ids is not None:
+                ids.discard(search.id)
+                if not ids:
+                    del self._keys[search.index_key]
+
+    def match(self, job):
+        """Ids of the saved searches `job` (an object or row with the
+        MATCH_COLUMNS attributes) satisfies."""
+        words = set(re.findall(r'\w+', ' '.join(filter(None, (job.title, job.company, job.description))).lower()))
+        prefixes = {w[:n] for w in words for n in range(1, min(len(w), MAX_TERM_LENGTH) + 1)}
+        location = (job.location or '').lower()
+
+        with self._lock:
+            keys = self._keys
+            candidates = set()
+            for prefix in prefixes:
+                candidates.update(keys.get('term:' + prefix, ()))
+            if job.category:
+                candidates.update(keys.get('category:' + job.category, ()))
+            for length in self._location_lengths:
+                for start in range(len(location) - length + 1):
+                    candidates.update(keys.get('location:' + location[start:start + length], ()))
+            alerts = [self._alerts[i] for i in candidates if i in self._alerts]
+
+        self.jobs_matched += 1
+        self.candidates_checked += len(alerts)
+        return [
+            alert.id for alert in alerts
+            if all(term in prefixes for term in alert.terms)
+            and (alert.category is None or alert.category == job.category)
+            and (alert.location is None or alert.location in location)
+        ]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "alerts": len(self._alerts),
+                "keys": len(self._keys),
+                "jobs_matched": self.jobs_matched,
+                "candidates_checked": self.candidates_checked,
+                "notifications": self.notifications,
+            }
+
+
+index = AlertIndex()
+
+
+# ==========================================================
+# NOTIFICATIONS
+# ==========================================================
+
+# SQLite and PostgreSQL share the syntax. The SELECT drops searches deleted
+# since the index was loaded.
+INSERT_NOTIFICATION = text(
+    "INSERT INTO notifications (seeker_id, saved_search_id, job_id, created_at) "
+    "SELECT seeker_id, id, :job_id, :created_at FROM saved_searches WHERE id = :saved_search_id "
+    "ON CONFLICT (saved_search_id, job_id) DO NOTHING"
+).bindparams(bindparam('created_at', type_=db.DateTime))
+
+
+def _write(pairs):
+    now = datetime.utcnow()
+    rows = [{"saved_search_id": search_id, "job_id": job_id, "created_at": now} for search_id, job_id in pairs]
+    connection = db.session.connection()
+    if connection.dialect.name in ('sqlite', 'postgresql'):
+        connection.execute(INSERT_NOTIFICATION, rows)
+        return
+    for row in rows:
+        if db.session.scalar(select(exists().where(and_(
+                Notification.saved_search_id == row['saved_search_id'], Notification.job_id == row['job_id'])))):
+            continue
+        seeker_id = db.session.scalar(select(SavedSearch.seeker_id).where(SavedSearch.id == row['saved_search_id']))
+        if seeker_id is not None:
+            db.session.add(Notification(seeker_id=seeker_id, **row))
+
+
+def match_and_store(jobs):
+    """Match `jobs` against the index and insert the notifications (in the
+    caller's transaction). Returns the number of (search, job) matches."""
+    pairs = [(search_id, job.id) for job in jobs for search_id in index.match(job)]
+    if pairs:
+        _write(pairs)
+    index.notifications += len(pairs)
+    return len(pairs)
+
+
+def notify(jobs):
+    """Create notifications for newly committed `jobs`. Never raises: the jobs
+    are already saved, and `flask alerts catch-up` repairs a miss."""
+    try:
+        index.sync()
+        match_and_store(jobs)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        logger.exception("Matching %d new job(s) against saved searches failed", len(jobs))
+
+
+def notify_ids(job_ids):
+    """notify() for jobs written with Core statements (bulk import)."""
+    if not job_ids:
+        return
+    try:
+        jobs = db.session.execute(select(*MATCH_COLUMNS).where(Job.id.in_(job_ids))).all()
+    except Exception:
+        db.session.rollback()
+        logger.exception("Loading %d imported job(s) for alert matching failed", len(job_ids))
+        return
+    notify(jobs)
+
+
+def catch_up(since_id=None, since=None, batch_size=1000):
+    """Re-match jobs with id > since_id, or created after `since`, in batches.
+    Notifications that already exist are left alone. Returns (jobs, matches)."""
+    index.load()
+    query = select(*MATCH_COLUMNS).order_by(Job.id).limit(batch_size)
+    if since_id is None:
+        query = query.where(Job.created_at >= since)
+    last_id = since_id or 0
+    jobs_seen = matches = 0
+    while True:
+        batch = db.session.execute(query.where(Job.id > last_id)).all()
+        if not batch:
+            break
+        matches += match_and_store(batch)
+        db.session.commit()
+        jobs_seen += len(batch)
+        last_id = batch[-1].id
+    return jobs_seen, matches
+
+
+# ==========================================================
+# CLI: flask alerts catch-up / reindex
+# ==========================================================
+alerts_cli = AppGroup('alerts', help='Saved searches and job alert notifications.')
+
+
+@alerts_cli.command('catch-up')
+@click.option('--hours', type=float, default=24.0, show_default=True, help='Re-match jobs created this recently.')
+@click.option('--since-id', type=int, default=None, help='Re-match jobs with a greater id instead.')
+@click.option('--batch-size', type=int, default=1000, show_default=True)
+def catch_up_command(hours, since_id, batch_size):
+    """Match recent jobs against all saved searches, e.g. after downtime."""
+    started = time.perf_counter()
+    since = datetime.utcnow() - timedelta(hours=hours)
+    jobs_seen, matches = catch_up(since_id, since, batch_size)
+    click.echo(f"Matched {jobs_seen:,} jobs against {index.stats()['alerts']:,} saved searches: "
+               f"{matches:,} match(es) in {time.perf_counter() - started:.2f}s.")
+
+
+@alerts_cli.command('reindex')
+def reindex_command():
+    """Recompute the stored index columns of every saved search."""
+    updated = 0
+    for search in SavedSearch.query.all():
+        terms = parse_terms(search.keyword)
+        key = index_key(terms, search.category, search.location)
+        if key is not None and (search.terms, search.index_key) != (' '.join(terms), key):
+            search.terms, search.index_key = ' '.join(terms), key
+            updated += 1
+    db.session.commit()
+    click.echo(f"Reindexed {updated} saved search(es).")
+
+
+def init_app(app):
+    index.reload_interval = app.config['ALERT_INDEX_RELOAD_INTERVAL']
+    app.cli.add_command(alerts_cli)
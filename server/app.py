@@ -1,21 +1,127 @@
-from flask import Flask, request, jsonify, make_response
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from flask_cors import CORS 
-from config import app, db, bcrypt
-from models import User, Job, Application
+from flask import Flask, Blueprint, current_app, request, jsonify, make_response, url_for
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.orm import configure_mappers
+import config
+from config import db
+from models import User, UserRole, Job, Application, ApplicationStatusEvent, Resume, SavedSearch, Notification
+from pagination import paginate, parse_limit, approximate_total, CursorError
+from serializers import serializer_for, serialize, parse_fields, json_response, UnknownFieldError
 from datetime import datetime
+import logging
 import os
+import time
+import search
+import sql_guard
+from sql_guard import query_budget
+from database import read_replica
+from loaders import JOB_LIST, JOB_DETAIL, job_load_options
+import response_cache
+import query_plans
+import hashing
+import bulk_import
+import metrics
+import application_counts
+import applications
+import contact_queue
+import cv_storage
+import cv_extraction
+import recommendations
+import facets
+import alerts
+import geo
+import auth
+from auth import role_required
+from response_cache import cached_response, LISTING_TAG, job_tag
 
 # ==========================================================
-# 0. GLOBAL CONFIGURATION
+# 0. APP FACTORY
 # ==========================================================
-CORS(app, supports_credentials=True, origins=["http://localhost:5173"])
+# Every route lives on the `api` blueprint; create_app() builds a configured
+# app around it. Production runs wsgi.py under gunicorn: the app is built and
+# warmed once in the master, then forked (see gunicorn.conf.py).
+
+logger = logging.getLogger(__name__)
+api = Blueprint('api', __name__)
+
+# Seconds spent in each startup phase of this process, exported as gauges.
+startup_timings = {}
+
+
+def create_app(overrides=None):
+    started = time.perf_counter()
+    app = Flask(__name__)
+    config.configure(app)
+    app.config.update(overrides or {})
+    config.init_extensions(app)
+
+    search.init_app(app)
+    sql_guard.init_app(app)
+    response_cache.init_app(app)
+    facets.init_app(app)
+    query_plans.init_app(app)
+    hashing.init_app(app)
+    metrics.init_app(app)
+    application_counts.init_app(app)
+    contact_queue.init_app(app)
+    cv_storage.init_app(app)
+    cv_extraction.init_app(app)
+    recommendations.init_app(app)
+    alerts.init_app(app)
+    geo.init_app(app)
+    auth.init_app(app)
+    metrics.register_gauges('response_cache', response_cache.cache.stats)
+    metrics.register_gauges('facet_cache', facets.cache.stats)
+    metrics.register_gauges('contact_queue', contact_queue.writer.stats)
+    metrics.register_gauges('cv_extraction', cv_extraction.pipeline.stats)
+    metrics.register_gauges('recommendations', recommendations.recommender.stats)
+    metrics.register_gauges('user_cache', auth.users.stats)
+    metrics.register_gauges('alerts', alerts.index.stats)
+    metrics.register_gauges('token_revocations', auth.revocations.stats)
+    metrics.register_gauges('gazetteer', geo.gazetteer.stats)
+    metrics.register_gauges('startup_seconds', lambda: startup_timings)
+
+    app.register_blueprint(api)
+    startup_timings['create_app'] = time.perf_counter() - started
+    return app
+
+
+def warm_up(app):
+    """One-time costs paid up front instead of by the first requests: mapper
+    configuration, schema detection, the gazetteer, the SQL compiled for a
+    /jobs page and its loaders, facet counts and the alert index. Run before
+    forking, workers inherit all of it. Doesn't hash passwords or start
+    threads, neither of which survives a fork."""
+    def timed(name, fn):
+        started = time.perf_counter()
+        try:
+            fn()
+        except Exception:
+            logger.exception("Warm-up step %s failed", name)
+        startup_timings[f'warm_up_{name}'] = time.perf_counter() - started
+
+    def jobs_page():
+        query, _ = build_jobs_query({}, listing=True)
+        rows, _ = paginate(query.options(*job_load_options(JOB_LIST)), JOB_PAGE_KEYS, job_page_key, 1, None)
+        [serializer_for(Job)(job) for job in rows]
+
+    started = time.perf_counter()
+    with app.app_context():
+        timed('mappers', configure_mappers)
+        timed('search_backend', search.search_backend)
+        timed('gazetteer', lambda: geo.gazetteer.names)
+        timed('jobs_page', jobs_page)
+        timed('facets', facets.unfiltered)
+        timed('alert_index', alerts.index.load)
+        timed('recommendations', recommendations.recommender.warm_up)
+        db.session.remove()
+    startup_timings['warm_up'] = time.perf_counter() - started
 
 # ==========================================================
 # 1. AUTHENTICATION
 # ==========================================================
 
-@app.route('/register', methods=['POST'])
+@api.route('/register', methods=['POST'])
+@query_budget(2)
 def register():
     data = request.get_json()
     if not data or not data.get('email') or not data.get('password'):
@@ -24,7 +130,7 @@ def register():
     if User.query.filter_by(email=data.get('email')).first():
         return jsonify({"msg": "User already exists"}), 400
 
-    hashed_pw = bcrypt.generate_password_hash(data['password']).decode('utf-8')
+    hashed_pw = hashing.hash_password(data['password'])
     new_user = User(
         username=data['username'],
         email=data['email'],
@@ -35,12 +141,14 @@ def register():
     db.session.commit()
     return jsonify({"msg": "User registered successfully"}), 201
 
-@app.route('/login', methods=['POST'])
+@api.route('/login', methods=['POST'])
+@query_budget(3)
 def login():
     data = request.get_json()
     user = User.query.filter_by(email=data.get('email')).first()
-    if user and bcrypt.check_password_hash(user.password_hash, data.get('password')):
-        access_token = create_access_token(identity=str(user.id))
+    if user and hashing.verify_password(user, data.get('password')):
+        db.session.commit()  # persists a rehash after a BCRYPT_LOG_ROUNDS change
+        access_token = auth.create_token(user)
         return jsonify({
             "token": access_token,
             "role": user.role,
@@ -49,30 +157,95 @@ def login():
         }), 200
     return jsonify({"msg": "Invalid email or password"}), 401
 
+@api.route('/logout', methods=['POST'])
+@jwt_required()
+@query_budget(2)
+def logout():
+    # Signs the user out everywhere: every token issued so far stops working.
+    user = db.session.get(User, int(get_jwt_identity()))
+    if user:
+        auth.revoke_tokens(user)
+        db.session.commit()
+    return jsonify({"msg": "Logged out"}), 200
+
 # ==========================================================
 # 2. JOB LOGIC
 # ==========================================================
 
-@app.route('/jobs', methods=['GET', 'POST'])
+# Newest first; `id` breaks ties so the cursor is unique.
+JOB_PAGE_KEYS = [(Job.created_at, True), (Job.id, True)]
+
+def job_page_key(job):
+    return (job.created_at, job.id)
+
+def build_jobs_query(args, listing=False):
+    keyword = args.get('keyword')
+    category = args.get('category')
+    location = args.get('location')
+    query = Job.query
+    rank = None
+
+    if keyword:
+        query, rank = search.keyword_filter(query, keyword)
+    if category:
+        query = query.filter(Job.category == category)
+    if location:
+        query = query.filter(Job.location.ilike(f'%{location}%'))
+    near = geo.parse_radius(args, current_app.config['MAX_RADIUS_KM'])
+    if near:
+        # A newest-first page of a crowded circle comes quicker off the
+        # created_at index than from sorting the whole bounding box.
+        walk = listing and not (keyword or category or location) and geo.is_dense(*near)
+        query = query.filter(geo.within_radius(*near, use_index=not walk))
+    return query, rank
+
+def job_page_response(query, args, rank=None):
+    try:
+        fields = parse_fields(Job, args.get('fields'))
+    except UnknownFieldError as e:
+        return jsonify({"msg": str(e)}), 400
+    page_query = query.options(*job_load_options(JOB_LIST, fields))
+
+    # With a keyword, results come back best match first unless ?sort=newest.
+    if rank is not None and args.get('sort', 'relevance') == 'relevance':
+        page_query = page_query.add_columns(rank.label('rank'))
+        keys = [(rank, False), (Job.id, True)]
+        key_of = lambda row: (row.rank, row.Job.id)
+        to_job = lambda row: row.Job
+    else:
+        keys, key_of, to_job = JOB_PAGE_KEYS, job_page_key, lambda job: job
+
+    try:
+        limit = parse_limit(args)
+        rows, next_cursor = paginate(page_query, keys, key_of, limit, args.get('cursor'))
+    except CursorError as e:
+        return jsonify({"msg": str(e)}), 400
+
+    serialize_job = serializer_for(Job, fields)
+    body = {"jobs": [serialize_job(to_job(row)) for row in rows], "next_cursor": next_cursor, "limit": limit}
+    if args.get('include_total', '').lower() in ('1', 'true', 'yes'):
+        body.update(approximate_total(query))
+    return json_response(body)
+
+@api.route('/jobs', methods=['GET', 'POST'])
 @jwt_required(optional=True)
+@query_budget(5, POST=8)
+@cached_response(lambda: [LISTING_TAG])
+@read_replica
 def handle_jobs():
     if request.method == 'GET':
-        keyword = request.args.get('keyword')
-        category = request.args.get('category')
-        location = request.args.get('location')
-        query = Job.query
-        
-        if keyword:
-            query = query.filter(Job.title.ilike(f'%{keyword}%') | Job.company.ilike(f'%{keyword}%'))
-        if category:
-            query = query.filter(Job.category == category)
-        if location:
-            query = query.filter(Job.location.ilike(f'%{location}%'))
-            
-        return jsonify([j.to_dict() for j in query.all()]), 200
+        try:
+            query, rank = build_jobs_query(request.args, listing=True)
+        except (geo.RadiusError, search.KeywordError) as e:
+            return jsonify({"msg": str(e)}), 400
+        return job_page_response(query, request.args, rank)
 
     if request.method == 'POST':
         current_user_id = get_jwt_identity()
+        if current_user_id is None:
+            return jsonify({"msg": "Missing Authorization Header"}), 401
+        if auth.current_role() != UserRole.EMPLOYER:
+            return jsonify({"msg": "Only employers can post jobs"}), 403
         data = request.get_json()
         new_job = Job(
             title=data['title'],
@@ -85,83 +258,438 @@ def handle_jobs():
         )
         db.session.add(new_job)
         db.session.commit()
-        return jsonify(new_job.to_dict()), 201
+        body = serialize(new_job)
+        alerts.notify([new_job])
+        return json_response(body, 201)
+
+@api.route('/jobs/facets', methods=['GET'])
+@query_budget(2)
+@cached_response(lambda: [LISTING_TAG])
+def get_job_facets():
+    # Counts per category, location, job_type and salary bucket for the jobs
+    # matching the /jobs filters; without filters they come from memory.
+    if not any(request.args.get(arg) for arg in ('keyword', 'category', 'location', 'lat', 'lon', 'radius_km')):
+        return json_response(facets.unfiltered())
+    try:
+        query, _ = build_jobs_query(request.args)
+    except (geo.RadiusError, search.KeywordError) as e:
+        return jsonify({"msg": str(e)}), 400
+    return json_response(facets.to_dict(*facets.count(query)))
+
+@api.route('/jobs/bulk', methods=['POST'])
+@jwt_required()
+@role_required(UserRole.EMPLOYER, msg="Only employers can import jobs")
+def bulk_import_jobs():
+    # Body is NDJSON, one job per line; read as a stream, never buffered whole.
+    current_user_id = int(get_jwt_identity())
+
+    try:
+        batch_size = int(request.args.get('batch_size', current_app.config['BULK_IMPORT_BATCH_SIZE']))
+    except ValueError:
+        return jsonify({"msg": "batch_size must be an integer"}), 400
+    batch_size = max(1, min(batch_size, 10000))
+
+    report = bulk_import.import_jobs(request.stream, current_user_id, batch_size)
+    return jsonify(report.to_dict()), 200
 
-@app.route('/jobs/<int:id>', methods=['GET'])
+@api.route('/jobs/<int:id>', methods=['GET'])
+@query_budget(2)
+@cached_response(lambda id: [job_tag(id)])
+@read_replica
 def get_job_by_id(id):
-    job = Job.query.get(id)
+    try:
+        fields = parse_fields(Job, request.args.get('fields'))
+    except UnknownFieldError as e:
+        return jsonify({"msg": str(e)}), 400
+
+    job = db.session.get(Job, id, options=job_load_options(JOB_DETAIL, fields))
     if not job:
         return jsonify({"msg": "Job not found"}), 404
-    return jsonify(job.to_dict()), 200
+    return json_response(serialize(job, fields))
 
 # ==========================================================
 # 3. APPLICATIONS & DASHBOARDS
 # ==========================================================
 
-@app.route('/jobs/<int:id>/apply', methods=['POST'])
+@api.route('/jobs/<int:id>/apply', methods=['POST'])
 @jwt_required()
+@role_required(UserRole.JOB_SEEKER, msg="Only seekers can apply")
+@query_budget(3)
 def apply_to_job(id):
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    
-    if user.role != 'job_seeker':
-        return jsonify({"msg": "Only seekers can apply"}), 403
-        
-    existing = Application.query.filter_by(job_id=id, seeker_id=current_user_id).first()
-    if existing:
-        return jsonify({"msg": "Already applied to this job"}), 400
+    current_user_id = int(get_jwt_identity())
 
-    new_app = Application(job_id=id, seeker_id=current_user_id, status="Pending")
-    db.session.add(new_app)
-    db.session.commit()
+    # Attach the seeker's most recent uploaded CV, if any.
+    resume_id = cv_storage.latest_resume_id(current_user_id)
+    resume_url = url_for('.download_cv', resume_id=resume_id) if resume_id else None
+    result = applications.apply(id, current_user_id, resume_url)
+    if result == applications.JOB_NOT_FOUND:
+        return jsonify({"msg": "Job not found"}), 404
+    if result == applications.ALREADY_APPLIED:
+        return jsonify({"msg": "Already applied to this job"}), 400
     return jsonify({"msg": "Application submitted successfully"}), 201
 
-@app.route('/employer/my-jobs', methods=['GET'])
+@api.route('/employer/my-jobs', methods=['GET'])
 @jwt_required()
+@query_budget(4)
+@read_replica
 def get_employer_jobs():
     current_user_id = get_jwt_identity()
-    jobs = Job.query.filter_by(employer_id=current_user_id).all()
-    return jsonify([j.to_dict() for j in jobs]), 200
+    query = Job.query.filter_by(employer_id=current_user_id)
+    return job_page_response(query, request.args)
+
+@api.route('/employer/my-jobs/summary', methods=['GET'])
+@jwt_required()
+@query_budget(3)
+def get_employer_jobs_summary():
+    # Applicant numbers come from the per-job counters; no Application rows
+    # are loaded.
+    current_user_id = int(get_jwt_identity())
+    query = db.session.query(Job.id, Job.title, Job.category, Job.location, Job.created_at) \
+        .filter(Job.employer_id == current_user_id)
+    try:
+        limit = parse_limit(request.args)
+        rows, next_cursor = paginate(query, JOB_PAGE_KEYS, job_page_key, limit, request.args.get('cursor'))
+    except CursorError as e:
+        return jsonify({"msg": str(e)}), 400
+
+    counts = application_counts.counts_for_jobs([row.id for row in rows])
+    totals = application_counts.totals_for_employer(current_user_id)
+    jobs = [{
+        "id": row.id,
+        "title": row.title,
+        "category": row.category,
+        "location": row.location,
+        "created_at": row.created_at.strftime(Job.datetime_format) if row.created_at else None,
+        "applications": counts[row.id],
+        "total_applications": sum(counts[row.id].values()),
+    } for row in rows]
+    return json_response({
+        "jobs": jobs,
+        "totals": totals,
+        "total_applications": sum(totals.values()),
+        "next_cursor": next_cursor,
+        "limit": limit,
+    })
+
+@api.route('/employer/applications', methods=['PATCH'])
+@jwt_required()
+@role_required(UserRole.EMPLOYER, msg="Only employers can update applications")
+@query_budget(5)
+def update_application_statuses():
+    # Body: {"ids": [...], "status": "Interviewing"}; all or nothing.
+    data = request.get_json(silent=True) or {}
+    ids, status = data.get('ids'), data.get('status')
+    if not (isinstance(ids, list) and ids and all(isinstance(i, int) and not isinstance(i, bool) for i in ids)):
+        return jsonify({"msg": "ids must be a non-empty list of integers"}), 400
+    if len(ids) > current_app.config['MAX_STATUS_UPDATE_BATCH']:
+        return jsonify({"msg": f"At most {current_app.config['MAX_STATUS_UPDATE_BATCH']} applications per request"}), 400
+    if status not in application_counts.STATUSES:
+        return jsonify({"msg": f"status must be one of: {', '.join(application_counts.STATUSES)}"}), 400
+
+    result = applications.update_statuses(int(get_jwt_identity()), ids, status)
+    if result.missing:
+        return jsonify({"msg": "Applications not found", "missing": result.missing[:100]}), 404
+    return jsonify({"updated": result.updated, "unchanged": result.unchanged}), 200
+
+def status_events_response(query):
+    try:
+        limit = parse_limit(request.args)
+        rows, next_cursor = paginate(query, [(ApplicationStatusEvent.id, True)], lambda row: (row.id,), limit,
+                                     request.args.get('cursor'))
+    except CursorError as e:
+        return jsonify({"msg": str(e)}), 400
+    return json_response({
+        "events": [{
+            "id": row.id,
+            "application_id": row.application_id,
+            "job_id": row.job_id,
+            "seeker_id": row.seeker_id,
+            "from_status": row.from_status,
+            "to_status": row.to_status,
+            "changed_by": row.changed_by,
+            "created_at": row.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+        } for row in rows],
+        "next_cursor": next_cursor,
+        "limit": limit,
+    })
+
+EVENT_COLUMNS = (ApplicationStatusEvent.id, ApplicationStatusEvent.application_id, ApplicationStatusEvent.job_id,
+                 ApplicationStatusEvent.seeker_id, ApplicationStatusEvent.from_status, ApplicationStatusEvent.to_status,
+                 ApplicationStatusEvent.changed_by, ApplicationStatusEvent.created_at)
+
+@api.route('/employer/application-events', methods=['GET'])
+@jwt_required()
+@role_required(UserRole.EMPLOYER, msg="Only employers can view application history")
+@query_budget(2)
+def get_employer_application_events():
+    # Status history of the employer's applications, newest first, for one
+    # job (?job_id=) and/or one applicant (?seeker_id=).
+    current_user_id = int(get_jwt_identity())
+    try:
+        job_id = int(request.args['job_id']) if request.args.get('job_id') else None
+        seeker_id = int(request.args['seeker_id']) if request.args.get('seeker_id') else None
+    except ValueError:
+        return jsonify({"msg": "job_id and seeker_id must be integers"}), 400
+    if job_id is None and seeker_id is None:
+        return jsonify({"msg": "Give job_id or seeker_id"}), 400
+
+    query = db.session.query(*EVENT_COLUMNS)
+    if job_id is not None:
+        if db.session.scalar(db.select(Job.employer_id).where(Job.id == job_id)) != current_user_id:
+            return jsonify({"msg": "Job not found"}), 404
+        query = query.filter(ApplicationStatusEvent.job_id == job_id)
+    else:
+        query = query.filter(ApplicationStatusEvent.job_id.in_(
+            db.select(Job.id).where(Job.employer_id == current_user_id)))
+    if seeker_id is not None:
+        query = query.filter(ApplicationStatusEvent.seeker_id == seeker_id)
+    return status_events_response(query)
+
+@api.route('/seeker/application-events', methods=['GET'])
+@jwt_required()
+@role_required(UserRole.JOB_SEEKER, msg="Only seekers have application history")
+@query_budget(1)
+def get_seeker_application_events():
+    # The seeker's own status history, newest first; ?job_id= narrows it.
+    query = db.session.query(*EVENT_COLUMNS).filter(ApplicationStatusEvent.seeker_id == int(get_jwt_identity()))
+    if request.args.get('job_id'):
+        try:
+            query = query.filter(ApplicationStatusEvent.job_id == int(request.args['job_id']))
+        except ValueError:
+            return jsonify({"msg": "job_id must be an integer"}), 400
+    return status_events_response(query)
 
 # ==========================================================
 # 4. NEW: CONTACT US LOGIC
 # ==========================================================
 
-@app.route('/api/contact', methods=['POST'])
+@api.route('/api/contact', methods=['POST'])
 def handle_contact():
-    data = request.get_json()
-    
-    name = data.get('name')
-    email = data.get('email')
-    message = data.get('message')
+    # Queued for the background writer; this never waits on the database.
+    fields, error = contact_queue.validate(request.get_json(silent=True))
+    if error:
+        return jsonify({"msg": error}), 400
 
-    if not name or not email or not message:
-        return jsonify({"msg": "All fields are required"}), 400
-
-    # Logic: Print to terminal for now
-    print("\n--- NEW CONTACT MESSAGE ---")
-    print(f"From: {name} ({email})")
-    print(f"Message: {message}")
-    print("---------------------------\n")
-
-    # In a real app, you would save to a 'Messages' table:
-    # new_msg = ContactMessage(name=name, email=email, message=message)
-    # db.session.add(new_msg)
-    # db.session.commit()
-
-    return jsonify({"msg": "Success! Your message was received."}), 200
+    contact_queue.writer.submit(**fields)
+    return jsonify({"msg": "Success! Your message was received."}), 202
 
 # ==========================================================
 # 5. MISC
 # ==========================================================
 
-@app.route('/seeker/upload-cv', methods=['POST'])
+@api.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify(response_cache.cache.stats()), 200
+
+@api.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    return current_app.response_class(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@api.route('/seeker/upload-cv', methods=['POST'])
 @jwt_required()
+@role_required(UserRole.JOB_SEEKER, msg="Only seekers can upload a CV")
+@query_budget(3)
 def upload_cv():
+    # Checked before request.files is touched, i.e. before the body is read.
+    cv_storage.check_content_length()
+    current_user_id = int(get_jwt_identity())
+
     if 'cv' not in request.files:
         return jsonify({"msg": "No file part"}), 400
     file = request.files['cv']
-    return jsonify({"msg": f"File {file.filename} received and processed"}), 200
+    if not file.filename or not cv_storage.allowed_file(file.filename):
+        return jsonify({"msg": "Unsupported file type"}), 400
+
+    resume = cv_storage.store(current_user_id, file)
+    cv_extraction.register(resume.sha256)
+    db.session.commit()
+    if current_app.config['CV_EXTRACTION_ENABLED']:
+        cv_extraction.pipeline.submit(resume.sha256)
+    return jsonify({
+        "msg": f"File {file.filename} received and processed",
+        "resume_id": resume.id,
+        "resume_url": url_for('.download_cv', resume_id=resume.id),
+        "sha256": resume.sha256,
+        "size": resume.size,
+    }), 201
+
+@api.route('/seeker/recommendations', methods=['GET'])
+@jwt_required()
+@role_required(UserRole.JOB_SEEKER, msg="Only seekers get recommendations")
+@query_budget(7)
+def get_recommendations():
+    # Top jobs for the seeker's application history and CV, best first.
+    current_user_id = int(get_jwt_identity())
+    try:
+        fields = parse_fields(Job, request.args.get('fields'))
+        limit = parse_limit(request.args)
+    except (UnknownFieldError, CursorError) as e:
+        return jsonify({"msg": str(e)}), 400
+
+    scored, basis = recommendations.recommender.recommend(current_user_id, limit)
+    jobs = {}
+    if scored:
+        jobs = {job.id: job for job in Job.query.options(*job_load_options(JOB_LIST, fields))
+                .filter(Job.id.in_([job_id for job_id, _ in scored]))}
+    serialize_job = serializer_for(Job, fields)
+    # Jobs deleted since the model was built are simply skipped.
+    results = [dict(serialize_job(jobs[job_id]), score=round(score, 4))
+               for job_id, score in scored if job_id in jobs][:limit]
+    return json_response({"jobs": results, "based_on": basis, "limit": limit})
+
+@api.route('/employer/candidates/search', methods=['GET'])
+@jwt_required()
+@role_required(UserRole.EMPLOYER, msg="Only employers can search candidates")
+@query_budget(4)
+def search_candidates():
+    # Applicants to the employer's jobs whose CV text matches ?q, best first.
+    current_user_id = int(get_jwt_identity())
+
+    candidates = cv_extraction.candidate_query(current_user_id, request.args.get('q'))
+    if candidates is None:
+        return jsonify({"msg": "q is required"}), 400
+    query = db.session.query(candidates.c.seeker_id, candidates.c.rank, candidates.c.resume_id)
+    keys = [(candidates.c.rank, False), (candidates.c.seeker_id, False)]
+    try:
+        limit = parse_limit(request.args)
+        rows, next_cursor = paginate(query, keys, lambda row: (row.rank, row.seeker_id), limit, request.args.get('cursor'))
+    except CursorError as e:
+        return jsonify({"msg": str(e)}), 400
+
+    seeker_ids = [row.seeker_id for row in rows]
+    seekers = auth.users.get_many(seeker_ids)
+    applied = {}
+    if seeker_ids:
+        for seeker_id, job_id in db.session.query(Application.seeker_id, Application.job_id) \
+                .join(Job, Job.id == Application.job_id) \
+                .filter(Job.employer_id == current_user_id, Application.seeker_id.in_(seeker_ids)):
+            applied.setdefault(seeker_id, []).append(job_id)
+
+    return json_response({
+        "candidates": [{
+            "seeker_id": row.seeker_id,
+            "username": seekers[row.seeker_id].username,
+            "full_name": seekers[row.seeker_id].full_name,
+            "email": seekers[row.seeker_id].email,
+            "resume_url": url_for('.download_cv', resume_id=row.resume_id),
+            "applied_job_ids": sorted(applied.get(row.seeker_id, [])),
+        } for row in rows],
+        "next_cursor": next_cursor,
+        "limit": limit,
+    })
+
+@api.route('/cvs/<int:resume_id>', methods=['GET'])
+@jwt_required()
+@query_budget(2)
+def download_cv(resume_id):
+    resume = db.session.get(Resume, resume_id)
+    if not resume or not cv_storage.can_view(int(get_jwt_identity()), resume):
+        return jsonify({"msg": "CV not found"}), 404
+    return cv_storage.send_resume(resume)
+
+# ==========================================================
+# 6. SAVED SEARCHES & ALERTS
+# ==========================================================
+
+ALERT_FILTERS = ('keyword', 'category', 'location')
+
+@api.route('/seeker/saved-searches', methods=['GET', 'POST'])
+@jwt_required()
+@role_required(UserRole.JOB_SEEKER, msg="Only seekers can save searches")
+@query_budget(1, POST=3)
+def handle_saved_searches():
+    current_user_id = int(get_jwt_identity())
+    serialize_search = serializer_for(SavedSearch)
+    if request.method == 'GET':
+        searches = SavedSearch.query.filter_by(seeker_id=current_user_id).order_by(SavedSearch.id)
+        return json_response({"saved_searches": [serialize_search(s) for s in searches]})
+
+    data = request.get_json(silent=True) or {}
+    filters = {}
+    for key in ALERT_FILTERS:
+        value = data.get(key)
+        if value is not None and not isinstance(value, str):
+            return jsonify({"msg": f"'{key}' must be a string"}), 400
+        if value and value.strip():
+            filters[key] = value.strip()[:200]
+    search = alerts.new_saved_search(current_user_id, **filters)
+    if search is None:
+        return jsonify({"msg": "Give at least one of keyword, category or location"}), 400
+    saved = db.session.scalar(db.select(db.func.count()).where(SavedSearch.seeker_id == current_user_id))
+    if saved >= current_app.config['MAX_SAVED_SEARCHES']:
+        return jsonify({"msg": f"You can save at most {current_app.config['MAX_SAVED_SEARCHES']} searches"}), 400
+    db.session.add(search)
+    db.session.commit()
+    alerts.index.add(search)
+    return json_response(serialize_search(search), 201)
+
+@api.route('/seeker/saved-searches/<int:search_id>', methods=['DELETE'])
+@jwt_required()
+@query_budget(3)
+def delete_saved_search(search_id):
+    search = db.session.get(SavedSearch, search_id)
+    if not search or search.seeker_id != int(get_jwt_identity()):
+        return jsonify({"msg": "Saved search not found"}), 404
+    Notification.query.filter_by(saved_search_id=search.id).delete(synchronize_session=False)
+    db.session.delete(search)
+    db.session.commit()
+    alerts.index.remove(search)
+    return jsonify({"msg": "Saved search deleted"}), 200
+
+@api.route('/seeker/notifications', methods=['GET'])
+@jwt_required()
+@query_budget(4)
+def get_notifications():
+    # Newest first; ?unread=true leaves out the ones already marked read.
+    current_user_id = int(get_jwt_identity())
+    try:
+        fields = parse_fields(Job, request.args.get('fields'))
+        limit = parse_limit(request.args)
+    except (UnknownFieldError, CursorError) as e:
+        return jsonify({"msg": str(e)}), 400
+    query = db.session.query(Notification.id, Notification.job_id, Notification.saved_search_id,
+                             Notification.created_at, Notification.read_at) \
+        .filter(Notification.seeker_id == current_user_id)
+    if request.args.get('unread', '').lower() in ('1', 'true', 'yes'):
+        query = query.filter(Notification.read_at.is_(None))
+    try:
+        rows, next_cursor = paginate(query, [(Notification.id, True)], lambda row: (row.id,), limit,
+                                     request.args.get('cursor'))
+    except CursorError as e:
+        return jsonify({"msg": str(e)}), 400
+
+    jobs = {}
+    if rows:
+        jobs = {job.id: job for job in Job.query.options(*job_load_options(JOB_LIST, fields))
+                .filter(Job.id.in_({row.job_id for row in rows}))}
+    serialize_job = serializer_for(Job, fields)
+    return json_response({
+        "notifications": [{
+            "id": row.id,
+            "saved_search_id": row.saved_search_id,
+            "created_at": row.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+            "read": row.read_at is not None,
+            "job": serialize_job(jobs[row.job_id]),
+        } for row in rows if row.job_id in jobs],
+        "next_cursor": next_cursor,
+        "limit": limit,
+    })
+
+@api.route('/seeker/notifications/read', methods=['POST'])
+@jwt_required()
+@query_budget(1)
+def mark_notifications_read():
+    # Body: {"ids": [...]} for those notifications, or {} for all of them.
+    ids = (request.get_json(silent=True) or {}).get('ids')
+    if ids is not None and not (isinstance(ids, list) and all(isinstance(i, int) for i in ids)):
+        return jsonify({"msg": "ids must be a list of integers"}), 400
+    query = Notification.query.filter(Notification.seeker_id == int(get_jwt_identity()),
+                                      Notification.read_at.is_(None))
+    if ids is not None:
+        query = query.filter(Notification.id.in_(ids))
+    updated = query.update({Notification.read_at: datetime.utcnow()}, synchronize_session=False)
+    db.session.commit()
+    return jsonify({"updated": updated}), 200
 
 if __name__ == '__main__':
-    app.run(port=5000, debug=True)
\ No newline at end of file
+    create_app().run(port=5000, debug=True)
\ No newline at end of file
@@ -0,0 +1,205 @@
+from collections import Counter
+import click
+from flask.cli import AppGroup
+from sqlalchemy import event, inspect, select, update, insert, delete, func, text
+from sqlalchemy.orm import Session
+from config import db
+from models import Job, Application, JobApplicationCount, ApplicationStatus
+
+# ==========================================================
+# PER-JOB APPLICATION COUNTERS
+# ==========================================================
+# job_application_counts holds one row per (job, status). Every ORM flush that
+# adds, deletes or re-statuses an Application applies the matching +1/-1
+# deltas with an upsert on the same connection, so the counters commit or
+# roll back together with the change itself. Core statements that write
+# `applications` directly must call adjust() (or refresh()) themselves.
+#
+# If the counters ever drift (manual SQL, a restore), repair them with:
+#
+#     flask applications reconcile-counts [--dry-run]
+
+STATUSES = (
+    ApplicationStatus.PENDING,
+    ApplicationStatus.INTERVIEWING,
+    ApplicationStatus.ACCEPTED,
+    ApplicationStatus.REJECTED,
+)
+
+counts_table = JobApplicationCount.__table__
+
+
+# Written out because it runs on every apply: SQLAlchemy does not cache the
+# compiled form of the dialect insert() constructs. SQLite and PostgreSQL
+# share the syntax.
+UPSERT = text(
+    "INSERT INTO job_application_counts (job_id, status, count) VALUES (:job_id, :status, :count) "
+    "ON CONFLICT (job_id, status) DO UPDATE SET count = job_application_counts.count + excluded.count"
+)
+
+
+def _upsert_statement(dialect):
+    return UPSERT if dialect in ('sqlite', 'postgresql') else None
+
+
+def adjust(connection, deltas):
+    """Add {(job_id, status): delta} to the counters, inside the caller's
+    transaction on `connection`."""
+    rows = [
+        {"job_id": job_id, "status": status, "count": delta}
+        for (job_id, status), delta in deltas.items() if delta and status is not None
+    ]
+    if not rows:
+        return
+    upsert = _upsert_statement(connection.dialect.name)
+    if upsert is not None:
+        connection.execute(upsert, rows)
+        return
+    for row in rows:
+        result = connection.execute(
+            update(counts_table)
+            .where(counts_table.c.job_id == row['job_id'], counts_table.c.status == row['status'])
+            .values(count=counts_table.c.count + row['count'])
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(counts_table), row)
+
+
+def _previous(state, key):
+    history = state.attrs[key].history
+    return history.deleted[0] if history.deleted else getattr(state.obj(), key)
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_applications(session, flush_context):
+    deltas = Counter()
+    deleted_jobs = set()
+    for obj in session.new:
+        if isinstance(obj, Application):
+            deltas[(obj.job_id, obj.status)] += 1
+    for obj in session.dirty:
+        if isinstance(obj, Application):
+            state = inspect(obj)
+            if state.attrs.status.history.has_changes() or state.attrs.job_id.history.has_changes():
+                deltas[(_previous(state, 'job_id'), _previous(state, 'status'))] -= 1
+                deltas[(obj.job_id, obj.status)] += 1
+    for obj in session.deleted:
+        if isinstance(obj, Application):
+            state = inspect(obj)
+            deltas[(_previous(state, 'job_id'), _previous(state, 'status'))] -= 1
+        elif isinstance(obj, Job):
+            deleted_jobs.add(obj.id)
+
+    if not deltas and not deleted_jobs:
+        return
+    connection = session.connection()
+    adjust(connection, {key: d for key, d in deltas.items() if key[0] not in deleted_jobs})
+    if deleted_jobs:
+        connection.execute(delete(counts_table).where(counts_table.c.job_id.in_(deleted_jobs)))
+
+
+# ==========================================================
+# READS
+# ==========================================================
+
+def _empty():
+    return dict.fromkeys(STATUSES, 0)
+
+
+def counts_for_jobs(job_ids):
+    """{job_id: {status: count}} for the given jobs; every known status is
+    present, zero when there are no applications in it."""
+    counts = {job_id: _empty() for job_id in job_ids}
+    if not counts:
+        return counts
+    rows = db.session.execute(
+        select(counts_table.c.job_id, counts_table.c.status, counts_table.c.count)
+        .where(counts_table.c.job_id.in_(counts))
+    )
+    for job_id, status, count in rows:
+        counts[job_id][status] = count
+    return counts
+
+
+def totals_for_employer(employer_id):
+    totals = _empty()
+    rows = db.session.execute(
+        select(counts_table.c.status, func.sum(counts_table.c.count))
+        .join(Job, Job.id == counts_table.c.job_id)
+        .where(Job.employer_id == employer_id)
+        .group_by(counts_table.c.status)
+    )
+    for status, count in rows:
+        totals[status] = int(count or 0)
+    return totals
+
+
+# ==========================================================
+# RECONCILIATION
+# ==========================================================
+
+def _actual_counts():
+    return select(Application.job_id, Application.status, func.count().label('count')) \
+        .where(Application.status.is_not(None)) \
+        .group_by(Application.job_id, Application.status)
+
+
+def refresh(connection, job_ids=None, chunk_size=500):
+    """Recompute the counters from `applications` for `job_ids` (all jobs
+    when None), inside the caller's transaction."""
+    if job_ids is None:
+        connection.execute(delete(counts_table))
+        connection.execute(insert(counts_table).from_select(['job_id', 'status', 'count'], _actual_counts()))
+        return
+    job_ids = sorted(set(job_ids))
+    for start in range(0, len(job_ids), chunk_size):
+        chunk = job_ids[start:start + chunk_size]
+        connection.execute(delete(counts_table).where(counts_table.c.job_id.in_(chunk)))
+        connection.execute(insert(counts_table).from_select(
+            ['job_id', 'status', 'count'], _actual_counts().where(Application.job_id.in_(chunk))))
+
+
+def find_drift():
+    """{(job_id, status): (stored, actual)} for every counter that is wrong."""
+    stored = {(j, s): c for j, s, c in db.session.execute(select(counts_table))}
+    actual = {(j, s): c for j, s, c in db.session.execute(_actual_counts())}
+    return {
+        key: (stored.get(key, 0), actual.get(key, 0))
+        for key in stored.keys() | actual.keys()
+        if stored.get(key, 0) != actual.get(key, 0)
+    }
+
+
+def reconcile(dry_run=False):
+    drift = find_drift()
+    if drift and not dry_run:
+        # Recount (rather than write the numbers read above) so applications
+        # arriving meanwhile are not lost.
+        refresh(db.session.connection(), {job_id for job_id, _ in drift})
+    db.session.commit()
+    return drift
+
+
+# ==========================================================
+# CLI: flask applications reconcile-counts
+# ==========================================================
+applications_cli = AppGroup('applications', help='Maintain per-job application counters.')
+
+
+@applications_cli.command('reconcile-counts')
+@click.option('--dry-run', is_flag=True, help='Report drift without repairing it.')
+def reconcile_command(dry_run):
+    """Compare the counters with the applications table and repair drift."""
+    drift = reconcile(dry_run)
+    for (job_id, status), (stored, actual) in sorted(drift.items()):
+        click.echo(f"job {job_id} {status}: stored {stored}, actual {actual}")
+    if not drift:
+        click.echo("Application counters are in sync.")
+    elif dry_run:
+        click.echo(f"{len(drift)} counter(s) out of sync (not repaired).")
+    else:
+        click.echo(f"Repaired {len(drift)} counter(s).")
+
+
+def init_app(app):
+    app.cli.add_command(applications_cli)
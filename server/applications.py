@@ -0,0 +1,159 @@
+from collections import Counter, namedtuple
+from datetime import datetime
+from sqlalchemy import select, insert, update, exists, literal, text, bindparam, func
+from sqlalchemy.exc import IntegrityError
+from config import db
+from models import Job, Application, ApplicationStatus, ApplicationStatusEvent
+import application_counts
+import response_cache
+
+# ==========================================================
+# APPLY PATH
+# ==========================================================
+# One statement does the whole write:
+#
+#     INSERT INTO applications (...) SELECT <values> FROM jobs WHERE jobs.id = :job
+#     ON CONFLICT (job_id, seeker_id) DO NOTHING
+#
+# A missing job selects no row, and a repeat application hits the unique
+# index. Either way nothing is inserted, with no read beforehand. Concurrent
+# clicks from the same seeker therefore produce exactly one row. The reason
+# for a no-op is looked up afterwards, on that (rare) path only.
+#
+# Being a Core statement, it bypasses the session listeners: the counter
+# delta and the response cache tags are applied here.
+
+CREATED = 'created'
+ALREADY_APPLIED = 'already_applied'
+JOB_NOT_FOUND = 'job_not_found'
+
+COLUMNS = ['job_id', 'seeker_id', 'status', 'resume_url', 'applied_at']
+
+# SQLite and PostgreSQL share the syntax. Written out rather than built with
+# the dialect insert() constructs, whose compiled form SQLAlchemy does not
+# cache. The WHERE also keeps SQLite from reading ON CONFLICT as a join.
+INSERT_ON_CONFLICT = text(
+    "INSERT INTO applications (job_id, seeker_id, status, resume_url, applied_at) "
+    "SELECT id, :seeker_id, :status, :resume_url, :applied_at FROM jobs WHERE id = :job_id "
+    "ON CONFLICT (job_id, seeker_id) DO NOTHING"
+).bindparams(bindparam('applied_at', type_=db.DateTime))
+
+
+def _insert_statement(dialect, job_id, seeker_id, resume_url):
+    values = {
+        'job_id': job_id,
+        'seeker_id': seeker_id,
+        'status': ApplicationStatus.PENDING,
+        'resume_url': resume_url,
+        'applied_at': datetime.utcnow(),
+    }
+    if dialect in ('sqlite', 'postgresql'):
+        return INSERT_ON_CONFLICT.bindparams(**values)
+    # No ON CONFLICT: skip the row if it exists, the unique index still
+    # rejects a concurrent duplicate (IntegrityError, handled by apply()).
+    source = select(
+        Job.id,
+        literal(seeker_id),
+        literal(values['status']),
+        literal(resume_url, db.String),
+        literal(values['applied_at'], db.DateTime),
+    ).where(Job.id == job_id, ~exists().where(Application.job_id == Job.id, Application.seeker_id == seeker_id))
+    return insert(Application).from_select(COLUMNS, source)
+
+
+def apply(job_id, seeker_id, resume_url=None):
+    """Submit an application and commit. Returns CREATED, ALREADY_APPLIED or
+    JOB_NOT_FOUND."""
+    connection = db.session.connection()
+    statement = _insert_statement(connection.dialect.name, job_id, seeker_id, resume_url)
+    try:
+        inserted = connection.execute(statement).rowcount == 1
+    except IntegrityError:
+        db.session.rollback()
+        inserted = False
+    if inserted:
+        application_counts.adjust(connection, {(job_id, ApplicationStatus.PENDING): 1})
+        db.session.commit()
+        response_cache.invalidate_jobs([job_id])
+        return CREATED
+    # End the transaction first: on SQLite the no-op INSERT still took the
+    # write lock, and other applicants are waiting on it.
+    db.session.commit()
+    job_exists = db.session.scalar(select(exists().where(Job.id == job_id)))
+    return ALREADY_APPLIED if job_exists else JOB_NOT_FOUND
+
+
+# ==========================================================
+# BULK STATUS CHANGES
+# ==========================================================
+# PATCH /employer/applications moves many applications to one status in a
+# single transaction, whatever their number:
+#
+#   1. INSERT INTO application_status_events ... SELECT ... RETURNING: one
+#      event per owned application that actually changes, recording the old
+#      status. RETURNING hands back (job, old status) for the counters.
+#   2. UPDATE applications SET status = ... WHERE id IN (...) AND job_id IN
+#      (the employer's jobs) AND status IS DISTINCT FROM the target.
+#   3. The counter deltas, as one executemany upsert.
+#   4. A count of the ids the employer owns. If any id is missing or
+#      belongs to another employer, the whole change is rolled back.
+#
+# Writing first matters on SQLite: a transaction that read before its
+# first write can't take the write lock after a concurrent commit. On
+# PostgreSQL, step 1 locks the rows (FOR UPDATE), so the old statuses it
+# records are the ones step 2 replaces.
+
+StatusChange = namedtuple('StatusChange', ['updated', 'unchanged', 'missing'])
+
+EVENT_COLUMNS = ['application_id', 'job_id', 'seeker_id', 'from_status', 'to_status', 'changed_by', 'created_at']
+
+
+def _owned(employer_id, application_ids):
+    return (Application.id.in_(application_ids),
+            Application.job_id.in_(select(Job.id).where(Job.employer_id == employer_id)))
+
+
+def update_statuses(employer_id, application_ids, status):
+    """Set `status` on the given applications and commit, all or nothing.
+    Returns a StatusChange; `missing` lists the ids that aren't the
+    employer's, in which case nothing was changed."""
+    application_ids = sorted(set(application_ids))
+    owned = _owned(employer_id, application_ids)
+    changing = Application.status.is_distinct_from(status)
+    source = select(
+        Application.id, Application.job_id, Application.seeker_id, Application.status,
+        literal(status, db.String), literal(employer_id), literal(datetime.utcnow(), db.DateTime),
+    ).where(*owned, changing).with_for_update()
+    events = insert(ApplicationStatusEvent).from_select(EVENT_COLUMNS, source)
+
+    connection = db.session.connection()
+    if connection.dialect.insert_returning:
+        changed = db.session.execute(events.returning(ApplicationStatusEvent.job_id, ApplicationStatusEvent.from_status)).all()
+        job_ids = {job_id for job_id, _ in changed}
+        updated = len(changed)
+    else:
+        updated = db.session.execute(events).rowcount
+        job_ids = None
+    db.session.execute(update(Application).where(*owned, changing).values(status=status),
+                       execution_options={'synchronize_session': False})
+
+    if job_ids is None:
+        job_ids = set(db.session.scalars(select(Application.job_id).where(*owned).distinct()))
+        application_counts.refresh(connection, job_ids)
+    elif changed:
+        deltas = Counter()
+        for job_id, from_status in changed:
+            deltas[(job_id, from_status)] -= 1
+            deltas[(job_id, status)] += 1
+        application_counts.adjust(connection, deltas)
+
+    found = db.session.scalar(select(func.count()).select_from(Application).where(*owned))
+    if found < len(application_ids):
+        db.session.rollback()
+        found_ids = set(db.session.scalars(select(Application.id).where(*owned)))
+        return StatusChange(0, 0, [i for i in application_ids if i not in found_ids])
+    db.session.commit()
+    # Job pages embed their applications.
+    if updated:
+        response_cache.invalidate_jobs(job_ids)
+    return StatusChange(updated, found - updated, [])
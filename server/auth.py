@@ -0,0 +1,330 @@
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from collections import OrderedDict, namedtuple
+from functools import wraps
+from flask import jsonify
+from flask_jwt_extended import create_access_token, get_jwt, get_jwt_identity
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+from config import db, jwt
+from models import User
+
+logger = logging.getLogger(__name__)
+
+# ==========================================================
+# TOKEN CLAIMS, USER CACHE AND REVOCATION
+# ==========================================================
+# Access tokens carry the user's role and token_version, so role checks on
+# protected routes read the verified claims and need no database query.
+#
+# Revocation is by version. Bumping users.token_version invalidates every
+# token issued before it; changing a user's role bumps it too, so no token
+# keeps a stale role claim. Each process keeps the {user_id: version} pairs
+# in memory and checks them in the blocklist loader. This process's own
+# commits update the map at once. A background thread picks up other
+# workers' changes every TOKEN_REVOCATION_REFRESH seconds, so the request path
+# never queries for it. Each reload reads only the users whose version changed
+# since the previous one (users.token_version_changed_at is indexed). An
+# entry is dropped once JWT_ACCESS_TOKEN_EXPIRES has passed since the change:
+# every token it could reject has expired by then. A deleted user has no
+# version left to read, so the reload also checks which of the users seen in
+# tokens since the last one still exist.
+#
+# Routes that need more than the claims (names, email) use current_user()
+# or users.get_many(). These read snapshots of the User columns from a
+# per-process cache that keeps entries for USER_CACHE_TTL seconds. Commits
+# that change a user evict that user's entry.
+
+ROLE_CLAIM = 'role'
+VERSION_CLAIM = 'ver'
+# Revocation version of a deleted user: above any token's.
+DELETED = sys.maxsize
+# Reloads re-read this far back, for changes committed after their timestamp.
+REFRESH_OVERLAP = timedelta(seconds=60)
+
+UserSnapshot = namedtuple('UserSnapshot', ['id', 'username', 'email', 'role', 'full_name', 'company_name', 'token_version'])
+SNAPSHOT_COLUMNS = [getattr(User, name) for name in UserSnapshot._fields]
+
+
+def create_token(user):
+    return create_access_token(
+        identity=str(user.id),
+        additional_claims={ROLE_CLAIM: user.role, VERSION_CLAIM: user.token_version or 0},
+    )
+
+
+# ==========================================================
+# USER CACHE
+# ==========================================================
+
+class UserCache:
+    def __init__(self, ttl=60.0, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # user_id -> (expires_at, snapshot or None)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_many(self, user_ids):
+        """{user_id: UserSnapshot} for the ids that exist; one query for the
+        ones not cached."""
+        found, missing = {}, []
+        now = time.monotonic()
+        with self._lock:
+            for user_id in set(user_ids):
+                entry = self._entries.get(user_id)
+                if entry is not None and entry[0] > now:
+                    self.hits += 1
+                    self._entries.move_to_end(user_id)
+                    if entry[1] is not None:
+                        found[user_id] = entry[1]
+                else:
+                    self.misses += 1
+                    missing.append(user_id)
+        if missing:
+            rows = db.session.execute(select(*SNAPSHOT_COLUMNS).where(User.id.in_(missing)))
+            loaded = {row.id: UserSnapshot(*row) for row in rows}
+            found.update(loaded)
+            self._store({user_id: loaded.get(user_id) for user_id in missing})
+        return found
+
+    def get(self, user_id):
+        return self.get_many([user_id]).get(user_id)
+
+    def _store(self, snapshots):
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            for user_id, snapshot in snapshots.items():
+                self._entries[user_id] = (expires_at, snapshot)
+                self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def evict(self, user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                if self._entries.pop(user_id, None) is not None:
+                    self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+users = UserCache()
+
+
+def current_user():
+    """Snapshot of the authenticated user (None if the account is gone)."""
+    return users.get(int(get_jwt_identity()))
+
+
+# ==========================================================
+# ROLE CHECKS
+# ==========================================================
+
+def current_role():
+    if get_jwt_identity() is None:
+        return None
+    role = get_jwt().get(ROLE_CLAIM)
+    if role is None:
+        # Token issued before role claims existed.
+        user = current_user()
+        role = user.role if user else None
+    return role
+
+
+def role_required(*roles, msg=None):
+    """403 unless the token's role is one of `roles`. Goes under @jwt_required()."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if current_role() not in roles:
+                return jsonify({"msg": msg or "You are not allowed to do this"}), 403
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ==========================================================
+# REVOCATION
+# ==========================================================
+
+class Revocations:
+    def __init__(self, app=None, refresh_interval=30.0, token_lifetime=None):
+        self.app = app
+        self.refresh_interval = refresh_interval
+        self.token_lifetime = token_lifetime  # seconds, None if tokens never expire
+        self._versions = {}  # user_id -> (token_version, changed at, epoch seconds), for versions > 0
+        self._since = None   # changed_at already loaded up to
+        self._seen = set()    # user ids of the tokens checked since the last refresh
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.refreshes = 0
+        self.rejected = 0
+
+    def is_revoked(self, user_id, version):
+        self._ensure_started()
+        if self._thread is not None:
+            with self._lock:
+                self._seen.add(user_id)
+        entry = self._versions.get(user_id)
+        if entry is not None and version < entry[0]:
+            self.rejected += 1
+            return True
+        return False
+
+    def update(self, versions):
+        """Merge {user_id: (token_version, changed_at)}."""
+        with self._lock:
+            for user_id, (version, changed_at) in versions.items():
+                current = self._versions.get(user_id)
+                if version > (current[0] if current else 0):
+                    self._versions[user_id] = (version, changed_at)
+
+    def expire(self):
+        """Drop the entries older than any token still valid."""
+        if self.token_lifetime is None:
+            return
+        cutoff = time.time() - self.token_lifetime
+        with self._lock:
+            for user_id in [u for u, (_, changed_at) in self._versions.items() if changed_at < cutoff]:
+                del self._versions[user_id]
+
+    def refresh(self):
+        with self._lock:
+            seen, self._seen = list(self._seen), set()
+        started = datetime.utcnow()
+        since = self._since
+        if since is None and self.token_lifetime is not None:
+            since = started - timedelta(seconds=self.token_lifetime)
+        query = select(User.id, User.token_version, User.token_version_changed_at).where(User.token_version > 0)
+        if since is not None:
+            query = query.where(User.token_version_changed_at > since)
+        with self.app.app_context():
+            versions = {
+                row.id: (row.token_version, _epoch(row.token_version_changed_at) if row.token_version_changed_at else time.time())
+                for row in db.session.execute(query)
+            }
+            existing = set()
+            for start in range(0, len(seen), 500):
+                existing.update(db.session.scalars(select(User.id).where(User.id.in_(seen[start:start + 500]))))
+            db.session.remove()
+        now = time.time()
+        versions.update({user_id: (DELETED, now) for user_id in seen if user_id not in existing})
+        # Versions only go up, so merging can't undo a newer local commit.
+        self.update(versions)
+        self._since = started - REFRESH_OVERLAP
+        self.expire()
+        self.refreshes += 1
+
+    def _ensure_started(self):
+        # Threads don't survive fork(), so a pre-forked worker starts its own.
+        if self._pid == os.getpid() or self.app is None:
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+        try:
+            self.refresh()
+        except Exception:
+            logger.exception("Loading token revocations failed")
+        if self.refresh_interval > 0:
+            self._thread = threading.Thread(target=self._run, name='token-revocations', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.refresh_interval)
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Refreshing token revocations failed")
+
+    def stats(self):
+        return {
+            "users": len(self._versions),
+            "refreshes": self.refreshes,
+            "rejected": self.rejected,
+        }
+
+
+revocations = Revocations()
+
+
+def _epoch(utc_datetime):
+    return utc_datetime.replace(tzinfo=timezone.utc).timestamp()
+
+
+def revoke_tokens(user):
+    """Invalidate every token issued to `user` so far; takes effect on commit."""
+    user.token_version = (user.token_version or 0) + 1
+    user.token_version_changed_at = datetime.utcnow()
+
+
+@jwt.token_in_blocklist_loader
+def _token_revoked(jwt_header, jwt_payload):
+    try:
+        user_id = int(jwt_payload['sub'])
+    except (KeyError, ValueError):
+        return False
+    return revocations.is_revoked(user_id, jwt_payload.get(VERSION_CLAIM, 0))
+
+
+@event.listens_for(Session, 'before_flush')
+def _revoke_on_role_change(session, flush_context, instances):
+    for obj in session.dirty:
+        if isinstance(obj, User):
+            state = inspect(obj)
+            if state.attrs.role.history.has_changes() and not state.attrs.token_version.history.has_changes():
+                revoke_tokens(obj)
+
+
+# Collected per session after each flush, applied once the commit lands.
+
+@event.listens_for(Session, 'after_flush')
+def _collect_user_changes(session, flush_context):
+    changed = session.info.setdefault('auth_changed_users', {})
+    for obj in session.dirty:
+        if isinstance(obj, User) and session.is_modified(obj):
+            changed[obj.id] = obj.token_version or 0
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            changed[obj.id] = DELETED
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_on_commit(session):
+    changed = session.info.pop('auth_changed_users', None)
+    if not changed:
+        return
+    users.evict(changed)
+    now = time.time()
+    revocations.update({user_id: (version, now) for user_id, version in changed.items()})
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_on_rollback(session):
+    session.info.pop('auth_changed_users', None)
+
+
+def init_app(app):
+    users.ttl = app.config['USER_CACHE_TTL']
+    users.max_entries = app.config['USER_CACHE_MAX_ENTRIES']
+    revocations.app = app
+    revocations.refresh_interval = app.config['TOKEN_REVOCATION_REFRESH']
+    expires = app.config['JWT_ACCESS_TOKEN_EXPIRES']
+    revocations.token_lifetime = expires.total_seconds() if expires else None
@@ -0,0 +1,160 @@
+"""Concurrency stress test: a burst of parallel applies to freshly posted jobs.
+
+    python benchmarks/bench_apply_concurrency.py [--seekers 1000] [--jobs 3]
+        [--clicks 3] [--threads 32] [--database-url URL]
+
+Models a popular job launch: every seeker applies to each of --jobs new jobs,
+clicking --clicks times, all in random order from --threads client threads
+against a threaded WSGI server. That is seekers x jobs x clicks requests
+(9,000 by default), most of them colliding on the same few jobs.
+
+Afterwards it checks that each (job, seeker) pair got exactly one 201 and
+that every other click got 400. It also checks that the table has no
+duplicates and that the per-job counters match the rows. It exits 1 if any
+check fails or any request errored. Runs against a throwaway SQLite database
+unless --database-url is given.
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seekers', type=int, default=1000)
+    parser.add_argument('--jobs', type=int, default=3)
+    parser.add_argument('--clicks', type=int, default=3, help="applies per seeker per job")
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--database-url', default=None, help="default: a throwaway SQLite file")
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args()
+
+
+def percentile(values, pct):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def prepare(app, db, args):
+    from models import User, Job
+    from auth import create_token
+
+    with app.app_context():
+        db.create_all()
+        employer = User(username="launch", email="launch@example.com", password_hash="x", role="employer")
+        db.session.add(employer)
+        db.session.flush()
+        jobs = [Job(title=f"Launch {i}", description="Hot job", company="Acme", location="Nairobi",
+                    category="Technology", employer_id=employer.id) for i in range(args.jobs)]
+        seekers = [User(username=f"seeker{i}", email=f"seeker{i}@example.com", password_hash="x", role="job_seeker")
+                   for i in range(args.seekers)]
+        db.session.add_all(jobs + seekers)
+        db.session.commit()
+        return [job.id for job in jobs], [(seeker.id, create_token(seeker)) for seeker in seekers]
+
+
+def apply(base, job_id, token):
+    request = urllib.request.Request(f'{base}/jobs/{job_id}/apply', method='POST', data=b'',
+                                     headers={'Authorization': f'Bearer {token}'})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request) as response:
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except OSError:
+        status = 'connection error'
+    return status, time.perf_counter() - started
+
+
+def check(app, db, job_ids, pairs, outcomes):
+    from sqlalchemy import func, select
+    from models import Application
+    import application_counts
+
+    failures = []
+    created = Counter(pair for pair, status in outcomes if status == 201)
+    errors = Counter(status for _, status in outcomes if status not in (201, 400))
+    if errors:
+        failures.append(f"unexpected statuses: {dict(errors)}")
+    missing = pairs - set(created)
+    if missing:
+        failures.append(f"{len(missing)} (job, seeker) pairs never got a 201")
+    twice = [pair for pair, n in created.items() if n > 1]
+    if twice:
+        failures.append(f"{len(twice)} pairs got more than one 201")
+
+    with app.app_context():
+        rows = db.session.scalar(select(func.count()).select_from(Application).where(Application.job_id.in_(job_ids)))
+        duplicates = db.session.execute(
+            select(Application.job_id, Application.seeker_id)
+            .group_by(Application.job_id, Application.seeker_id)
+            .having(func.count() > 1)
+        ).all()
+        drift = application_counts.find_drift()
+    if rows != len(pairs):
+        failures.append(f"{rows} application rows, expected {len(pairs)}")
+    if duplicates:
+        failures.append(f"{len(duplicates)} duplicated (job, seeker) pairs in the table")
+    if drift:
+        failures.append(f"{len(drift)} application counters out of sync")
+    return failures
+
+
+def main():
+    args = parse_args()
+    os.environ['DATABASE_URL'] = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    os.environ['RESPONSE_CACHE_ENABLED'] = 'false'
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from werkzeug.serving import make_server
+    from app import create_app, db
+    app = create_app()
+
+    job_ids, seekers = prepare(app, db, args)
+    rng = random.Random(args.seed)
+    calls = [(job_id, seeker_id, token) for job_id in job_ids for seeker_id, token in seekers] * args.clicks
+    rng.shuffle(calls)
+    pairs = {(job_id, seeker_id) for job_id, seeker_id, _ in calls}
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_port}'
+
+    print(f"{len(calls):,} applies: {args.seekers:,} seekers x {args.jobs} jobs x {args.clicks} clicks, "
+          f"{args.threads} threads")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as pool:
+        results = list(pool.map(lambda call: apply(base, call[0], call[2]), calls))
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    outcomes = [((job_id, seeker_id), status) for (job_id, seeker_id, _), (status, _) in zip(calls, results)]
+    timings = [seconds for _, seconds in results]
+    statuses = Counter(status for _, status in outcomes)
+    print(f"  {len(calls) / elapsed:9.1f} req/s   p50 {percentile(timings, 50) * 1000:8.2f} ms   "
+          f"p95 {percentile(timings, 95) * 1000:8.2f} ms   p99 {percentile(timings, 99) * 1000:8.2f} ms")
+    print(f"  statuses: {dict(sorted(statuses.items(), key=str))}")
+
+    failures = check(app, db, job_ids, pairs, outcomes)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"OK: {len(pairs):,} applications, no duplicates, counters in sync")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,342 @@
+"""Endpoint benchmark: per-route latency and throughput with a regression gate.
+
+    python benchmarks/bench_endpoints.py [--sizes small,medium] [--requests 200]
+        [--threads 0] [--output results.json] [--baseline baseline.json]
+        [--threshold 0.25] [--metric p95] [--update-baseline]
+
+Seeds a throwaway SQLite database at each size (via seed.py's generators) and
+drives every route below through the Flask test client, or, with --threads N,
+through a threaded WSGI server hit by N client threads. Each route reports
+p50/p95/p99 latency and requests/sec; the results are written as JSON.
+
+With --baseline, each route's --metric is compared to the stored run and the
+process exits 1 if any is slower by more than --threshold (and by more than
+--min-delta-ms, so sub-millisecond jitter doesn't fail the run), or if any
+route returned an unexpected status. --update-baseline writes the current
+results to the baseline file instead.
+
+The response cache is off unless --cache is given, so GETs measure the real
+query and serialization path rather than a dictionary lookup.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+SIZES = {
+    # users, jobs, applications
+    "small": (200, 2000, 5000),
+    "medium": (2000, 20000, 50000),
+    "large": (20000, 200000, 500000),
+}
+
+JOB_FILTERS = {
+    "keyword": "engineer",
+    "category": "Technology",
+    "location": "New York",
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='small,medium', help=f"comma separated, from {', '.join(SIZES)}")
+    parser.add_argument('--requests', type=int, default=200, help="requests per route")
+    parser.add_argument('--login-requests', type=int, default=50, help="requests for /login (bcrypt bound)")
+    parser.add_argument('--warmup', type=int, default=10, help="untimed requests per route before measuring")
+    parser.add_argument('--threads', type=int, default=0, help="0 = Flask test client, N = threaded WSGI server")
+    parser.add_argument('--rounds', type=int, default=10, help="bcrypt cost for seeded users")
+    parser.add_argument('--cache', action='store_true', help="leave the response cache on")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=None, help="write results JSON here")
+    parser.add_argument('--baseline', default=None, help="baseline JSON to compare against")
+    parser.add_argument('--update-baseline', action='store_true', help="write results to --baseline")
+    parser.add_argument('--metric', choices=('p50', 'p95', 'p99'), default='p95')
+    parser.add_argument('--threshold', type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    parser.add_argument('--min-delta-ms', type=float, default=1.0)
+    return parser.parse_args()
+
+
+def percentile(values, pct):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def filter_combinations():
+    names = list(JOB_FILTERS)
+    for mask in range(1 << len(names)):
+        chosen = [name for bit, name in enumerate(names) if mask & (1 << bit)]
+        label = "GET /jobs" + ("?" + "&".join(chosen) if chosen else "")
+        yield label, {name: JOB_FILTERS[name] for name in chosen}
+
+
+# ==========================================================
+# 1. CLIENTS
+# ==========================================================
+
+class TestClient:
+    """Calls the app in-process; no sockets or threads involved."""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def run(self, calls):
+        timings, statuses = [], {}
+        started = time.perf_counter()
+        for method, path, headers, body in calls:
+            t0 = time.perf_counter()
+            response = self.client.open(path, method=method, headers=headers, json=body)
+            response.get_data()
+            timings.append(time.perf_counter() - t0)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        return timings, statuses, time.perf_counter() - started
+
+    def close(self):
+        pass
+
+
+class ThreadedClient:
+    """Serves the app on a threaded werkzeug server and splits the calls
+    across `threads` client threads."""
+
+    def __init__(self, app, threads):
+        from werkzeug.serving import make_server
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        self.threads = threads
+        self.server = make_server('127.0.0.1', 0, app, threaded=True)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f'http://127.0.0.1:{self.server.server_port}'
+
+    def _call(self, method, path, headers, body):
+        data = None
+        headers = dict(headers)
+        if body is not None:
+            data = json.dumps(body).encode()
+            headers['Content-Type'] = 'application/json'
+        req = urllib.request.Request(self.base + path, data=data, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(req) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            return e.code
+
+    def run(self, calls):
+        timings, statuses = [], {}
+        lock = threading.Lock()
+        pending = iter(calls)
+
+        def worker():
+            while True:
+                with lock:
+                    call = next(pending, None)
+                if call is None:
+                    return
+                t0 = time.perf_counter()
+                status = self._call(*call)
+                elapsed = time.perf_counter() - t0
+                with lock:
+                    timings.append(elapsed)
+                    statuses[status] = statuses.get(status, 0) + 1
+
+        workers = [threading.Thread(target=worker) for _ in range(self.threads)]
+        started = time.perf_counter()
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        return timings, statuses, time.perf_counter() - started
+
+    def close(self):
+        self.server.shutdown()
+
+
+# ==========================================================
+# 2. DATASET
+# ==========================================================
+
+def prepare_database(size, args):
+    import search
+    import response_cache
+    from config import db
+    from models import User, Job
+    from seed import run_seed
+    from auth import create_token
+
+    users, jobs, applications = SIZES[size]
+    db.drop_all()
+    with db.engine.begin() as connection:
+        connection.exec_driver_sql("DROP TABLE IF EXISTS jobs_fts")
+    db.create_all()
+    with db.engine.begin() as connection:
+        search.ensure_search_index(connection)
+    search._backend_cache.clear()
+    run_seed(users, jobs, applications, seed=args.seed)
+    response_cache.cache.clear()
+
+    rng = random.Random(args.seed)
+    employer_ids = db.session.scalars(db.select(User.id).filter_by(role='employer')).all()
+    job_ids = db.session.scalars(db.select(Job.id)).all()
+    emails = db.session.scalars(db.select(User.email).limit(500)).all()
+
+    # Fresh seekers, one per apply request, so every application is new.
+    pw_hash = db.session.scalar(db.select(User.password_hash).limit(1))
+    first = (db.session.scalar(db.select(db.func.max(User.id))) or 0) + 1
+    db.session.execute(User.__table__.insert(), [
+        {"id": first + n, "username": f"bench{first + n}", "email": f"bench{first + n}@example.com",
+         "password_hash": pw_hash, "role": "job_seeker", "created_at": datetime.utcnow()}
+        for n in range(args.requests)
+    ])
+    db.session.commit()
+    seeker_tokens = [create_token(user) for user in User.query.filter(User.id >= first).order_by(User.id)]
+    employers = User.query.filter(User.id.in_(rng.sample(employer_ids, min(50, len(employer_ids))))).all()
+    employer_tokens = [create_token(user) for user in employers]
+    return rng, job_ids, emails, seeker_tokens, employer_tokens
+
+
+def build_routes(args, rng, job_ids, emails, seeker_tokens, employer_tokens):
+    from urllib.parse import urlencode
+
+    def auth(token):
+        return {"Authorization": f"Bearer {token}"}
+
+    n = args.requests
+    routes = {}
+    for label, params in filter_combinations():
+        routes[label] = (200, [('GET', '/jobs?' + urlencode(params), {}, None)] * n)
+    routes["GET /jobs/<id>"] = (200, [
+        ('GET', f'/jobs/{rng.choice(job_ids)}', {}, None) for _ in range(n)
+    ])
+    routes["POST /jobs/<id>/apply"] = (201, [
+        ('POST', f'/jobs/{rng.choice(job_ids)}/apply', auth(token), None) for token in seeker_tokens
+    ])
+    routes["GET /employer/my-jobs"] = (200, [
+        ('GET', '/employer/my-jobs', auth(rng.choice(employer_tokens)), None) for _ in range(n)
+    ])
+    routes["POST /login"] = (200, [
+        ('POST', '/login', {}, {"email": rng.choice(emails), "password": "password123"})
+        for _ in range(args.login_requests)
+    ])
+    return routes
+
+
+# ==========================================================
+# 3. RUN, REPORT, COMPARE
+# ==========================================================
+
+def summarize(timings, statuses, elapsed, expected):
+    return {
+        "requests": len(timings),
+        "errors": sum(count for status, count in statuses.items() if status != expected),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "rps": round(len(timings) / elapsed, 1) if elapsed else None,
+        "p50_ms": round(percentile(timings, 50) * 1000, 3),
+        "p95_ms": round(percentile(timings, 95) * 1000, 3),
+        "p99_ms": round(percentile(timings, 99) * 1000, 3),
+    }
+
+
+def compare(results, baseline, metric, threshold, min_delta_ms):
+    regressions = []
+    key = f"{metric}_ms"
+    for size, routes in results.items():
+        for route, current in routes.items():
+            previous = baseline.get(size, {}).get(route)
+            if not previous or key not in previous:
+                continue
+            limit = max(previous[key] * (1 + threshold), previous[key] + min_delta_ms)
+            if current[key] > limit:
+                regressions.append((size, route, previous[key], current[key]))
+    return regressions
+
+
+def main():
+    args = parse_args()
+    sizes = [s.strip() for s in args.sizes.split(',') if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        sys.exit(f"Unknown size(s): {', '.join(unknown)}")
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ['BCRYPT_LOG_ROUNDS'] = str(args.rounds)
+    if not args.cache:
+        os.environ['RESPONSE_CACHE_ENABLED'] = 'false'
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from app import create_app
+    app = create_app()
+
+    results = {}
+    failed = False
+    for size in sizes:
+        print(f"== {size}: {SIZES[size][0]:,} users, {SIZES[size][1]:,} jobs, {SIZES[size][2]:,} applications")
+        # Requests must not run inside this context: they would share its `g`.
+        with app.app_context():
+            routes = build_routes(args, *prepare_database(size, args))
+        client = ThreadedClient(app, args.threads) if args.threads else TestClient(app)
+        results[size] = {}
+        try:
+            for route, (expected, calls) in routes.items():
+                client.run(calls[:args.warmup] if expected == 200 else [])
+                summary = summarize(*client.run(calls), expected)
+                results[size][route] = summary
+                failed = failed or summary["errors"] > 0
+                print(f"  {route:<40} {summary['rps']:9.1f} req/s   "
+                      f"p50 {summary['p50_ms']:8.2f} ms   p95 {summary['p95_ms']:8.2f} ms   "
+                      f"p99 {summary['p99_ms']:8.2f} ms"
+                      + (f"   {summary['errors']} unexpected: {summary['statuses']}" if summary['errors'] else ""))
+        finally:
+            client.close()
+
+    report = {
+        "meta": {
+            "date": datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'),
+            "python": platform.python_version(),
+            "mode": f"wsgi x{args.threads}" if args.threads else "test client",
+            "requests": args.requests,
+            "bcrypt_rounds": args.rounds,
+            "response_cache": args.cache,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"Results written to {args.output}")
+
+    if args.baseline and args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"Baseline updated: {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["meta"].get("mode") != report["meta"]["mode"]:
+            sys.exit(f"Baseline was recorded in '{baseline['meta'].get('mode')}' mode, "
+                     f"this run is '{report['meta']['mode']}'; not comparable")
+        regressions = compare(results, baseline["results"], args.metric, args.threshold, args.min_delta_ms)
+        for size, route, before, after in regressions:
+            print(f"REGRESSION [{size}] {route}: {args.metric} {before:.2f} ms -> {after:.2f} ms")
+        if regressions:
+            failed = True
+        else:
+            print(f"No {args.metric} regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
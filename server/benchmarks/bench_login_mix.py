@@ -0,0 +1,127 @@
+"""Throughput benchmark: logins and job browsing sharing one worker.
+
+    python benchmarks/bench_login_mix.py [--threads 16] [--seconds 10]
+        [--login-share 0.5] [--hash-workers 4]
+
+Runs the app on a threaded WSGI server against a throwaway SQLite database
+and drives it with a mix of POST /login and GET /jobs from client threads.
+--hash-workers 0 hashes inline on the request threads (the old behaviour),
+which is the baseline to compare the bounded pool against. --no-cache turns
+off the response cache so browse requests really hit the database.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--login-share', type=float, default=0.5)
+    parser.add_argument('--hash-workers', type=int, default=None)
+    parser.add_argument('--rounds', type=int, default=12)
+    parser.add_argument('--no-cache', action='store_true')
+    return parser.parse_args()
+
+
+def percentile(values, pct):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def main():
+    args = parse_args()
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ['BCRYPT_LOG_ROUNDS'] = str(args.rounds)
+    if args.hash_workers is not None:
+        os.environ['PASSWORD_HASH_WORKERS'] = str(args.hash_workers)
+    if args.no_cache:
+        os.environ['RESPONSE_CACHE_ENABLED'] = 'false'
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from werkzeug.serving import make_server
+    from app import create_app, db
+    app = create_app()
+    from models import User, Job
+    from config import bcrypt
+
+    with app.app_context():
+        db.create_all()
+        pw_hash = bcrypt.generate_password_hash('password123').decode('utf-8')
+        db.session.add_all([
+            User(username=f"user{i}", email=f"user{i}@example.com", password_hash=pw_hash, role="employer")
+            for i in range(50)
+        ])
+        db.session.flush()
+        db.session.add_all([
+            Job(title=f"Job {i}", description="Lorem ipsum", company="Acme", location="Nairobi",
+                category="Technology", employer_id=(i % 50) + 1)
+            for i in range(500)
+        ])
+        db.session.commit()
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_port}'
+
+    results = {'login': [], 'browse': []}
+    statuses = {}
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.seconds
+
+    def client(seed):
+        rng = random.Random(seed)
+        while time.monotonic() < deadline:
+            if rng.random() < args.login_share:
+                kind = 'login'
+                body = json.dumps({"email": f"user{rng.randrange(50)}@example.com", "password": "password123"})
+                req = urllib.request.Request(base + '/login', body.encode(), {'Content-Type': 'application/json'})
+            else:
+                kind = 'browse'
+                req = urllib.request.Request(base + f'/jobs?limit=20&category=Technology&page_hint={rng.randrange(100)}')
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(req) as response:
+                    response.read()
+                    status = response.status
+            except urllib.error.HTTPError as e:
+                status = e.code
+            elapsed = time.perf_counter() - started
+            with lock:
+                statuses[(kind, status)] = statuses.get((kind, status), 0) + 1
+                if status < 400:
+                    results[kind].append(elapsed)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(args.threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    server.shutdown()
+
+    workers = app.config['PASSWORD_HASH_WORKERS']
+    print(f"{args.threads} client threads, {args.seconds:.0f}s, login share {args.login_share:.0%}, "
+          f"bcrypt cost {args.rounds}, hash workers {workers or 'inline'}")
+    for kind, timings in results.items():
+        print(f"  {kind:<7} {len(timings) / args.seconds:8.1f} req/s   "
+              f"p50 {percentile(timings, 50) * 1000:7.1f} ms   "
+              f"p95 {percentile(timings, 95) * 1000:7.1f} ms   "
+              f"p99 {percentile(timings, 99) * 1000:7.1f} ms")
+    print("  statuses: " + ", ".join(f"{k} {s}: {n}" for (k, s), n in sorted(statuses.items())))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Microbenchmark: SerializerMixin.to_dict() vs the compiled serializers.
+
+    python benchmarks/bench_serializers.py [--rows 10000] [--repeat 5]
+
+Builds transient Job rows (with employer and applications attached) so no
+database is needed, checks both paths produce identical JSON, then times them.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from models import User, Job, Application  # noqa: E402
+from serializers import serialize, serializer_for, json_response  # noqa: E402
+
+app = create_app()
+
+
+def build_rows(count, rng):
+    start = datetime(2026, 1, 1)
+    employers = [
+        User(id=i, username=f"employer{i}", email=f"employer{i}@example.com",
+             password_hash="x", role="employer", created_at=start)
+        for i in range(1, 51)
+    ]
+    jobs = []
+    for i in range(1, count + 1):
+        job = Job(
+            id=i, title=f"Job {i}", description="Lorem ipsum " * 20,
+            company=f"Company {i % 300}", location="Nairobi, Kenya",
+            category=rng.choice(["Technology", "Marketing", "Design", "Finance"]),
+            salary_max=rng.randrange(30000, 200000, 1000), job_type="Full-time",
+            employer_id=(i % 50) + 1, created_at=start + timedelta(minutes=i),
+        )
+        job.employer = employers[i % 50]
+        job.applications = [
+            Application(id=i * 10 + n, job_id=i, seeker_id=1000 + n, status="Pending",
+                        applied_at=start + timedelta(minutes=i + n))
+            for n in range(rng.randrange(4))
+        ]
+        jobs.append(job)
+    return jobs
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    jobs = build_rows(args.rows, random.Random(42))
+    serialize_job = serializer_for(Job)
+
+    with app.test_request_context():
+        legacy = app.json.response([j.to_dict() for j in jobs]).get_data()
+        compiled = json_response([serialize(j) for j in jobs])[0].get_data()
+        assert legacy == compiled, "compiled serializer output differs from to_dict()"
+
+        results = {
+            "to_dict": best_of(args.repeat, lambda: [j.to_dict() for j in jobs]),
+            "compiled": best_of(args.repeat, lambda: [serialize_job(j) for j in jobs]),
+            "to_dict + jsonify": best_of(args.repeat, lambda: app.json.response([j.to_dict() for j in jobs])),
+            "compiled + json_response": best_of(args.repeat, lambda: json_response([serialize_job(j) for j in jobs])),
+        }
+
+    print(f"{args.rows} rows, best of {args.repeat} (output is byte-identical)")
+    for name, seconds in results.items():
+        print(f"  {name:<26} {seconds * 1000:9.1f} ms  {args.rows / seconds:12,.0f} rows/s")
+    print(f"  speedup (dicts only)       {results['to_dict'] / results['compiled']:9.1f}x")
+    print(f"  speedup (end to end)       {results['to_dict + jsonify'] / results['compiled + json_response']:9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
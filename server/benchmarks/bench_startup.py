@@ -0,0 +1,125 @@
+"""Startup cost of a worker: cold process vs forked from a warm master.
+
+    python benchmarks/bench_startup.py [--rounds 5] [--jobs 2000]
+
+A cold start (a new process, or gunicorn without preload_app) imports every
+module, builds the app and serves its first request unwarmed. A preloaded
+gunicorn worker is forked from a master that already did all of that and
+ran warm_up(), so it only reopens its connections. This times both to the
+first GET /jobs response, against a throwaway SQLite database.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+SERVER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--jobs', type=int, default=2000)
+    parser.add_argument('--child', choices=['prepare', 'cold'], help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def first_request(app):
+    started = time.perf_counter()
+    response = app.test_client().get('/jobs')
+    assert response.status_code == 200, response.status_code
+    return time.perf_counter() - started
+
+
+def prepare(jobs):
+    from sqlalchemy import insert
+    from app import create_app, db
+    from models import User, Job
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        employer = User(username="startup", email="startup@example.com", password_hash="x", role="employer")
+        db.session.add(employer)
+        db.session.flush()
+        db.session.execute(insert(Job), [
+            {"title": f"Opening {i}", "description": "Startup benchmark", "company": "Acme",
+             "location": "Nairobi", "category": "Technology", "employer_id": employer.id}
+            for i in range(jobs)
+        ])
+        db.session.commit()
+
+
+def cold():
+    started = time.perf_counter()
+    from app import create_app
+    app = create_app()
+    ready = time.perf_counter() - started
+    first = first_request(app)
+    print(json.dumps({"ready": ready, "first": first}))
+
+
+def forked(rounds):
+    """Import wsgi (create_app + warm_up) here, then fork one worker per
+    round the way gunicorn does and time its first request."""
+    import database
+    from wsgi import app
+
+    results = []
+    for _ in range(rounds):
+        read, write = os.pipe()
+        started = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read)
+            database.after_fork(app)
+            ready = time.perf_counter() - started
+            first = first_request(app)
+            os.write(write, json.dumps({"ready": ready, "first": first}).encode())
+            os._exit(0)
+        os.close(write)
+        with os.fdopen(read) as f:
+            results.append(json.loads(f.read()))
+        os.waitpid(pid, 0)
+    return results
+
+
+def summarize(label, results):
+    ready = sorted(r['ready'] for r in results)[len(results) // 2]
+    first = sorted(r['first'] for r in results)[len(results) // 2]
+    print(f"  {label:<28} ready {ready * 1000:8.1f} ms   first request {first * 1000:7.1f} ms   "
+          f"total {(ready + first) * 1000:8.1f} ms")
+
+
+def main():
+    args = parse_args()
+    sys.path.insert(0, SERVER)
+    if args.child == 'prepare':
+        return prepare(args.jobs)
+    if args.child == 'cold':
+        return cold()
+
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    os.environ['WARM_UP_ON_START'] = 'true'
+    child = [sys.executable, '-W', 'ignore', os.path.abspath(__file__)]
+    subprocess.run(child + ['--child', 'prepare', '--jobs', str(args.jobs)], check=True, cwd=SERVER)
+
+    cold_results = [
+        json.loads(subprocess.run(child + ['--child', 'cold'], check=True, cwd=SERVER,
+                                  capture_output=True, text=True).stdout.splitlines()[-1])
+        for _ in range(args.rounds)
+    ]
+    forked_results = forked(args.rounds)
+
+    from app import startup_timings
+    print(f"Median of {args.rounds} rounds, {args.jobs:,} jobs:")
+    summarize("cold process", cold_results)
+    summarize("forked from warm master", forked_results)
+    print("Master startup: " + ', '.join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in startup_timings.items()))
+
+
+if __name__ == '__main__':
+    main()
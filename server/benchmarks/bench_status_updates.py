@@ -0,0 +1,102 @@
+"""Times PATCH /employer/applications on large batches of applicants.
+
+    python benchmarks/bench_status_updates.py [--applications 5000] [--jobs 10]
+        [--rounds 5] [--database-url URL]
+
+One employer with --jobs jobs and --applications applicants spread over
+them. Every round moves all of them to the next status in one request, so
+each round changes every row. Afterwards it checks that each round wrote one
+history event per application, and that the per-job counters match the
+rows. It exits 1 if a check fails. Runs against a throwaway SQLite database
+unless --database-url is given.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--applications', type=int, default=5000)
+    parser.add_argument('--jobs', type=int, default=10)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--database-url', default=None, help="default: a throwaway SQLite file")
+    return parser.parse_args()
+
+
+def prepare(app, db, args):
+    from sqlalchemy import insert
+    from models import User, Job, Application
+    from auth import create_token
+    import application_counts
+
+    with app.app_context():
+        db.create_all()
+        employer = User(username="hiring", email="hiring@example.com", password_hash="x", role="employer")
+        db.session.add(employer)
+        db.session.flush()
+        jobs = [Job(title=f"Opening {i}", description="Busy job", company="Acme", location="Nairobi",
+                    category="Technology", employer_id=employer.id) for i in range(args.jobs)]
+        db.session.add_all(jobs)
+        db.session.flush()
+        seekers = [{"username": f"applicant{i}", "email": f"applicant{i}@example.com", "password_hash": "x",
+                    "role": "job_seeker"} for i in range(args.applications)]
+        db.session.execute(insert(User), seekers)
+        seeker_ids = [row.id for row in db.session.query(User.id).filter(User.role == "job_seeker")]
+        db.session.execute(insert(Application), [
+            {"job_id": jobs[i % len(jobs)].id, "seeker_id": seeker_id, "status": "Pending"}
+            for i, seeker_id in enumerate(seeker_ids)
+        ])
+        application_counts.refresh(db.session.connection())
+        db.session.commit()
+        ids = [row.id for row in db.session.query(Application.id)]
+        return create_token(employer), ids
+
+
+def main():
+    args = parse_args()
+    os.environ['DATABASE_URL'] = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from sqlalchemy import func, select
+    from app import create_app, db
+    app = create_app()
+    from models import ApplicationStatusEvent
+    import application_counts
+
+    token, ids = prepare(app, db, args)
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+    statuses = ['Interviewing', 'Accepted', 'Rejected', 'Pending']
+
+    print(f"{len(ids):,} applications over {args.jobs} jobs, {args.rounds} rounds")
+    failures = []
+    for n in range(args.rounds):
+        status = statuses[n % len(statuses)]
+        started = time.perf_counter()
+        response = client.patch('/employer/applications', json={"ids": ids, "status": status}, headers=headers)
+        elapsed = time.perf_counter() - started
+        body = response.get_json()
+        print(f"  -> {status:<12} {response.status_code} {elapsed * 1000:8.1f} ms   {body}")
+        if response.status_code != 200 or body.get('updated') != len(ids):
+            failures.append(f"round {n + 1}: {response.status_code} {body}")
+
+    with app.app_context():
+        events = db.session.scalar(select(func.count()).select_from(ApplicationStatusEvent))
+        drift = application_counts.find_drift()
+    if events != len(ids) * args.rounds:
+        failures.append(f"{events} history events, expected {len(ids) * args.rounds}")
+    if drift:
+        failures.append(f"{len(drift)} application counters out of sync")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"OK: {events:,} events, counters in sync")
+
+
+if __name__ == '__main__':
+    main()
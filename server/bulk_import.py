@@ -0,0 +1,168 @@
+import io
+import json
+from datetime import datetime
+from sqlalchemy import insert
+from sqlalchemy.dialects import sqlite, postgresql
+from config import db
+from models import Job
+import response_cache
+import facets
+import alerts
+import geo
+
+# ==========================================================
+# NDJSON BULK JOB IMPORT
+# ==========================================================
+# Reads one job per line straight off the request stream, validates it, and
+# writes in batches of `batch_size` with a single multi-row INSERT per batch.
+# Lines carrying an `external_id` are upserted on (employer_id, external_id),
+# so re-syncing an ATS feed updates postings instead of duplicating them.
+# Only the current batch and the (capped) error list are held in memory.
+
+REQUIRED_FIELDS = ('title', 'description', 'company', 'location')
+OPTIONAL_STRINGS = {'category': None, 'job_type': 50, 'external_id': 255}
+UPDATABLE_COLUMNS = ('title', 'description', 'company', 'location', 'category', 'salary_max', 'job_type',
+                     'latitude', 'longitude', 'place_id')
+MAX_REPORTED_ERRORS = 1000
+MAX_LINE_BYTES = 256 * 1024
+
+
+class LineError(ValueError):
+    pass
+
+
+def parse_line(raw):
+    try:
+        data = json.loads(raw)
+    except ValueError as e:
+        raise LineError(f"Invalid JSON: {e}")
+    if not isinstance(data, dict):
+        raise LineError("Each line must be a JSON object")
+
+    row = {}
+    for field in REQUIRED_FIELDS:
+        value = data.get(field)
+        if not isinstance(value, str) or not value.strip():
+            raise LineError(f"'{field}' is required")
+        row[field] = value
+    for field, max_length in OPTIONAL_STRINGS.items():
+        value = data.get(field)
+        if value is None:
+            continue
+        if not isinstance(value, str):
+            raise LineError(f"'{field}' must be a string")
+        if max_length and len(value) > max_length:
+            raise LineError(f"'{field}' is longer than {max_length} characters")
+        row[field] = value
+    salary = data.get('salary_max')
+    if salary is not None:
+        if isinstance(salary, bool) or not isinstance(salary, int) or salary < 0:
+            raise LineError("'salary_max' must be a non-negative integer")
+        row['salary_max'] = salary
+
+    row.setdefault('category', 'General')
+    row.setdefault('job_type', 'Full-time')
+    row.setdefault('external_id', None)
+    row.setdefault('salary_max', None)
+    return row
+
+
+def iter_lines(stream):
+    # werkzeug's request stream is unbuffered, so readline() on it goes byte by
+    # byte; buffer it. The cap keeps a single runaway line from exhausting memory.
+    if isinstance(stream, io.RawIOBase):
+        stream = io.BufferedReader(stream, buffer_size=64 * 1024)
+    while True:
+        line = stream.readline(MAX_LINE_BYTES)
+        if not line:
+            return
+        if len(line) == MAX_LINE_BYTES and not line.endswith(b'\n'):
+            while True:
+                rest = stream.readline(MAX_LINE_BYTES)
+                if not rest or rest.endswith(b'\n'):
+                    break
+            yield None
+            continue
+        yield line
+
+
+def _upsert_statement(dialect):
+    insert = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}.get(dialect)
+    if insert is None:
+        return None
+    stmt = insert(Job.__table__)
+    return stmt.on_conflict_do_update(
+        index_elements=['employer_id', 'external_id'],
+        set_={column: stmt.excluded[column] for column in UPDATABLE_COLUMNS},
+    )
+
+
+class ImportReport:
+    def __init__(self):
+        self.lines = 0
+        self.upserted = 0
+        self.failed = 0
+        self.errors = []
+
+    def error(self, line, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def to_dict(self):
+        return {
+            "lines": self.lines,
+            "upserted": self.upserted,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+def import_jobs(stream, employer_id, batch_size):
+    report = ImportReport()
+    upsert = _upsert_statement(db.engine.dialect.name)
+    batch = {}
+
+    def flush():
+        if not batch:
+            return
+        rows = list(batch.values())
+        # Core, not an ORM bulk insert: the ORM groups rows by which keys are
+        # None, splitting a batch into many small executemany calls. Every row
+        # has every column, so this is one executemany per batch.
+        stmt = (upsert if upsert is not None else insert(Job.__table__)).returning(Job.__table__.c.id)
+        ids = db.session.connection().execute(stmt, rows).scalars().all()
+        db.session.commit()
+        # Core statements bypass the session hooks that keep the cache fresh.
+        response_cache.invalidate_jobs(ids)
+        facets.invalidate()
+        alerts.notify_ids(ids)
+        report.upserted += len(rows)
+        batch.clear()
+
+    now = datetime.utcnow()
+    for number, raw in enumerate(iter_lines(stream), start=1):
+        if raw is None:
+            report.lines += 1
+            report.error(number, f"Line is longer than {MAX_LINE_BYTES} bytes")
+            continue
+        if not raw.strip():
+            continue
+        report.lines += 1
+        try:
+            row = parse_line(raw)
+        except LineError as e:
+            report.error(number, str(e))
+            continue
+        row.update(geo.location_columns(row['location']))
+        row['employer_id'] = employer_id
+        row['created_at'] = now
+        # One statement can't upsert the same key twice; the last line wins.
+        key = row.get('external_id') or ('line', number)
+        batch.pop(key, None)
+        batch[key] = row
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    return report
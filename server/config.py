@@ -1,6 +1,5 @@
 import os
 from datetime import timedelta
-from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy import MetaData
 from flask_migrate import Migrate
@@ -8,31 +7,174 @@ from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from dotenv import load_dotenv
+import database
 
 # Load environment variables from .env file
 load_dotenv()
 
-app = Flask(__name__)
-
-# 1. Database Configuration
-# Supports PostgreSQL (from main) or local SQLite (from your head)
-app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///recruitconnect.db')
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.json.compact = False
-
-# 2. Security & JWT Configuration
-app.secret_key = os.getenv('SECRET_KEY', 'your-super-secret-key')
-app.config["JWT_SECRET_KEY"] = os.getenv('JWT_SECRET_KEY', 'super-secret-moringa-key') 
-# Using the 24-hour expiration from your version for better dev experience
-app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(hours=24)
-
-# 3. Initialize Extensions
+# Extensions are created unbound and attached by init_extensions(); the
+# app itself is built by app.create_app(), so importing this module (as
+# every model and service module does) never creates one.
 metadata = MetaData(naming_convention={
+    "ix": "ix_%(column_0_label)s",
     "fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s",
 })
 
-db = SQLAlchemy(app, metadata=metadata)
-migrate = Migrate(app, db)
-bcrypt = Bcrypt(app)
-jwt = JWTManager(app)
-CORS(app, supports_credentials=True, origins=["http://localhost:5173"])
\ No newline at end of file
+db = SQLAlchemy(metadata=metadata, session_options={'class_': database.RoutingSession})
+migrate = Migrate()
+bcrypt = Bcrypt()
+jwt = JWTManager()
+cors = CORS()
+
+
+def configure(app):
+    # 1. Database Configuration
+    # Supports PostgreSQL (from main) or local SQLite (from your head)
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///recruitconnect.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.json.compact = False
+
+    # Connection pool, per worker process. pre-ping checks a connection on
+    # checkout (dropping ones the server closed) and recycle replaces it after N
+    # seconds; both default off for SQLite, which has no server to lose.
+    is_sqlite = app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite')
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_pre_ping': os.getenv('DATABASE_POOL_PRE_PING', str(not is_sqlite)).lower() == 'true',
+        'pool_recycle': int(os.getenv('DATABASE_POOL_RECYCLE', -1 if is_sqlite else 1800)),
+    }
+    if not database.is_memory_sqlite(app.config['SQLALCHEMY_DATABASE_URI']):
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'].update({
+            'pool_size': int(os.getenv('DATABASE_POOL_SIZE', 5)),
+            'max_overflow': int(os.getenv('DATABASE_MAX_OVERFLOW', 10)),
+            'pool_timeout': float(os.getenv('DATABASE_POOL_TIMEOUT', 30)),
+        })
+
+    # Applied to every SQLite connection as it opens. WAL lets readers run
+    # alongside the writer; NORMAL sync is safe in WAL mode.
+    app.config['SQLITE_JOURNAL_MODE'] = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    app.config['SQLITE_SYNCHRONOUS'] = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    app.config['SQLITE_BUSY_TIMEOUT_MS'] = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    app.config['SQLITE_CACHE_SIZE_KB'] = int(os.getenv('SQLITE_CACHE_SIZE_KB', 64 * 1024))
+    app.config['SQLITE_MMAP_SIZE'] = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+
+    # Read replicas (comma-separated URLs) for views marked @read_replica. A
+    # client that just wrote reads from the primary for READ_YOUR_WRITES_SECONDS.
+    app.config['SQLALCHEMY_BINDS'] = database.replica_binds(os.getenv('REPLICA_DATABASE_URLS'))
+    app.config['READ_YOUR_WRITES_SECONDS'] = float(os.getenv('READ_YOUR_WRITES_SECONDS', 5))
+
+    # 2. Security & JWT Configuration
+    app.secret_key = os.getenv('SECRET_KEY', 'your-super-secret-key')
+    app.config["JWT_SECRET_KEY"] = os.getenv('JWT_SECRET_KEY', 'super-secret-moringa-key') 
+    # Using the 24-hour expiration from your version for better dev experience
+    app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(hours=24)
+    # Per-process cache of user rows for routes that need more than the token's
+    # role claim, and how often revoked token versions are reloaded from the
+    # database (this process's own revocations apply immediately).
+    app.config['USER_CACHE_TTL'] = float(os.getenv('USER_CACHE_TTL', 60))
+    app.config['USER_CACHE_MAX_ENTRIES'] = int(os.getenv('USER_CACHE_MAX_ENTRIES', 10000))
+    app.config['TOKEN_REVOCATION_REFRESH'] = float(os.getenv('TOKEN_REVOCATION_REFRESH', 30))
+
+    # bcrypt cost factor; existing hashes are upgraded on the next successful login
+    app.config['BCRYPT_LOG_ROUNDS'] = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+    # Hashing runs on its own pool: `workers` concurrent hashes plus `backlog`
+    # waiting, beyond which /login and /register answer 503 + Retry-After.
+    # 0 workers hashes inline on the request thread.
+    app.config['PASSWORD_HASH_WORKERS'] = int(os.getenv('PASSWORD_HASH_WORKERS', os.cpu_count() or 2))
+    app.config['PASSWORD_HASH_BACKLOG'] = int(os.getenv('PASSWORD_HASH_BACKLOG', 16))
+    app.config['PASSWORD_HASH_TIMEOUT'] = float(os.getenv('PASSWORD_HASH_TIMEOUT', 10))
+    app.config['PASSWORD_HASH_RETRY_AFTER'] = int(os.getenv('PASSWORD_HASH_RETRY_AFTER', 1))
+
+    # 3. Pagination
+    # Listing endpoints use keyset cursors; these bound the page size and how far
+    # an approximate total is allowed to count before giving up.
+    app.config['DEFAULT_PAGE_SIZE'] = int(os.getenv('DEFAULT_PAGE_SIZE', 20))
+    app.config['MAX_PAGE_SIZE'] = int(os.getenv('MAX_PAGE_SIZE', 100))
+    app.config['TOTAL_COUNT_CAP'] = int(os.getenv('TOTAL_COUNT_CAP', 10000))
+
+    # Fail requests that exceed their @query_budget instead of only logging them
+    # (always on when app.testing is set).
+    app.config['SQL_QUERY_BUDGET_ENFORCE'] = os.getenv('SQL_QUERY_BUDGET_ENFORCE', 'false').lower() == 'true'
+
+    # Rows per INSERT statement (and per commit) for POST /jobs/bulk
+    app.config['BULK_IMPORT_BATCH_SIZE'] = int(os.getenv('BULK_IMPORT_BATCH_SIZE', 1000))
+    # Most applications one PATCH /employer/applications may re-status
+    app.config['MAX_STATUS_UPDATE_BATCH'] = int(os.getenv('MAX_STATUS_UPDATE_BATCH', 10000))
+
+    # 4. Response Cache
+    # Size-bounded LRU for GET /jobs and /jobs/<id>; entries are invalidated on
+    # commit, the TTL only bounds staleness across worker processes.
+    app.config['RESPONSE_CACHE_ENABLED'] = os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+    app.config['RESPONSE_CACHE_MAX_ENTRIES'] = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', 2048))
+    app.config['RESPONSE_CACHE_TTL'] = float(os.getenv('RESPONSE_CACHE_TTL', 30))
+
+    # Unfiltered GET /jobs/facets counts are kept in memory and updated on every
+    # commit; the TTL bounds how long other workers' writes go unseen.
+    app.config['FACET_CACHE_TTL'] = float(os.getenv('FACET_CACHE_TTL', 60))
+
+    # 5. Metrics
+    # Per-route latency/SQL histograms served at GET /metrics. Requests slower
+    # than SLOW_REQUEST_MS are logged with their SQL (0 turns the log off).
+    app.config['METRICS_ENABLED'] = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    app.config['SLOW_REQUEST_MS'] = float(os.getenv('SLOW_REQUEST_MS', 0))
+
+    # 6. Contact Messages
+    # POST /api/contact enqueues; a background writer inserts in batches of
+    # CONTACT_BATCH_SIZE or every CONTACT_FLUSH_INTERVAL seconds. A full queue
+    # answers 503 + Retry-After.
+    app.config['CONTACT_QUEUE_SIZE'] = int(os.getenv('CONTACT_QUEUE_SIZE', 10000))
+    app.config['CONTACT_BATCH_SIZE'] = int(os.getenv('CONTACT_BATCH_SIZE', 200))
+    app.config['CONTACT_FLUSH_INTERVAL'] = float(os.getenv('CONTACT_FLUSH_INTERVAL', 1.0))
+    app.config['CONTACT_QUEUE_RETRY_AFTER'] = int(os.getenv('CONTACT_QUEUE_RETRY_AFTER', 5))
+
+    # 7. CV Storage
+    # Uploads are stored content-addressed under CV_STORAGE_DIR (default
+    # instance/cvs). USE_X_SENDFILE hands downloads to the front-end server.
+    app.config['CV_STORAGE_DIR'] = os.getenv('CV_STORAGE_DIR', '')
+    app.config['CV_MAX_BYTES'] = int(os.getenv('CV_MAX_BYTES', 5 * 1024 * 1024))
+    app.config['USE_X_SENDFILE'] = os.getenv('USE_X_SENDFILE', 'false').lower() == 'true'
+
+    # CV text extraction: worker processes, per-file timeout, and how many
+    # attempts (retried with exponential backoff) before a file is poisoned.
+    app.config['CV_EXTRACTION_ENABLED'] = os.getenv('CV_EXTRACTION_ENABLED', 'true').lower() == 'true'
+    app.config['CV_EXTRACTION_WORKERS'] = int(os.getenv('CV_EXTRACTION_WORKERS', 2))
+    app.config['CV_EXTRACTION_TIMEOUT'] = float(os.getenv('CV_EXTRACTION_TIMEOUT', 30))
+    app.config['CV_EXTRACTION_MAX_ATTEMPTS'] = int(os.getenv('CV_EXTRACTION_MAX_ATTEMPTS', 3))
+    app.config['CV_EXTRACTION_RETRY_DELAY'] = float(os.getenv('CV_EXTRACTION_RETRY_DELAY', 10))
+
+    # 8. Recommendations
+    # `flask recommendations build` writes the model to RECOMMENDER_DIR (default
+    # instance/recommender); workers map it and check for a new build every
+    # RELOAD_INTERVAL seconds, folding in newer jobs every FOLD_INTERVAL.
+    app.config['RECOMMENDER_DIR'] = os.getenv('RECOMMENDER_DIR', '')
+    app.config['RECOMMENDER_RELOAD_INTERVAL'] = float(os.getenv('RECOMMENDER_RELOAD_INTERVAL', 10))
+    app.config['RECOMMENDER_FOLD_INTERVAL'] = float(os.getenv('RECOMMENDER_FOLD_INTERVAL', 30))
+
+    # 9. Saved Searches & Alerts
+    # New jobs are matched against saved searches through an in-memory index;
+    # each worker reloads it in full every ALERT_INDEX_RELOAD_INTERVAL seconds
+    # (new searches are picked up on every match).
+    app.config['MAX_SAVED_SEARCHES'] = int(os.getenv('MAX_SAVED_SEARCHES', 20))
+    app.config['ALERT_INDEX_RELOAD_INTERVAL'] = float(os.getenv('ALERT_INDEX_RELOAD_INTERVAL', 300))
+
+    # 10. Locations
+    # Job locations are resolved against an offline gazetteer CSV (default
+    # data/gazetteer.csv); MAX_RADIUS_KM caps /jobs?radius_km.
+    app.config['GAZETTEER_PATH'] = os.getenv('GAZETTEER_PATH', '')
+    app.config['MAX_RADIUS_KM'] = float(os.getenv('MAX_RADIUS_KM', 500))
+
+    # 11. CORS
+    # Comma-separated origins allowed to call the API with credentials.
+    app.config['CORS_ORIGINS'] = [o.strip() for o in os.getenv('CORS_ORIGINS', 'http://localhost:5173').split(',') if o.strip()]
+
+    # 12. Serving
+    # wsgi.py warms caches before gunicorn forks its workers (see warm_up()).
+    app.config['WARM_UP_ON_START'] = os.getenv('WARM_UP_ON_START', 'true').lower() == 'true'
+
+
+def init_extensions(app):
+    db.init_app(app)
+    database.init_app(app)
+    migrate.init_app(app, db)
+    bcrypt.init_app(app)
+    jwt.init_app(app)
+    cors.init_app(app, supports_credentials=True, origins=app.config['CORS_ORIGINS'])
@@ -0,0 +1,183 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from flask import jsonify
+from sqlalchemy import insert
+from config import db
+from models import ContactMessage
+
+logger = logging.getLogger(__name__)
+
+# ==========================================================
+# BATCHED CONTACT MESSAGE WRITER
+# ==========================================================
+# POST /api/contact only validates and enqueues; it never waits on the
+# database. A background thread drains the bounded queue and writes messages
+# in one multi-row INSERT per batch, flushing once CONTACT_BATCH_SIZE messages
+# are waiting or CONTACT_FLUSH_INTERVAL seconds after the oldest arrived.
+# When the queue is full (a spam burst, or the database is down long enough
+# to back it up) new messages get 503 + Retry-After instead of blocking.
+#
+# On interpreter exit the writer drains whatever is queued before stopping.
+# The queue is per process.
+
+FIELD_LIMITS = {'name': 100, 'email': 255, 'message': 5000}
+MAX_WRITE_ATTEMPTS = 5
+
+
+class ContactQueueFull(Exception):
+    def __init__(self, retry_after):
+        super().__init__("We are receiving a lot of messages, please try again shortly")
+        self.retry_after = retry_after
+
+
+class ContactWriter:
+    def __init__(self, app, max_size, batch_size, flush_interval, retry_after):
+        self.app = app
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_after = retry_after
+        self._queue = queue.Queue(max_size)
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.enqueued = 0
+        self.rejected = 0
+        self.written = 0
+        self.failed_batches = 0
+        self.dropped = 0
+
+    def submit(self, name, email, message):
+        self._ensure_started()
+        row = {"name": name, "email": email, "message": message, "created_at": datetime.utcnow()}
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            raise ContactQueueFull(self.retry_after)
+        with self._lock:
+            self.enqueued += 1
+
+    def _ensure_started(self):
+        # Threads don't survive fork(), so a pre-forked worker starts its own.
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(self._queue.maxsize)
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name='contact-writer', daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch:
+                self._write(batch)
+            elif self._stopping.is_set():
+                return
+
+    def _next_batch(self):
+        try:
+            first = self._queue.get(timeout=0.5)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stopping.is_set():
+                # Shutting down: take whatever is already queued, no waiting.
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except queue.Empty:
+                    break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        for attempt in range(1, MAX_WRITE_ATTEMPTS + 1):
+            try:
+                with self.app.app_context():
+                    db.session.execute(insert(ContactMessage), batch)
+                    db.session.commit()
+                with self._lock:
+                    self.written += len(batch)
+                return
+            except Exception:
+                with self._lock:
+                    self.failed_batches += 1
+                logger.exception("Writing %d contact messages failed (attempt %d)", len(batch), attempt)
+                if attempt < MAX_WRITE_ATTEMPTS and not self._stopping.is_set():
+                    time.sleep(min(2 ** attempt, 30))
+        # Last resort: keep the content in the log rather than lose it silently.
+        with self._lock:
+            self.dropped += len(batch)
+        for row in batch:
+            logger.error("Dropped contact message: %r", row)
+
+    def stop(self, timeout=10):
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "depth": self._queue.qsize(),
+                "capacity": self._queue.maxsize,
+                "enqueued": self.enqueued,
+                "rejected": self.rejected,
+                "written": self.written,
+                "failed_batches": self.failed_batches,
+                "dropped": self.dropped,
+            }
+
+
+writer = None
+
+
+def validate(data):
+    """Returns (fields, error message)."""
+    if not isinstance(data, dict):
+        return None, "All fields are required"
+    fields = {}
+    for field, max_length in FIELD_LIMITS.items():
+        value = data.get(field)
+        if not isinstance(value, str) or not value.strip():
+            return None, "All fields are required"
+        if len(value) > max_length:
+            return None, f"'{field}' is longer than {max_length} characters"
+        fields[field] = value.strip()
+    return fields, None
+
+
+def _queue_full(e):
+    response = jsonify({"msg": str(e)})
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response, 503
+
+
+def init_app(app):
+    global writer
+    writer = ContactWriter(
+        app,
+        max_size=app.config['CONTACT_QUEUE_SIZE'],
+        batch_size=app.config['CONTACT_BATCH_SIZE'],
+        flush_interval=app.config['CONTACT_FLUSH_INTERVAL'],
+        retry_after=app.config['CONTACT_QUEUE_RETRY_AFTER'],
+    )
+    app.register_error_handler(ContactQueueFull, _queue_full)
+    atexit.register(writer.stop)
@@ -0,0 +1,378 @@
+import atexit
+import logging
+import multiprocessing
+import os
+import queue
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import click
+from flask.cli import AppGroup
+from sqlalchemy import select, update, insert, func, literal_column, inspect, text, table, column, or_, and_
+from sqlalchemy.dialects import sqlite, postgresql
+from config import db
+from models import Job, Application, Resume, ResumeText
+import cv_storage
+import cv_text
+
+logger = logging.getLogger(__name__)
+
+# ==========================================================
+# BACKGROUND CV TEXT EXTRACTION
+# ==========================================================
+# Every stored CV gets a resume_texts row keyed by its SHA-256 (so a
+# re-upload of the same file is a no-op). Dispatcher threads claim pending
+# rows and run cv_text.extract_text() in a pool of worker *processes*, so slow
+# or CPU-heavy parsers never hold the GIL of a request thread. A parse that
+# outlives CV_EXTRACTION_TIMEOUT gets its pool killed and replaced.
+#
+# Failures are retried with backoff up to CV_EXTRACTION_MAX_ATTEMPTS; after
+# that the file is marked `poisoned` and skipped. Claiming bumps `attempts`
+# first, so a file that crashes the whole process is still counted.
+#
+# The text is indexed like jobs are (FTS5 on SQLite, a tsvector GIN index on
+# PostgreSQL) for GET /employer/candidates/search. Catch up on anything the
+# background threads missed (or after a restart) with:
+#
+#     flask cvs extract [--retry-poisoned]
+
+PENDING = 'pending'
+PROCESSING = 'processing'
+DONE = 'done'
+FAILED = 'failed'
+POISONED = 'poisoned'
+UNSUPPORTED = 'unsupported'
+
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS resume_texts_fts USING fts5(
+        text, content='resume_texts', content_rowid='id', tokenize='porter unicode61')""",
+    """CREATE TRIGGER IF NOT EXISTS resume_texts_fts_ai AFTER INSERT ON resume_texts BEGIN
+        INSERT INTO resume_texts_fts(rowid, text) VALUES (new.id, new.text);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS resume_texts_fts_ad AFTER DELETE ON resume_texts BEGIN
+        INSERT INTO resume_texts_fts(resume_texts_fts, rowid, text) VALUES ('delete', old.id, old.text);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS resume_texts_fts_au AFTER UPDATE OF text ON resume_texts BEGIN
+        INSERT INTO resume_texts_fts(resume_texts_fts, rowid, text) VALUES ('delete', old.id, old.text);
+        INSERT INTO resume_texts_fts(rowid, text) VALUES (new.id, new.text);
+    END""",
+]
+
+POSTGRES_DDL = [
+    """CREATE INDEX IF NOT EXISTS ix_resume_texts_search ON resume_texts
+        USING GIN (to_tsvector('english', coalesce(text, '')))""",
+]
+
+resume_texts_fts = table('resume_texts_fts', column('rowid'), column('rank'))
+
+_backend_cache = {}
+
+
+def search_backend():
+    engine = db.engine
+    if engine.url not in _backend_cache:
+        if engine.dialect.name == 'sqlite':
+            _backend_cache[engine.url] = 'fts5' if inspect(engine).has_table('resume_texts_fts') else None
+        elif engine.dialect.name == 'postgresql':
+            _backend_cache[engine.url] = 'tsvector'
+        else:
+            _backend_cache[engine.url] = None
+    return _backend_cache[engine.url]
+
+
+def ensure_search_index(connection):
+    if connection.dialect.name == 'sqlite':
+        statements = SQLITE_DDL
+    elif connection.dialect.name == 'postgresql':
+        statements = POSTGRES_DDL
+    else:
+        return
+    for statement in statements:
+        connection.execute(text(statement))
+
+
+# ==========================================================
+# 1. STATE TRANSITIONS
+# ==========================================================
+
+def register(sha256):
+    """Queue a file for extraction; a no-op if it was seen before. Runs in
+    the caller's transaction."""
+    values = {"sha256": sha256, "status": PENDING, "attempts": 0, "updated_at": datetime.utcnow()}
+    dialect = db.session.get_bind().dialect.name
+    insert_ = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}.get(dialect)
+    if insert_ is not None:
+        db.session.execute(insert_(ResumeText).values(**values).on_conflict_do_nothing(index_elements=['sha256']))
+    elif db.session.scalar(select(ResumeText.id).filter_by(sha256=sha256)) is None:
+        db.session.execute(insert(ResumeText).values(**values))
+
+
+def _claimable(max_attempts, stale_after):
+    now = datetime.utcnow()
+    return and_(
+        ResumeText.attempts < max_attempts,
+        or_(
+            ResumeText.status.in_((PENDING, FAILED)),
+            # A claim this old belonged to a process that died mid-parse.
+            and_(ResumeText.status == PROCESSING, ResumeText.claimed_at < now - stale_after),
+        ),
+    )
+
+
+def claim(sha256, max_attempts, stale_after):
+    now = datetime.utcnow()
+    result = db.session.execute(
+        update(ResumeText)
+        .where(ResumeText.sha256 == sha256, _claimable(max_attempts, stale_after))
+        .values(status=PROCESSING, attempts=ResumeText.attempts + 1, claimed_at=now, updated_at=now)
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+
+def _finish(sha256, **values):
+    db.session.execute(
+        update(ResumeText).where(ResumeText.sha256 == sha256).values(updated_at=datetime.utcnow(), **values)
+    )
+    db.session.commit()
+
+
+def complete(sha256, extracted):
+    _finish(sha256, status=DONE, text=extracted, error=None)
+
+
+def fail(sha256, error, max_attempts, permanent=False):
+    attempts = db.session.scalar(select(ResumeText.attempts).filter_by(sha256=sha256)) or 0
+    if permanent:
+        status = UNSUPPORTED
+    elif attempts >= max_attempts:
+        status = POISONED
+    else:
+        status = FAILED
+    _finish(sha256, status=status, error=str(error)[:500])
+    return status, attempts
+
+
+def release(sha256):
+    """Hand back a claim that was interrupted through no fault of the file."""
+    _finish(sha256, status=PENDING, attempts=ResumeText.attempts - 1)
+
+
+# ==========================================================
+# 2. PIPELINE
+# ==========================================================
+
+class ExtractionPipeline:
+    def __init__(self, app, workers, timeout, max_attempts, retry_delay):
+        self.app = app
+        self.workers = workers
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.stale_after = timedelta(seconds=timeout * 2)
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pool_pid = None
+        self._generation = 0
+        self._pid = None
+        self.extracted = 0
+        self.failed = 0
+        self.poisoned = 0
+        self.timeouts = 0
+
+    def submit(self, sha256):
+        self._ensure_started()
+        self._queue.put(sha256)
+
+    def _ensure_started(self):
+        # Threads and pools don't survive fork(); each worker process gets its own.
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._pool = None
+                for n in range(self.workers):
+                    threading.Thread(target=self._run, name=f'cv-extract-{n}', daemon=True).start()
+                self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            sha256 = self._queue.get()
+            try:
+                self.process(sha256)
+            except Exception:
+                logger.exception("CV extraction of %s crashed", sha256)
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                # spawn, not fork: the parent is a threaded web server.
+                context = multiprocessing.get_context('spawn')
+                self._pool = context.Pool(self.workers, maxtasksperchild=100)
+                self._pool_pid = os.getpid()
+            return self._pool, self._generation
+
+    def _kill_pool(self, generation):
+        with self._lock:
+            if self._generation == generation and self._pool is not None:
+                self._pool.terminate()
+                self._pool = None
+                self._generation += 1
+
+    def process(self, sha256, retry=True):
+        """Extract one file if it is claimable. Returns the resulting status,
+        or None when there was nothing to do."""
+        with self.app.app_context():
+            if not claim(sha256, self.max_attempts, self.stale_after):
+                return None
+            filename = db.session.scalar(select(Resume.filename).filter_by(sha256=sha256).limit(1)) or ''
+            path = cv_storage.blob_path(sha256)
+
+            try:
+                pool, generation = self._get_pool()
+                extracted = pool.apply_async(cv_text.extract_text, (path, filename)).get(self.timeout)
+            except cv_text.UnsupportedFormat as e:
+                return fail(sha256, e, self.max_attempts, permanent=True)[0]
+            except multiprocessing.TimeoutError:
+                if generation != self._generation:
+                    # Another file's timeout killed the pool under us.
+                    release(sha256)
+                    self._queue.put(sha256)
+                    return PENDING
+                self.timeouts += 1
+                self._kill_pool(generation)
+                error = f"Timed out after {self.timeout}s"
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            else:
+                complete(sha256, extracted)
+                self.extracted += 1
+                return DONE
+
+            status, attempts = fail(sha256, error, self.max_attempts)
+            if status == POISONED:
+                self.poisoned += 1
+                logger.error("Giving up on CV %s after %d attempts: %s", sha256, attempts, error)
+            else:
+                self.failed += 1
+                if retry:
+                    delay = self.retry_delay * 2 ** (attempts - 1)
+                    timer = threading.Timer(delay, self._queue.put, args=(sha256,))
+                    timer.daemon = True
+                    timer.start()
+            return status
+
+    def shutdown(self):
+        with self._lock:
+            # A forked child inherits the reference but not the pool itself.
+            if self._pool is not None and self._pool_pid == os.getpid():
+                self._pool.terminate()
+                self._pool.join()
+            self._pool = None
+
+    def stats(self):
+        return {
+            "queue_depth": self._queue.qsize(),
+            "extracted": self.extracted,
+            "failed": self.failed,
+            "poisoned": self.poisoned,
+            "timeouts": self.timeouts,
+        }
+
+
+pipeline = None
+
+
+# ==========================================================
+# 3. CANDIDATE SEARCH
+# ==========================================================
+
+def candidate_query(employer_id, keyword):
+    """Seekers who applied to one of `employer_id`'s jobs and whose CV text
+    matches `keyword`, as a subquery of (seeker_id, rank); lower rank is a
+    better match. Returns None when there is nothing to search for."""
+    terms = re.findall(r'\w+', keyword or '')
+    if not terms:
+        return None
+
+    applicants = select(Application.seeker_id).join(Job, Job.id == Application.job_id) \
+        .where(Job.employer_id == employer_id)
+    backend = search_backend()
+    if backend == 'fts5':
+        match = ' '.join('"%s"*' % t for t in terms)
+        # The hidden `rank` column (bm25 by default) rather than bm25() itself:
+        # SQLite flattens this subquery into the GROUP BY below, and auxiliary
+        # functions can't be called from there.
+        hits = select(resume_texts_fts.c.rowid.label('id'), resume_texts_fts.c.rank) \
+            .where(literal_column('resume_texts_fts').op('MATCH')(match)).subquery()
+        matched = select(ResumeText.sha256, hits.c.rank).join(hits, hits.c.id == ResumeText.id)
+    elif backend == 'tsvector':
+        vector = func.to_tsvector('english', func.coalesce(ResumeText.text, ''))
+        tsquery = func.to_tsquery('english', ' & '.join('%s:*' % t for t in terms))
+        matched = select(ResumeText.sha256, (-func.ts_rank_cd(vector, tsquery)).label('rank')) \
+            .where(vector.op('@@')(tsquery))
+    else:
+        conditions = [ResumeText.text.ilike(f'%{t}%') for t in terms]
+        matched = select(ResumeText.sha256, literal_column('0.0').label('rank')).where(*conditions)
+    matched = matched.where(ResumeText.status == DONE).subquery()
+
+    return (
+        select(Resume.seeker_id.label('seeker_id'), func.min(matched.c.rank).label('rank'),
+               func.max(Resume.id).label('resume_id'))
+        .join(matched, matched.c.sha256 == Resume.sha256)
+        .where(Resume.seeker_id.in_(applicants))
+        .group_by(Resume.seeker_id)
+        .subquery()
+    )
+
+
+# ==========================================================
+# CLI: flask cvs extract
+# ==========================================================
+cvs_cli = AppGroup('cvs', help='Manage CV text extraction.')
+
+
+@cvs_cli.command('extract')
+@click.option('--retry-poisoned', is_flag=True, help='Give poisoned and unsupported files another go.')
+def extract_command(retry_poisoned):
+    """Extract text from every stored CV that doesn't have it yet."""
+    with db.engine.begin() as connection:
+        ensure_search_index(connection)
+    _backend_cache.clear()
+
+    # Files stored before the pipeline existed (or whose row was lost).
+    missing = select(Resume.sha256).distinct().where(~Resume.sha256.in_(select(ResumeText.sha256)))
+    for sha256 in db.session.scalars(missing).all():
+        register(sha256)
+    if retry_poisoned:
+        db.session.execute(
+            update(ResumeText).where(ResumeText.status.in_((POISONED, UNSUPPORTED)))
+            .values(status=PENDING, attempts=0)
+        )
+    db.session.commit()
+
+    todo = db.session.scalars(
+        select(ResumeText.sha256).where(_claimable(pipeline.max_attempts, pipeline.stale_after))
+    ).all()
+    click.echo(f"Extracting {len(todo)} CV(s) with {pipeline.workers} worker process(es)...")
+    with ThreadPoolExecutor(pipeline.workers) as threads:
+        statuses = list(threads.map(lambda sha: pipeline.process(sha, retry=False), todo))
+    pipeline.shutdown()
+    for status in (DONE, FAILED, POISONED, UNSUPPORTED):
+        click.echo(f"  {status}: {statuses.count(status)}")
+
+
+def init_app(app):
+    global pipeline
+    pipeline = ExtractionPipeline(
+        app,
+        workers=app.config['CV_EXTRACTION_WORKERS'],
+        timeout=app.config['CV_EXTRACTION_TIMEOUT'],
+        max_attempts=app.config['CV_EXTRACTION_MAX_ATTEMPTS'],
+        retry_delay=app.config['CV_EXTRACTION_RETRY_DELAY'],
+    )
+    app.cli.add_command(cvs_cli)
+    atexit.register(pipeline.shutdown)
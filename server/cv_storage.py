@@ -0,0 +1,154 @@
+import hashlib
+import mimetypes
+import os
+import tempfile
+from flask import Request, request, current_app, send_file
+from sqlalchemy import select
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.utils import secure_filename
+from config import db
+from models import Job, Application, Resume
+
+# ==========================================================
+# CONTENT-ADDRESSED CV STORAGE
+# ==========================================================
+# Uploaded CVs are streamed straight to a temp file in CV_STORAGE_DIR in the
+# multipart parser's own chunks, SHA-256'd on the way, and then renamed to
+# <root>/<aa>/<bb>/<sha256>. Identical files are therefore stored once, no
+# matter how many seekers upload them; each upload is a Resume row pointing at
+# the digest. Nothing is ever held in memory whole.
+#
+# CV_MAX_BYTES is enforced twice: against Content-Length before the body is
+# read at all, and while streaming for chunked uploads that don't send one.
+
+ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx', 'txt', 'rtf', 'odt'}
+# Multipart boundaries and headers on top of the file itself.
+FORM_OVERHEAD_BYTES = 16 * 1024
+
+
+class HashingFile:
+    """Writable temp file that hashes and size-checks everything written to
+    it; werkzeug streams each uploaded file part into one of these."""
+
+    def __init__(self, directory, max_bytes):
+        os.makedirs(directory, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(dir=directory, prefix='upload-')
+        self._file = os.fdopen(fd, 'w+b')
+        self._hash = hashlib.sha256()
+        self.max_bytes = max_bytes
+        self.size = 0
+
+    def write(self, data):
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            self.discard()
+            raise RequestEntityTooLarge(f"CV is larger than {self.max_bytes} bytes")
+        self._hash.update(data)
+        return self._file.write(data)
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+    def __getattr__(self, name):
+        # read/seek/tell/flush for FileStorage
+        return getattr(self._file, name)
+
+    def persist(self, final_path):
+        self._file.close()
+        if os.path.exists(final_path):
+            os.unlink(self.path)  # already stored: this upload is a duplicate
+        else:
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            os.replace(self.path, final_path)
+        self.path = None
+
+    def discard(self):
+        self._file.close()
+        if self.path and os.path.exists(self.path):
+            os.unlink(self.path)
+        self.path = None
+
+    def close(self):
+        # Called by werkzeug when the request ends; drops anything not persisted.
+        self.discard()
+
+
+class CVRequest(Request):
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return HashingFile(os.path.join(storage_root(), 'tmp'), current_app.config['CV_MAX_BYTES'])
+
+
+def storage_root():
+    return current_app.config['CV_STORAGE_DIR'] or os.path.join(current_app.instance_path, 'cvs')
+
+
+def blob_path(sha256):
+    return os.path.join(storage_root(), sha256[:2], sha256[2:4], sha256)
+
+
+def check_content_length():
+    """Reject an oversized upload from its headers, before reading the body."""
+    limit = current_app.config['CV_MAX_BYTES'] + FORM_OVERHEAD_BYTES
+    if request.content_length is not None and request.content_length > limit:
+        raise RequestEntityTooLarge(f"CV is larger than {current_app.config['CV_MAX_BYTES']} bytes")
+
+
+def allowed_file(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+
+def store(seeker_id, file):
+    """Moves an uploaded FileStorage into the store; returns the Resume
+    (added to the session, not committed)."""
+    container = file.stream
+    filename = secure_filename(file.filename) or 'cv'
+    sha256 = container.hexdigest()
+    container.persist(blob_path(sha256))
+    resume = Resume(
+        seeker_id=seeker_id,
+        sha256=sha256,
+        filename=filename,
+        content_type=mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+        size=container.size,
+    )
+    db.session.add(resume)
+    return resume
+
+
+def can_view(user_id, resume):
+    """Seekers see their own CVs; employers see those of their applicants."""
+    if resume.seeker_id == user_id:
+        return True
+    return db.session.scalar(
+        select(Application.id)
+        .join(Job, Job.id == Application.job_id)
+        .where(Application.seeker_id == resume.seeker_id, Job.employer_id == user_id)
+        .limit(1)
+    ) is not None
+
+
+def latest_resume_id(seeker_id):
+    return db.session.scalar(
+        select(Resume.id).where(Resume.seeker_id == seeker_id).order_by(Resume.id.desc()).limit(1)
+    )
+
+
+def send_resume(resume):
+    # conditional=True answers Range and If-None-Match; the file itself goes
+    # out via wsgi.file_wrapper (sendfile) or X-Sendfile when USE_X_SENDFILE
+    # is on, never through Python buffers.
+    response = send_file(
+        blob_path(resume.sha256),
+        mimetype=resume.content_type,
+        as_attachment=True,
+        download_name=resume.filename,
+        conditional=True,
+        etag=resume.sha256,
+    )
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def init_app(app):
+    app.request_class = CVRequest
@@ -0,0 +1,135 @@
+import re
+import unicodedata
+import zipfile
+import zlib
+from xml.etree import ElementTree
+
+try:
+    import pypdf
+except ImportError:  # optional: the built-in PDF reader handles simple files
+    pypdf = None
+
+# ==========================================================
+# CV TEXT EXTRACTION (runs in worker processes)
+# ==========================================================
+# Pure functions, no app or database imports, so spawned pool workers stay
+# cheap to start. extract_text() returns normalized plain text or raises;
+# UnsupportedFormat means retrying can never help.
+
+MAX_TEXT_CHARS = 200_000
+MAX_INPUT_BYTES = 20 * 1024 * 1024
+
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+ODF_TEXT_NS = '{urn:oasis:names:tc:opendocument:xmlns:text:1.0}'
+
+
+class UnsupportedFormat(ValueError):
+    pass
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKC', text)
+    text = ''.join(ch if ch.isprintable() or ch in '\n\t' else ' ' for ch in text)
+    lines = (' '.join(line.split()) for line in text.splitlines())
+    text = '\n'.join(line for line in lines if line)
+    return text[:MAX_TEXT_CHARS]
+
+
+def _sniff(data, filename):
+    if data.startswith(b'%PDF'):
+        return 'pdf'
+    if data.startswith(b'PK\x03\x04'):
+        return 'odt' if filename.lower().endswith('.odt') else 'docx'
+    if data.startswith(b'{\\rtf'):
+        return 'rtf'
+    if data.startswith(b'\xd0\xcf\x11\xe0'):
+        return 'doc'
+    return 'txt'
+
+
+def _text(data):
+    for encoding in ('utf-8', 'utf-16'):
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return data.decode('latin-1')
+
+
+def _xml_text(archive, member, paragraph_tag, text_tags):
+    with archive.open(member) as f:
+        paragraphs, current = [], []
+        for event, element in ElementTree.iterparse(f, events=('end',)):
+            if element.tag in text_tags and element.text:
+                current.append(element.text)
+            elif element.tag == paragraph_tag:
+                paragraphs.append(''.join(current))
+                current = []
+                element.clear()
+        paragraphs.append(''.join(current))
+    return '\n'.join(paragraphs)
+
+
+def _docx(path):
+    with zipfile.ZipFile(path) as archive:
+        return _xml_text(archive, 'word/document.xml', WORD_NS + 'p', {WORD_NS + 't'})
+
+
+def _odt(path):
+    with zipfile.ZipFile(path) as archive:
+        return _xml_text(archive, 'content.xml', ODF_TEXT_NS + 'p', {ODF_TEXT_NS + 'p', ODF_TEXT_NS + 'span'})
+
+
+def _rtf(data):
+    text = _text(data)
+    text = re.sub(r'\\par[d]?', '\n', text)
+    text = re.sub(r"\\'[0-9a-f]{2}|\\[a-z]+-?\d* ?|[{}]", '', text)
+    return text
+
+
+_PDF_STREAM = re.compile(rb'stream\r?\n(.*?)\r?\nendstream', re.S)
+_PDF_STRING = re.compile(rb'\((?:\\.|[^\\)])*\)')
+
+
+def _pdf_builtin(data):
+    # Enough for text-layer PDFs from word processors: inflate each content
+    # stream and collect the string operands of Tj/TJ.
+    chunks = []
+    for match in _PDF_STREAM.finditer(data):
+        stream = match.group(1)
+        try:
+            stream = zlib.decompress(stream)
+        except zlib.error:
+            pass
+        for block in re.findall(rb'BT(.*?)ET', stream, re.S):
+            strings = [s[1:-1] for s in _PDF_STRING.findall(block)]
+            line = b''.join(strings)
+            line = re.sub(rb'\\([nrtbf()\\])', lambda m: {b'n': b'\n', b'r': b'', b't': b'\t'}.get(m.group(1), m.group(1)), line)
+            chunks.append(line.decode('latin-1'))
+    return '\n'.join(chunks)
+
+
+def _pdf(path, data):
+    if pypdf is not None:
+        reader = pypdf.PdfReader(path)
+        return '\n'.join(page.extract_text() or '' for page in reader.pages)
+    return _pdf_builtin(data)
+
+
+def extract_text(path, filename=''):
+    with open(path, 'rb') as f:
+        data = f.read(MAX_INPUT_BYTES)
+    kind = _sniff(data, filename)
+    if kind == 'pdf':
+        text = _pdf(path, data)
+    elif kind == 'docx':
+        text = _docx(path)
+    elif kind == 'odt':
+        text = _odt(path)
+    elif kind == 'rtf':
+        text = _rtf(data)
+    elif kind == 'doc':
+        raise UnsupportedFormat("Legacy .doc files are not supported")
+    else:
+        text = _text(data)
+    return normalize(text)
@@ -0,0 +1,140 @@
+import itertools
+import sqlite3
+import threading
+import time
+from functools import wraps
+from flask import g, request, has_request_context, current_app
+from flask_jwt_extended import get_jwt_identity
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, Insert, Update, Delete
+from sqlalchemy.engine import Engine, make_url
+
+# ==========================================================
+# ENGINE TUNING AND READ-REPLICA ROUTING
+# ==========================================================
+# Every SQLite connection gets the SQLITE_* pragmas when it is opened (WAL,
+# so readers no longer wait on the writer).
+#
+# With REPLICA_DATABASE_URLS set, each replica is an extra bind and views
+# marked @read_replica send their GET queries to one of them, round robin.
+# Writes always go to the primary, and so does everything after the first
+# write in a request. After a request that wrote, the same client reads from
+# the primary for READ_YOUR_WRITES_SECONDS so it sees its own change despite
+# replica lag: tracked per user in this process, and in a cookie so other
+# workers honour it too.
+
+REPLICA_BIND_PREFIX = 'replica-'
+PRIMARY_COOKIE = 'rc_primary_until'
+
+_pragmas = []
+_recent_writers = {}
+_recent_writers_lock = threading.Lock()
+_replica_cycle = None
+
+
+def is_memory_sqlite(url):
+    url = make_url(url)
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def replica_binds(urls):
+    """SQLALCHEMY_BINDS entries for a comma-separated list of replica URLs."""
+    urls = [url.strip() for url in (urls or '').split(',') if url.strip()]
+    return {f'{REPLICA_BIND_PREFIX}{i}': url for i, url in enumerate(urls)}
+
+
+@event.listens_for(Engine, 'connect')
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    for name, value in _pragmas:
+        cursor.execute(f'PRAGMA {name}={value}')
+    cursor.close()
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context():
+            if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+                g.db_wrote = True
+            elif g.get('db_replica') is not None and not g.get('db_wrote'):
+                return g.db_replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _identity():
+    try:
+        return get_jwt_identity()
+    except RuntimeError:  # view without @jwt_required
+        return None
+
+
+def _reads_from_primary():
+    now = time.time()
+    try:
+        if float(request.cookies.get(PRIMARY_COOKIE, 0)) > now:
+            return True
+    except ValueError:
+        pass
+    identity = _identity()
+    return identity is not None and _recent_writers.get(identity, 0) > now
+
+
+def pinned_to_primary():
+    """True when replicas are in use and this client wrote within the
+    read-your-writes window."""
+    return _replica_cycle is not None and _reads_from_primary()
+
+
+def read_replica(view):
+    """Route the view's GET queries to a replica, unless this client wrote
+    within the read-your-writes window."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if _replica_cycle is not None and request.method == 'GET' and not _reads_from_primary():
+            engines = current_app.extensions['sqlalchemy'].engines
+            g.db_replica = engines[next(_replica_cycle)]
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def _remember_write(response):
+    window = current_app.config['READ_YOUR_WRITES_SECONDS']
+    if _replica_cycle is None or not window or not g.get('db_wrote') or response.status_code >= 400:
+        return response
+    until = time.time() + window
+    response.set_cookie(PRIMARY_COOKIE, f'{until:.3f}', max_age=int(window) + 1, httponly=True, samesite='Lax')
+    identity = _identity()
+    if identity is not None:
+        with _recent_writers_lock:
+            if len(_recent_writers) > 10000:
+                now = time.time()
+                for key in [k for k, expires in _recent_writers.items() if expires <= now]:
+                    del _recent_writers[key]
+            _recent_writers[identity] = until
+    return response
+
+
+def after_fork(app):
+    """Give a forked worker its own connections. The pools inherited from
+    the parent are dropped without closing the parent's sockets; engines,
+    and the SQL they have compiled, are kept."""
+    with app.app_context():
+        for engine in app.extensions['sqlalchemy'].engines.values():
+            engine.dispose(close=False)
+
+
+def init_app(app):
+    global _replica_cycle
+    _pragmas[:] = [
+        ('journal_mode', app.config['SQLITE_JOURNAL_MODE']),
+        ('synchronous', app.config['SQLITE_SYNCHRONOUS']),
+        ('busy_timeout', app.config['SQLITE_BUSY_TIMEOUT_MS']),
+        ('cache_size', -app.config['SQLITE_CACHE_SIZE_KB']),
+        ('mmap_size', app.config['SQLITE_MMAP_SIZE']),
+        ('temp_store', 'MEMORY'),
+    ]
+    replicas = sorted(key for key in app.config.get('SQLALCHEMY_BINDS') or {} if key.startswith(REPLICA_BIND_PREFIX))
+    _replica_cycle = itertools.cycle(replicas) if replicas else None
+    app.after_request(_remember_write)
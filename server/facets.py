@@ -0,0 +1,218 @@
+import threading
+import time
+from collections import Counter
+from sqlalchemy import event, inspect, func, case
+from sqlalchemy.orm import Session
+from models import Job
+
+# ==========================================================
+# JOB FACET COUNTS
+# ==========================================================
+# GET /jobs/facets returns how many jobs match each category, location,
+# job_type and salary bucket. All four come out of one GROUP BY over the
+# filtered jobs, folded into per-facet counts here.
+#
+# The unfiltered counts (the landing page) are cached per process and kept
+# current from the session: every commit that creates, deletes or re-files a
+# Job applies its +1/-1 to the cached counters, so that view runs no SQL.
+# Core statements that write `jobs` directly must call invalidate() (the next
+# request recounts). Other workers' writes are picked up when the cache
+# expires after FACET_CACHE_TTL seconds.
+
+FACETS = ('category', 'location', 'job_type', 'salary')
+# salary_max buckets: (label, lower bound inclusive, upper bound exclusive)
+SALARY_BUCKETS = (
+    ('under_30k', None, 30000),
+    ('30k_50k', 30000, 50000),
+    ('50k_80k', 50000, 80000),
+    ('80k_120k', 80000, 120000),
+    ('120k_plus', 120000, None),
+)
+UNSPECIFIED = 'unspecified'
+MAX_VALUES = 100  # per facet, most common first
+# Job columns the facets are computed from
+FIELDS = ('category', 'location', 'job_type', 'salary_max')
+
+
+def salary_bucket(salary_max):
+    if salary_max is None:
+        return UNSPECIFIED
+    for label, _, high in SALARY_BUCKETS:
+        if high is None or salary_max < high:
+            return label
+    return UNSPECIFIED
+
+
+def _salary_bucket_expression():
+    return case(
+        (Job.salary_max.is_(None), UNSPECIFIED),
+        *[(Job.salary_max < high, label) for label, _, high in SALARY_BUCKETS if high is not None],
+        else_=SALARY_BUCKETS[-1][0],
+    )
+
+
+def _empty():
+    return {facet: Counter() for facet in FACETS}
+
+
+def grouped(query):
+    """`query` (a Job query) regrouped to one row per distinct combination of
+    facet values; served from the covering ix_jobs_facets index."""
+    bucket = _salary_bucket_expression()
+    return query.order_by(None).with_entities(Job.category, Job.location, Job.job_type, bucket, func.count()) \
+        .group_by(Job.category, Job.location, Job.job_type, bucket)
+
+
+def count(query):
+    """({facet: Counter}, total) for the jobs `query` selects."""
+    counts = _empty()
+    total = 0
+    for category, location, job_type, salary, n in grouped(query):
+        counts['category'][category] += n
+        counts['location'][location] += n
+        counts['job_type'][job_type] += n
+        counts['salary'][salary] += n
+        total += n
+    return counts, total
+
+
+def to_dict(counts, total):
+    facets = {}
+    for facet in FACETS:
+        values = sorted(((v, n) for v, n in counts[facet].items() if n > 0), key=lambda item: (-item[1], str(item[0])))
+        facets[facet] = [{"value": value, "count": n} for value, n in values[:MAX_VALUES]]
+    order = {label: i for i, (label, _, _) in enumerate(SALARY_BUCKETS)}
+    facets['salary'].sort(key=lambda item: order.get(item['value'], len(order)))
+    return {"total": total, "facets": facets}
+
+
+# ==========================================================
+# UNFILTERED COUNTS CACHE
+# ==========================================================
+
+class FacetCache:
+    def __init__(self, ttl=60.0):
+        self.ttl = ttl
+        self._counts = None
+        self._total = 0
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        # Bumped on every change; a recount that raced one is not stored.
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.updates = 0
+
+    def get(self, load):
+        with self._lock:
+            if self._counts is not None and time.monotonic() < self._expires_at:
+                self.hits += 1
+                return to_dict(self._counts, self._total)
+            self.misses += 1
+            version = self.version
+        counts, total = load()
+        with self._lock:
+            if version == self.version:
+                self._counts, self._total = counts, total
+                self._expires_at = time.monotonic() + self.ttl
+        return to_dict(counts, total)
+
+    def apply(self, deltas, total_delta):
+        with self._lock:
+            self.version += 1
+            if self._counts is None:
+                return
+            for (facet, value), delta in deltas.items():
+                self._counts[facet][value] += delta
+            self._total += total_delta
+            self.updates += 1
+
+    def invalidate(self):
+        with self._lock:
+            self.version += 1
+            self._counts = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "cached": int(self._counts is not None),
+                "hits": self.hits,
+                "misses": self.misses,
+                "updates": self.updates,
+            }
+
+
+cache = FacetCache()
+
+
+def unfiltered():
+    return cache.get(lambda: count(Job.query))
+
+
+def invalidate():
+    cache.invalidate()
+
+
+def _facet_values(values):
+    return {
+        'category': values['category'],
+        'location': values['location'],
+        'job_type': values['job_type'],
+        'salary': salary_bucket(values['salary_max']),
+    }
+
+
+def _previous_values(state):
+    values = {}
+    for key in FIELDS:
+        history = state.attrs[key].history
+        values[key] = history.deleted[0] if history.deleted else getattr(state.obj(), key)
+    return values
+
+
+def _current_values(job):
+    return {key: getattr(job, key) for key in FIELDS}
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changes(session, flush_context):
+    deltas = session.info.setdefault('facet_deltas', Counter())
+    total = session.info.get('facet_total_delta', 0)
+
+    def add(values, sign):
+        for facet, value in _facet_values(values).items():
+            deltas[(facet, value)] += sign
+
+    for obj in session.new:
+        if isinstance(obj, Job):
+            add(_current_values(obj), 1)
+            total += 1
+    for obj in session.dirty:
+        if isinstance(obj, Job):
+            state = inspect(obj)
+            if any(state.attrs[key].history.has_changes() for key in FIELDS):
+                add(_previous_values(state), -1)
+                add(_current_values(obj), 1)
+    for obj in session.deleted:
+        if isinstance(obj, Job):
+            add(_previous_values(inspect(obj)), -1)
+            total -= 1
+    session.info['facet_total_delta'] = total
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_on_commit(session):
+    deltas = session.info.pop('facet_deltas', None)
+    total = session.info.pop('facet_total_delta', 0)
+    if deltas or total:
+        cache.apply({key: delta for key, delta in (deltas or {}).items() if delta}, total)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_on_rollback(session):
+    session.info.pop('facet_deltas', None)
+    session.info.pop('facet_total_delta', None)
+
+
+def init_app(app):
+    cache.ttl = app.config['FACET_CACHE_TTL']
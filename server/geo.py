@@ -0,0 +1,303 @@
+import csv
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import namedtuple
+from functools import lru_cache
+import click
+from flask.cli import AppGroup
+from sqlalchemy import event, inspect, select, update, bindparam, func, and_, or_
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from config import db
+from models import Job
+
+# ==========================================================
+# LOCATION NORMALIZATION AND RADIUS SEARCH
+# ==========================================================
+# Free-text job locations ("Nairobi", "Austin, TX", "London, UK") are
+# resolved against an offline gazetteer (data/gazetteer.csv) to a canonical
+# place_id and, for cities, a latitude/longitude. Jobs get them on every
+# write: ORM flushes through a before_flush hook, bulk imports per row. Rows
+# written before this existed are filled in by:
+#
+#     flask geo backfill [--all]
+#
+# GET /jobs?lat=&lon=&radius_km= first narrows to the bounding box of the
+# circle, a range over ix_jobs_latitude_longitude, then keeps the rows whose
+# haversine distance is within the radius. Jobs cluster on city centres, so
+# a circle around a hub can hold a large share of the table; for those the
+# listing walks the newest-first index instead and stops after one page (see
+# is_dense()). Only jobs with coordinates can match: "Remote", a country or
+# a region has a place_id but no point.
+#
+# Resolution: the text is split on commas, the first part names the place
+# and the rest qualify it (a region or country name or code). The most
+# populous city that fits the qualifiers wins, then a region, then a country.
+
+EARTH_RADIUS_KM = 6371.0088
+DEFAULT_GAZETTEER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'gazetteer.csv')
+
+Place = namedtuple('Place', ['place_id', 'kind', 'name', 'region', 'country_code', 'latitude', 'longitude', 'population'])
+
+KIND_ORDER = ('city', 'region', 'country')
+
+# Above this many matches a newest-first page is cheaper to find by walking
+# ix_jobs_created_at_id than by sorting everything in the box.
+DENSE_MATCHES = 1000
+
+
+class RadiusError(ValueError):
+    pass
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    return ' '.join(re.findall(r'[a-z0-9]+', text))
+
+
+# ==========================================================
+# GAZETTEER
+# ==========================================================
+
+class Gazetteer:
+    def __init__(self, path=DEFAULT_GAZETTEER):
+        self.path = path
+        self._names = None  # normalized name or alias -> {kind: [Place, ...]}
+        self._lock = threading.Lock()
+
+    def _load(self):
+        names = {}
+        with open(self.path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                place = Place(
+                    row['place_id'], row['kind'], row['name'], row['region'] or None, row['country_code'],
+                    float(row['latitude']) if row['latitude'] else None,
+                    float(row['longitude']) if row['longitude'] else None,
+                    int(row['population'] or 0),
+                )
+                aliases = [row['name']] + [a for a in row['aliases'].split('|') if a]
+                for alias in {normalize(a) for a in aliases}:
+                    names.setdefault(alias, {}).setdefault(place.kind, []).append(place)
+        for kinds in names.values():
+            for places in kinds.values():
+                places.sort(key=lambda p: -p.population)
+        return names
+
+    @property
+    def names(self):
+        if self._names is None:
+            with self._lock:
+                if self._names is None:
+                    self._names = self._load()
+        return self._names
+
+    def _qualifier(self, text):
+        """(country codes, (country, region) pairs) `text` could stand for."""
+        kinds = self.names.get(text, {})
+        countries = {p.country_code for p in kinds.get('country', ())}
+        regions = {(p.country_code, p.region) for p in kinds.get('region', ())}
+        return countries, regions
+
+    def resolve(self, location):
+        parts = [normalize(part) for part in (location or '').split(',')]
+        parts = [part for part in parts if part]
+        if not parts:
+            return None
+        # "Austin TX": the longest leading run of words that names a place,
+        # the remaining words qualify it like a comma-separated part would.
+        words = parts[0].split()
+        for n in range(len(words), 0, -1):
+            kinds = self.names.get(' '.join(words[:n]))
+            if kinds is not None:
+                parts[1:1] = [' '.join(words[n:])] if n < len(words) else []
+                break
+        else:
+            return None
+        qualifiers = [q for q in map(self._qualifier, parts[1:]) if q != (set(), set())]
+
+        def fits(place):
+            return all(
+                place.country_code in countries or (place.country_code, place.region) in regions
+                for countries, regions in qualifiers
+            )
+
+        for kind in KIND_ORDER:
+            for place in kinds.get(kind, ()):
+                if fits(place):
+                    return place
+        return None
+
+    def stats(self):
+        return {"names": len(self.names), "resolved": resolve.cache_info().currsize}
+
+
+gazetteer = Gazetteer()
+
+
+@lru_cache(maxsize=16384)
+def resolve(location):
+    """The Place `location` names, or None if the gazetteer doesn't know it."""
+    return gazetteer.resolve(location)
+
+
+def location_columns(location):
+    """latitude, longitude and place_id for a job at `location`."""
+    place = resolve(location)
+    if place is None:
+        return {'latitude': None, 'longitude': None, 'place_id': None}
+    return {'latitude': place.latitude, 'longitude': place.longitude, 'place_id': place.place_id}
+
+
+@event.listens_for(Session, 'before_flush')
+def _geocode_jobs(session, flush_context, instances):
+    for obj in (*session.new, *session.dirty):
+        if not isinstance(obj, Job):
+            continue
+        if obj in session.new or inspect(obj).attrs.location.history.has_changes():
+            for key, value in location_columns(obj.location).items():
+                setattr(obj, key, value)
+
+
+# ==========================================================
+# RADIUS FILTER
+# ==========================================================
+
+def _float_arg(args, name, low, high):
+    try:
+        value = float(args.get(name))
+    except (TypeError, ValueError):
+        raise RadiusError(f"{name} must be a number")
+    if not low <= value <= high or math.isnan(value):
+        raise RadiusError(f"{name} must be between {low:g} and {high:g}")
+    return value
+
+
+def parse_radius(args, max_radius_km):
+    """(lat, lon, radius_km) from the request args, None if none were given."""
+    given = [name for name in ('lat', 'lon', 'radius_km') if args.get(name)]
+    if not given:
+        return None
+    if len(given) < 3:
+        raise RadiusError("lat, lon and radius_km must be given together")
+    radius_km = _float_arg(args, 'radius_km', 0, max_radius_km)
+    if radius_km <= 0:
+        raise RadiusError("radius_km must be greater than 0")
+    return _float_arg(args, 'lat', -90, 90), _float_arg(args, 'lon', -180, 180), radius_km
+
+
+def bounding_box(lat, lon, radius_km):
+    """(min_lat, max_lat, lon_ranges) enclosing the circle; lon_ranges is
+    empty when the circle covers a pole (every longitude)."""
+    angle = radius_km / EARTH_RADIUS_KM
+    dlat = math.degrees(angle)
+    min_lat, max_lat = lat - dlat, lat + dlat
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90.0), min(max_lat, 90.0), []
+    dlon = math.degrees(math.asin(min(1.0, math.sin(angle) / math.cos(math.radians(lat)))))
+    min_lon, max_lon = lon - dlon, lon + dlon
+    if min_lon < -180:
+        return min_lat, max_lat, [(min_lon + 360, 180.0), (-180.0, max_lon)]
+    if max_lon > 180:
+        return min_lat, max_lat, [(min_lon, 180.0), (-180.0, max_lon - 360)]
+    return min_lat, max_lat, [(min_lon, max_lon)]
+
+
+def within_radius(lat, lon, radius_km, use_index=True):
+    """Job filter: within `radius_km` of (lat, lon)."""
+    latitude, longitude = Job.latitude, Job.longitude
+    min_lat, max_lat, lon_ranges = bounding_box(lat, lon, radius_km)
+    if not use_index:
+        # An expression, so the planner can't pick ix_jobs_latitude_longitude.
+        latitude, longitude = Job.latitude + 0, Job.longitude + 0
+    conditions = [latitude.between(min_lat, max_lat)]
+    if lon_ranges:
+        conditions.append(or_(*(longitude.between(low, high) for low, high in lon_ranges)))
+
+    # Haversine: hav(d/R) = hav(dlat) + cos(lat1) cos(lat2) hav(dlon) <= hav(radius/R)
+    to_rad = math.pi / 180
+    half_dlat = func.sin((Job.latitude * to_rad - math.radians(lat)) / 2)
+    half_dlon = func.sin((Job.longitude * to_rad - math.radians(lon)) / 2)
+    hav = half_dlat * half_dlat + math.cos(math.radians(lat)) * func.cos(Job.latitude * to_rad) * half_dlon * half_dlon
+    conditions.append(hav <= math.sin(radius_km / EARTH_RADIUS_KM / 2) ** 2)
+    return and_(*conditions)
+
+
+def density_probe(lat, lon, radius_km):
+    """The DENSE_MATCHES-th match, if there is one, off the bounding-box
+    index; stops reading there."""
+    return select(Job.id).where(within_radius(lat, lon, radius_km)).offset(DENSE_MATCHES - 1).limit(1)
+
+
+def is_dense(lat, lon, radius_km):
+    return db.session.scalar(density_probe(lat, lon, radius_km)) is not None
+
+
+# SQLite only has sin()/cos() when built with its math functions; register
+# Python's on connections that lack them.
+@event.listens_for(Engine, 'connect')
+def _sqlite_math_functions(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    try:
+        dbapi_connection.execute('SELECT sin(0), cos(0)')
+    except sqlite3.OperationalError:
+        dbapi_connection.create_function('sin', 1, math.sin, deterministic=True)
+        dbapi_connection.create_function('cos', 1, math.cos, deterministic=True)
+
+
+# ==========================================================
+# CLI: flask geo backfill / resolve
+# ==========================================================
+geo_cli = AppGroup('geo', help='Location normalization against the offline gazetteer.')
+
+BACKFILL = update(Job).where(Job.id == bindparam('job_id')).values(
+    latitude=bindparam('lat'), longitude=bindparam('lon'), place_id=bindparam('pid'))
+
+
+@geo_cli.command('backfill')
+@click.option('--all', 'everything', is_flag=True, help='Re-resolve every job, not only the unresolved ones.')
+@click.option('--batch-size', type=int, default=5000, show_default=True)
+def backfill_command(everything, batch_size):
+    """Fill in place_id and coordinates for existing jobs."""
+    started = time.perf_counter()
+    query = select(Job.id, Job.location).order_by(Job.id).limit(batch_size)
+    if not everything:
+        query = query.where(Job.place_id.is_(None))
+    last_id = seen = resolved = 0
+    while True:
+        batch = db.session.execute(query.where(Job.id > last_id)).all()
+        if not batch:
+            break
+        rows = []
+        for job_id, location in batch:
+            columns = location_columns(location)
+            if columns['place_id'] is not None or everything:
+                rows.append({'job_id': job_id, 'lat': columns['latitude'], 'lon': columns['longitude'],
+                             'pid': columns['place_id']})
+            resolved += columns['place_id'] is not None
+        if rows:
+            db.session.connection().execute(BACKFILL, rows)
+        db.session.commit()
+        seen += len(batch)
+        last_id = batch[-1].id
+    click.echo(f"Resolved {resolved:,} of {seen:,} job locations in {time.perf_counter() - started:.2f}s "
+               f"({resolve.cache_info().currsize:,} distinct).")
+
+
+@geo_cli.command('resolve')
+@click.argument('location')
+def resolve_command(location):
+    """Show what a location string resolves to."""
+    place = resolve(location)
+    click.echo(repr(place) if place else f"{location!r} is not in the gazetteer.")
+
+
+def init_app(app):
+    gazetteer.path = app.config['GAZETTEER_PATH'] or DEFAULT_GAZETTEER
+    app.cli.add_command(geo_cli)
@@ -0,0 +1,41 @@
+# gunicorn settings for `gunicorn -c gunicorn.conf.py wsgi:app`; every
+# value can be overridden from the environment.
+import multiprocessing
+import os
+
+bind = os.getenv('BIND', '0.0.0.0:5000')
+
+# Prefork: the master imports and warms the app once (preload_app), then
+# forks the workers from it, so starting or recycling a worker costs a
+# fork rather than an import.
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+# Recycle workers after this many requests (0 = never), jittered so they
+# don't all restart together.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+
+# Startup timings ("App ready in ...") from wsgi.py at INFO. gunicorn keeps
+# its own loggers; everything else goes to stderr from WARNING up.
+logconfig_dict = {
+    'root': {'level': 'WARNING', 'handlers': ['error_console']},
+    'loggers': {
+        'wsgi': {'level': os.getenv('WSGI_LOG_LEVEL', 'INFO'), 'handlers': ['error_console'], 'propagate': False},
+    },
+}
+
+
+def post_fork(server, worker):
+    # Connections are never shared with the parent; each worker opens its own.
+    import database
+    from wsgi import app
+    database.after_fork(app)
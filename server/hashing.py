@@ -0,0 +1,102 @@
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from flask import jsonify, current_app
+from config import bcrypt
+import metrics
+
+# ==========================================================
+# PASSWORD HASHING POOL
+# ==========================================================
+# bcrypt is deliberately slow (~250ms at cost 12). Running it inline lets a
+# login spike occupy every request thread. Instead hashes run on a small
+# dedicated pool with a bounded backlog; once that is full, new logins and
+# registrations are turned away with 503 + Retry-After rather than queueing
+# behind each other and starving cheap endpoints like /jobs.
+
+_COST = re.compile(r'^\$2[abxy]?\$(\d{2})\$')
+
+
+class HashingPoolSaturated(Exception):
+    def __init__(self, retry_after):
+        super().__init__("Password hashing is saturated, try again shortly")
+        self.retry_after = retry_after
+
+
+class HashingPool:
+    def __init__(self, workers, backlog, timeout, retry_after):
+        self.workers = workers
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._slots = threading.BoundedSemaphore(workers + backlog) if workers else None
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix='bcrypt') if workers else None
+
+    def run(self, fn, *args):
+        # workers == 0 hashes inline on the request thread (benchmark baseline).
+        if self._executor is None:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            raise HashingPoolSaturated(self.retry_after)
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            # The hash keeps its slot until it finishes; the caller is told
+            # to retry like any other overload.
+            raise HashingPoolSaturated(self.retry_after)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+
+pool = None
+
+
+def hash_password(password):
+    return pool.run(metrics.timed_password_hash('hash', bcrypt.generate_password_hash), password).decode('utf-8')
+
+
+def check_password(password_hash, password):
+    return pool.run(metrics.timed_password_hash('check', bcrypt.check_password_hash), password_hash, password)
+
+
+def hash_cost(password_hash):
+    match = _COST.match(password_hash or '')
+    return int(match.group(1)) if match else None
+
+
+def needs_rehash(password_hash):
+    return hash_cost(password_hash) != current_app.config['BCRYPT_LOG_ROUNDS']
+
+
+def verify_password(user, password):
+    """Checks `password` for `user`, upgrading the stored hash in place when
+    BCRYPT_LOG_ROUNDS has changed. The caller commits."""
+    if not password or not check_password(user.password_hash, password):
+        return False
+    if needs_rehash(user.password_hash):
+        user.password_hash = hash_password(password)
+    return True
+
+
+def _saturated(e):
+    response = jsonify({"msg": str(e)})
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response, 503
+
+
+def init_app(app):
+    global pool
+    pool = HashingPool(
+        workers=app.config['PASSWORD_HASH_WORKERS'],
+        backlog=app.config['PASSWORD_HASH_BACKLOG'],
+        timeout=app.config['PASSWORD_HASH_TIMEOUT'],
+        retry_after=app.config['PASSWORD_HASH_RETRY_AFTER'],
+    )
+    app.register_error_handler(HashingPoolSaturated, _saturated)
@@ -0,0 +1,29 @@
+from sqlalchemy.orm import selectinload, joinedload
+from models import User, Job
+
+# ==========================================================
+# RELATIONSHIP LOADING PROFILES
+# ==========================================================
+# Every relationship in models.py is lazy=True, so serializing a page of jobs
+# would otherwise issue one query per job for `applications` plus one per
+# employer for `employer.applications`. These profiles load exactly what the
+# Job serializer walks, in a fixed number of queries per request. They are
+# keyed by the top-level field that needs them so ?fields= projections only
+# load what they return.
+
+# Listing: the many-to-one employer rides along in the main query; the
+# collections are fetched with one IN (...) query each for the whole page.
+JOB_LIST = {
+    'employer': joinedload(Job.employer).selectinload(User.applications),
+    'applications': selectinload(Job.applications),
+}
+
+# Detail: a single row, so joining its applications costs no fan-out.
+JOB_DETAIL = {
+    'employer': joinedload(Job.employer).selectinload(User.applications),
+    'applications': joinedload(Job.applications),
+}
+
+
+def job_load_options(profile, fields=None):
+    return tuple(opt for key, opt in profile.items() if fields is None or key in fields)
@@ -0,0 +1,213 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sql_guard import statement_count
+
+logger = logging.getLogger(__name__)
+
+# ==========================================================
+# REQUEST & SQL METRICS
+# ==========================================================
+# Per-endpoint latency, response size, SQL statement count and DB time per
+# request, and bcrypt time, kept in fixed-bucket histograms and rendered in
+# the Prometheus text format at GET /metrics. Recording is a few
+# perf_counter() calls and a bisect under a per-metric lock, cheap enough to
+# leave on under load. Endpoints are labelled by URL rule ("/jobs/<int:id>"),
+# never the raw path, so label cardinality stays bounded.
+#
+# With SLOW_REQUEST_MS set, requests slower than that are logged together
+# with the SQL they ran. Metrics are per process; scrape every worker.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+MAX_LOGGED_STATEMENTS = 50
+
+_enabled = False
+_slow_threshold = 0.0  # seconds; 0 disables slow-request logging
+
+
+class Counter:
+    def __init__(self, name, help, labels):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, labels, buckets):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}  # label values -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, label_values, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = sorted((k, list(v)) for k, v in self._series.items())
+        for label_values, series in snapshot:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), series):
+                cumulative += count
+                labels = _labels((*self.labels, 'le'), (*label_values, bound))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def _labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return '{' + pairs + '}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REQUESTS = Counter('http_requests_total', 'Requests by endpoint and status.', ('method', 'endpoint', 'status'))
+LATENCY = Histogram('http_request_duration_seconds', 'Request latency.', ('method', 'endpoint'), LATENCY_BUCKETS)
+RESPONSE_SIZE = Histogram('http_response_size_bytes', 'Response body size.', ('method', 'endpoint'), SIZE_BUCKETS)
+SQL_STATEMENTS = Histogram('db_statements_per_request', 'SQL statements per request.', ('method', 'endpoint'), COUNT_BUCKETS)
+SQL_TIME = Histogram('db_time_per_request_seconds', 'Time spent in SQL per request.', ('method', 'endpoint'), LATENCY_BUCKETS)
+PASSWORD_HASH = Histogram('password_hash_duration_seconds', 'bcrypt time per hash or check.', ('operation',), LATENCY_BUCKETS)
+SLOW_REQUESTS = Counter('http_slow_requests_total', 'Requests slower than SLOW_REQUEST_MS.', ('method', 'endpoint'))
+
+_METRICS = [REQUESTS, LATENCY, RESPONSE_SIZE, SQL_STATEMENTS, SQL_TIME, PASSWORD_HASH, SLOW_REQUESTS]
+_gauges = {}  # prefix -> callable returning {name: number}
+
+
+def register_gauges(prefix, collect):
+    """Expose the numeric values of `collect()` as `<prefix>_<key>` gauges."""
+    _gauges[prefix] = collect
+
+
+def timed_password_hash(operation, fn):
+    def run(*args):
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            PASSWORD_HASH.observe((operation,), time.perf_counter() - started)
+    return run
+
+
+def render():
+    lines = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    for prefix, collect in _gauges.items():
+        for key, value in collect().items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                lines.append(f"# TYPE {prefix}_{key} gauge")
+                lines.append(f"{prefix}_{key} {value}")
+    return '\n'.join(lines) + '\n'
+
+
+# ==========================================================
+# SQL TIMING
+# ==========================================================
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_statement(conn, cursor, statement, parameters, context, executemany):
+    if _enabled and has_request_context():
+        conn.info.setdefault('metrics_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _end_statement(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('metrics_started')
+    if not started or not has_request_context():
+        return
+    elapsed = time.perf_counter() - started.pop()
+    g.sql_time = g.get('sql_time', 0.0) + elapsed
+    log = g.get('sql_log')
+    if log is not None and len(log) < MAX_LOGGED_STATEMENTS:
+        log.append((elapsed, statement))
+
+
+@event.listens_for(Engine, 'handle_error')
+def _failed_statement(context):
+    started = context.connection.info.get('metrics_started') if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+# ==========================================================
+# REQUEST HOOKS
+# ==========================================================
+
+def _start_request():
+    g.request_started = time.perf_counter()
+    if _slow_threshold:
+        g.sql_log = []
+
+
+def _record_request(response):
+    started = g.pop('request_started', None)
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    endpoint = request.url_rule.rule if request.url_rule else '<unmatched>'
+    labels = (request.method, endpoint)
+    statements = statement_count()
+    sql_time = g.get('sql_time', 0.0)
+
+    REQUESTS.inc((request.method, endpoint, response.status_code))
+    LATENCY.observe(labels, elapsed)
+    SQL_STATEMENTS.observe(labels, statements)
+    SQL_TIME.observe(labels, sql_time)
+    if not response.is_streamed:
+        RESPONSE_SIZE.observe(labels, response.calculate_content_length() or 0)
+
+    if _slow_threshold and elapsed >= _slow_threshold:
+        SLOW_REQUESTS.inc(labels)
+        log = g.get('sql_log') or []
+        lines = [f"  {t * 1000:8.2f} ms  {' '.join(s.split())}" for t, s in sorted(log, reverse=True)]
+        logger.warning(
+            "Slow request: %s %s took %.1f ms (status %s, %d SQL statements, %.1f ms in SQL)%s",
+            request.method, request.full_path.rstrip('?'), elapsed * 1000, response.status_code,
+            statements, sql_time * 1000, ''.join('\n' + line for line in lines),
+        )
+    return response
+
+
+def init_app(app):
+    global _enabled, _slow_threshold
+    _enabled = app.config['METRICS_ENABLED']
+    if not _enabled:
+        return
+    _slow_threshold = app.config['SLOW_REQUEST_MS'] / 1000.0
+    app.before_request(_start_request)
+    app.after_request(_record_request)
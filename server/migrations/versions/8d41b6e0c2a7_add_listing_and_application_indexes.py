@@ -0,0 +1,36 @@
+"""add listing and application indexes
+
+Revision ID: 8d41b6e0c2a7
+Revises: 3f9a2c71d8e4
+Create Date: 2026-10-18 19:40:52.103871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d41b6e0c2a7'
+down_revision = '3f9a2c71d8e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Rows from before created_at existed would fall out of the keyset
+    # pagination order; give them a timestamp the index can sort.
+    op.execute(sa.text("UPDATE jobs SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL"))
+
+    op.create_index('ix_jobs_created_at_id', 'jobs', ['created_at', 'id'], unique=False)
+    op.create_index('ix_jobs_category_created_at_id', 'jobs', ['category', 'created_at', 'id'], unique=False)
+    op.create_index('ix_jobs_employer_id_created_at_id', 'jobs', ['employer_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_applications_job_id_seeker_id', 'applications', ['job_id', 'seeker_id'], unique=False)
+    op.create_index('ix_applications_seeker_id', 'applications', ['seeker_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_applications_seeker_id', table_name='applications')
+    op.drop_index('ix_applications_job_id_seeker_id', table_name='applications')
+    op.drop_index('ix_jobs_employer_id_created_at_id', table_name='jobs')
+    op.drop_index('ix_jobs_category_created_at_id', table_name='jobs')
+    op.drop_index('ix_jobs_created_at_id', table_name='jobs')
@@ -0,0 +1,40 @@
+"""unique application per (job, seeker)
+
+Revision ID: a3c5e0f7d914
+Revises: e7a91c3d5f20
+Create Date: 2026-10-19 11:02:18.204917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3c5e0f7d914'
+down_revision = 'e7a91c3d5f20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The old SELECT-then-INSERT apply path could race; keep the earliest
+    # application of each duplicated (job, seeker) pair.
+    result = op.get_bind().execute(sa.text(
+        "DELETE FROM applications WHERE id NOT IN "
+        "(SELECT MIN(id) FROM applications GROUP BY job_id, seeker_id)"
+    ))
+    if result.rowcount:
+        op.execute("DELETE FROM job_application_counts")
+        op.execute(
+            "INSERT INTO job_application_counts (job_id, status, count) "
+            "SELECT job_id, status, COUNT(*) FROM applications "
+            "WHERE status IS NOT NULL GROUP BY job_id, status"
+        )
+    # The unique index replaces the plain one on the same columns.
+    op.create_index('uq_applications_job_id_seeker_id', 'applications', ['job_id', 'seeker_id'], unique=True)
+    op.drop_index('ix_applications_job_id_seeker_id', table_name='applications')
+
+
+def downgrade():
+    op.create_index('ix_applications_job_id_seeker_id', 'applications', ['job_id', 'seeker_id'], unique=False)
+    op.drop_index('uq_applications_job_id_seeker_id', table_name='applications')
@@ -0,0 +1,36 @@
+"""add job_application_counts
+
+Revision ID: a7d2e94b1f36
+Revises: c5e8a13f7b92
+Create Date: 2026-10-18 21:03:11.402817
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d2e94b1f36'
+down_revision = 'c5e8a13f7b92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('job_application_counts',
+    sa.Column('job_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=50), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], name=op.f('fk_job_application_counts_job_id_jobs'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('job_id', 'status')
+    )
+    # Backfill from the existing applications.
+    op.execute(
+        "INSERT INTO job_application_counts (job_id, status, count) "
+        "SELECT job_id, status, COUNT(*) FROM applications "
+        "WHERE status IS NOT NULL GROUP BY job_id, status"
+    )
+
+
+def downgrade():
+    op.drop_table('job_application_counts')
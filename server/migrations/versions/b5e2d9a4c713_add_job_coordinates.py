@@ -0,0 +1,34 @@
+"""add jobs latitude, longitude and place_id
+
+Revision ID: b5e2d9a4c713
+Revises: c82d4f6a1e59
+Create Date: 2026-10-20 10:12:37.418205
+
+Existing rows are left NULL; fill them in with `flask geo backfill`.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5e2d9a4c713'
+down_revision = 'c82d4f6a1e59'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Plain ADD COLUMN: a batch rebuild of jobs would drop the FTS triggers.
+    op.add_column('jobs', sa.Column('latitude', sa.Float(), nullable=True))
+    op.add_column('jobs', sa.Column('longitude', sa.Float(), nullable=True))
+    op.add_column('jobs', sa.Column('place_id', sa.String(length=64), nullable=True))
+    op.create_index('ix_jobs_latitude_longitude', 'jobs', ['latitude', 'longitude'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_jobs_latitude_longitude', table_name='jobs')
+    # SQLite 3.35+ drops columns in place.
+    op.drop_column('jobs', 'place_id')
+    op.drop_column('jobs', 'longitude')
+    op.drop_column('jobs', 'latitude')
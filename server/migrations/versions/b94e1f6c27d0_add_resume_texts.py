@@ -0,0 +1,91 @@
+"""add resume_texts and its search index
+
+Revision ID: b94e1f6c27d0
+Revises: f1c4d8a2b573
+Create Date: 2026-10-18 22:58:40.207715
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b94e1f6c27d0'
+down_revision = 'f1c4d8a2b573'
+branch_labels = None
+depends_on = None
+
+
+SQLITE_UPGRADE = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS resume_texts_fts USING fts5(
+        text, content='resume_texts', content_rowid='id', tokenize='porter unicode61')""",
+    """CREATE TRIGGER IF NOT EXISTS resume_texts_fts_ai AFTER INSERT ON resume_texts BEGIN
+        INSERT INTO resume_texts_fts(rowid, text) VALUES (new.id, new.text);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS resume_texts_fts_ad AFTER DELETE ON resume_texts BEGIN
+        INSERT INTO resume_texts_fts(resume_texts_fts, rowid, text) VALUES ('delete', old.id, old.text);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS resume_texts_fts_au AFTER UPDATE OF text ON resume_texts BEGIN
+        INSERT INTO resume_texts_fts(resume_texts_fts, rowid, text) VALUES ('delete', old.id, old.text);
+        INSERT INTO resume_texts_fts(rowid, text) VALUES (new.id, new.text);
+    END""",
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS resume_texts_fts_au",
+    "DROP TRIGGER IF EXISTS resume_texts_fts_ad",
+    "DROP TRIGGER IF EXISTS resume_texts_fts_ai",
+    "DROP TABLE IF EXISTS resume_texts_fts",
+]
+
+POSTGRES_UPGRADE = [
+    """CREATE INDEX IF NOT EXISTS ix_resume_texts_search ON resume_texts
+        USING GIN (to_tsvector('english', coalesce(text, '')))""",
+]
+
+POSTGRES_DOWNGRADE = [
+    "DROP INDEX IF EXISTS ix_resume_texts_search",
+]
+
+
+def _run(statements):
+    for statement in statements:
+        op.execute(sa.text(statement))
+
+
+def upgrade():
+    op.create_table('resume_texts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('error', sa.String(length=500), nullable=True),
+    sa.Column('text', sa.Text(), nullable=True),
+    sa.Column('claimed_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('sha256')
+    )
+    op.create_index('ix_resume_texts_status', 'resume_texts', ['status'], unique=False)
+
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        _run(SQLITE_UPGRADE)
+    elif dialect == 'postgresql':
+        _run(POSTGRES_UPGRADE)
+
+    # CVs uploaded before this migration wait for `flask cvs extract`.
+    op.execute(
+        "INSERT INTO resume_texts (sha256, status, attempts) "
+        "SELECT DISTINCT sha256, 'pending', 0 FROM resumes"
+    )
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        _run(SQLITE_DOWNGRADE)
+    elif dialect == 'postgresql':
+        _run(POSTGRES_DOWNGRADE)
+    op.drop_index('ix_resume_texts_status', table_name='resume_texts')
+    op.drop_table('resume_texts')
@@ -0,0 +1,29 @@
+"""add external_id to jobs
+
+Revision ID: c5e8a13f7b92
+Revises: 8d41b6e0c2a7
+Create Date: 2026-10-18 20:12:37.550194
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e8a13f7b92'
+down_revision = '8d41b6e0c2a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Plain ALTER rather than batch mode: rebuilding `jobs` on SQLite would
+    # drop the full-text search triggers.
+    op.add_column('jobs', sa.Column('external_id', sa.String(length=255), nullable=True))
+    op.create_index('ix_jobs_employer_id_external_id', 'jobs', ['employer_id', 'external_id'], unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_jobs_employer_id_external_id', table_name='jobs')
+    # In place for the same reason (SQLite 3.35+ drops columns with ALTER).
+    op.drop_column('jobs', 'external_id')
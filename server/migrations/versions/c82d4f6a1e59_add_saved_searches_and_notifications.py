@@ -0,0 +1,54 @@
+"""add saved_searches and notifications
+
+Revision ID: c82d4f6a1e59
+Revises: a3c5e0f7d914
+Create Date: 2026-10-19 13:26:51.770134
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c82d4f6a1e59'
+down_revision = 'a3c5e0f7d914'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('saved_searches',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('seeker_id', sa.Integer(), nullable=False),
+    sa.Column('keyword', sa.String(length=200), nullable=True),
+    sa.Column('category', sa.String(), nullable=True),
+    sa.Column('location', sa.String(), nullable=True),
+    sa.Column('terms', sa.String(length=200), nullable=False),
+    sa.Column('index_key', sa.String(length=200), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['seeker_id'], ['users.id'], name=op.f('fk_saved_searches_seeker_id_users'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_saved_searches_seeker_id'), 'saved_searches', ['seeker_id'], unique=False)
+    op.create_table('notifications',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('seeker_id', sa.Integer(), nullable=False),
+    sa.Column('saved_search_id', sa.Integer(), nullable=False),
+    sa.Column('job_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('read_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], name=op.f('fk_notifications_job_id_jobs'), ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['saved_search_id'], ['saved_searches.id'], name=op.f('fk_notifications_saved_search_id_saved_searches'), ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['seeker_id'], ['users.id'], name=op.f('fk_notifications_seeker_id_users'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('uq_notifications_saved_search_id_job_id', 'notifications', ['saved_search_id', 'job_id'], unique=True)
+    op.create_index('ix_notifications_seeker_id_id', 'notifications', ['seeker_id', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_notifications_seeker_id_id', table_name='notifications')
+    op.drop_index('uq_notifications_saved_search_id_job_id', table_name='notifications')
+    op.drop_table('notifications')
+    op.drop_index(op.f('ix_saved_searches_seeker_id'), table_name='saved_searches')
+    op.drop_table('saved_searches')
@@ -0,0 +1,44 @@
+"""add application_status_events
+
+Revision ID: d4f8a1c6b930
+Revises: b5e2d9a4c713
+Create Date: 2026-10-20 16:48:05.902317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4f8a1c6b930'
+down_revision = 'b5e2d9a4c713'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('application_status_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('application_id', sa.Integer(), nullable=False),
+    sa.Column('job_id', sa.Integer(), nullable=False),
+    sa.Column('seeker_id', sa.Integer(), nullable=False),
+    sa.Column('from_status', sa.String(length=50), nullable=True),
+    sa.Column('to_status', sa.String(length=50), nullable=False),
+    sa.Column('changed_by', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['application_id'], ['applications.id'], name=op.f('fk_application_status_events_application_id_applications'), ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['changed_by'], ['users.id'], name=op.f('fk_application_status_events_changed_by_users')),
+    sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], name=op.f('fk_application_status_events_job_id_jobs'), ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['seeker_id'], ['users.id'], name=op.f('fk_application_status_events_seeker_id_users'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_application_status_events_application_id'), 'application_status_events', ['application_id'], unique=False)
+    op.create_index('ix_application_status_events_job_id_id', 'application_status_events', ['job_id', 'id'], unique=False)
+    op.create_index('ix_application_status_events_seeker_id_id', 'application_status_events', ['seeker_id', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_application_status_events_seeker_id_id', table_name='application_status_events')
+    op.drop_index('ix_application_status_events_job_id_id', table_name='application_status_events')
+    op.drop_index(op.f('ix_application_status_events_application_id'), table_name='application_status_events')
+    op.drop_table('application_status_events')
@@ -0,0 +1,24 @@
+"""add a covering index for job facet counts
+
+Revision ID: d6a3f0b8e215
+Revises: b94e1f6c27d0
+Create Date: 2026-10-18 23:41:07.518302
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd6a3f0b8e215'
+down_revision = 'b94e1f6c27d0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_jobs_facets', 'jobs', ['category', 'location', 'job_type', 'salary_max'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_jobs_facets', table_name='jobs')
@@ -0,0 +1,33 @@
+"""add contact_messages
+
+Revision ID: e3b7c0d5a912
+Revises: a7d2e94b1f36
+Create Date: 2026-10-18 21:40:52.118364
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3b7c0d5a912'
+down_revision = 'a7d2e94b1f36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('contact_messages',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('message', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_contact_messages_created_at', 'contact_messages', ['created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_contact_messages_created_at', table_name='contact_messages')
+    op.drop_table('contact_messages')
@@ -0,0 +1,25 @@
+"""add users.token_version
+
+Revision ID: e7a91c3d5f20
+Revises: d6a3f0b8e215
+Create Date: 2026-10-19 10:12:40.518306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a91c3d5f20'
+down_revision = 'd6a3f0b8e215'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('token_version')
@@ -0,0 +1,38 @@
+"""add resumes
+
+Revision ID: f1c4d8a2b573
+Revises: e3b7c0d5a912
+Create Date: 2026-10-18 22:17:05.631940
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c4d8a2b573'
+down_revision = 'e3b7c0d5a912'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('resumes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('seeker_id', sa.Integer(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('filename', sa.String(length=255), nullable=False),
+    sa.Column('content_type', sa.String(length=100), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('uploaded_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['seeker_id'], ['users.id'], name=op.f('fk_resumes_seeker_id_users')),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_resumes_seeker_id_id', 'resumes', ['seeker_id', 'id'], unique=False)
+    op.create_index('ix_resumes_sha256', 'resumes', ['sha256'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_resumes_sha256', table_name='resumes')
+    op.drop_index('ix_resumes_seeker_id_id', table_name='resumes')
+    op.drop_table('resumes')
@@ -0,0 +1,29 @@
+"""add users.token_version_changed_at
+
+Revision ID: f1c7b3e9a2d4
+Revises: d4f8a1c6b930
+Create Date: 2026-10-18 20:41:09.227415
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c7b3e9a2d4'
+down_revision = 'd4f8a1c6b930'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('users', sa.Column('token_version_changed_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_users_token_version_changed_at', 'users', ['token_version_changed_at'], unique=False)
+    # Existing revocations stay loaded for one token lifetime from now.
+    op.execute(sa.text("UPDATE users SET token_version_changed_at = CURRENT_TIMESTAMP WHERE token_version > 0"))
+
+
+def downgrade():
+    op.drop_index('ix_users_token_version_changed_at', table_name='users')
+    # SQLite 3.35+ drops columns in place.
+    op.drop_column('users', 'token_version_changed_at')
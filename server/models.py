@@ -11,6 +11,7 @@ class UserRole:
 
 class ApplicationStatus:
     PENDING = 'Pending'
+    INTERVIEWING = 'Interviewing'
     ACCEPTED = 'Accepted'
     REJECTED = 'Rejected'
 
@@ -21,13 +22,17 @@ class User(db.Model, SerializerMixin):
     __tablename__ = 'users'
     
     # Prevents password and recursion issues in JSON
-    serialize_rules = ('-password_hash', '-jobs.employer', '-applications.seeker', '-applications.job')
+    serialize_rules = ('-password_hash', '-token_version', '-token_version_changed_at', '-jobs.employer', '-applications.seeker', '-applications.job')
 
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String, unique=True, nullable=False)
     email = db.Column(db.String, unique=True, nullable=False, index=True)
     password_hash = db.Column(db.String, nullable=False)
     role = db.Column(db.String, nullable=False, default=UserRole.JOB_SEEKER)
+    # Bumped to revoke every access token issued before (see auth.py)
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # When token_version last changed; revocation reloads read only newer rows
+    token_version_changed_at = db.Column(db.DateTime, index=True)
     
     # Extra fields from main
     full_name = db.Column(db.String(100))
@@ -49,6 +54,19 @@ class Job(db.Model, SerializerMixin):
     
     serialize_rules = ('-employer.jobs', '-applications.job', '-applications.seeker')
 
+    # Listings page newest-first on (created_at, id), optionally narrowed by
+    # category or employer first.
+    __table_args__ = (
+        db.Index('ix_jobs_created_at_id', 'created_at', 'id'),
+        db.Index('ix_jobs_category_created_at_id', 'category', 'created_at', 'id'),
+        db.Index('ix_jobs_employer_id_created_at_id', 'employer_id', 'created_at', 'id'),
+        db.Index('ix_jobs_employer_id_external_id', 'employer_id', 'external_id', unique=True),
+        # Covers the GROUP BY behind GET /jobs/facets.
+        db.Index('ix_jobs_facets', 'category', 'location', 'job_type', 'salary_max'),
+        # Bounding-box prefilter for ?lat=&lon=&radius_km=.
+        db.Index('ix_jobs_latitude_longitude', 'latitude', 'longitude'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String, nullable=False)
     description = db.Column(db.Text, nullable=False)
@@ -62,6 +80,16 @@ class Job(db.Model, SerializerMixin):
     
     employer_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # The employer's own ID for the posting (e.g. from their ATS); bulk
+    # imports upsert on (employer_id, external_id).
+    external_id = db.Column(db.String(255))
+
+    # Resolved from `location` against the gazetteer (see geo.py); latitude
+    # and longitude are only set when it names a city.
+    latitude = db.Column(db.Float)
+    longitude = db.Column(db.Float)
+    place_id = db.Column(db.String(64))
     
     # Relationship to applications
     applications = db.relationship('Application', backref='job', lazy=True, cascade="all, delete-orphan")
@@ -74,10 +102,139 @@ class Application(db.Model, SerializerMixin):
     
     serialize_rules = ('-job.applications', '-seeker.applications', '-job.employer')
 
+    # (job_id, seeker_id) is unique: one application per seeker per job, which
+    # the apply path relies on (ON CONFLICT). It also serves "applications for
+    # these jobs"; seeker_id alone serves a user's applications.
+    __table_args__ = (
+        db.Index('uq_applications_job_id_seeker_id', 'job_id', 'seeker_id', unique=True),
+        db.Index('ix_applications_seeker_id', 'seeker_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     job_id = db.Column(db.Integer, db.ForeignKey('jobs.id'), nullable=False)
     seeker_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     
     status = db.Column(db.String, default=ApplicationStatus.PENDING) 
     resume_url = db.Column(db.String)
-    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
\ No newline at end of file
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# ==========================================================
+# 4. APPLICATION COUNTERS
+# ==========================================================
+class JobApplicationCount(db.Model):
+    """Applications per (job, status), kept in step with `applications` by
+    application_counts.py so dashboards never have to count rows."""
+    __tablename__ = 'job_application_counts'
+
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id', ondelete='CASCADE'), primary_key=True)
+    status = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+# ==========================================================
+# 5. CONTACT MESSAGES
+# ==========================================================
+class ContactMessage(db.Model, SerializerMixin):
+    __tablename__ = 'contact_messages'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    email = db.Column(db.String(255), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    # When the message was received, not when the background writer saved it.
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+# ==========================================================
+# 6. RESUMES
+# ==========================================================
+class Resume(db.Model, SerializerMixin):
+    """One uploaded CV. The file lives in cv_storage under its SHA-256, so
+    identical uploads share one copy on disk."""
+    __tablename__ = 'resumes'
+
+    __table_args__ = (
+        db.Index('ix_resumes_seeker_id_id', 'seeker_id', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    seeker_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    sha256 = db.Column(db.String(64), nullable=False, index=True)
+    filename = db.Column(db.String(255), nullable=False)
+    content_type = db.Column(db.String(100), nullable=False)
+    size = db.Column(db.Integer, nullable=False)
+    uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ResumeText(db.Model):
+    """Text extracted from a stored CV, one row per distinct file (SHA-256);
+    filled in by cv_extraction.py."""
+    __tablename__ = 'resume_texts'
+
+    id = db.Column(db.Integer, primary_key=True)
+    sha256 = db.Column(db.String(64), nullable=False, unique=True)
+    # pending -> processing -> done | failed (retried) | poisoned | unsupported
+    status = db.Column(db.String(20), nullable=False, default='pending', index=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.String(500))
+    text = db.Column(db.Text)
+    claimed_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# ==========================================================
+# 7. SAVED SEARCHES & NOTIFICATIONS
+# ==========================================================
+class SavedSearch(db.Model, SerializerMixin):
+    """A seeker's /jobs filters, matched against every new job by alerts.py."""
+    __tablename__ = 'saved_searches'
+
+    serialize_rules = ('-terms', '-index_key')
+
+    id = db.Column(db.Integer, primary_key=True)
+    seeker_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    keyword = db.Column(db.String(200))
+    category = db.Column(db.String)
+    location = db.Column(db.String)
+    # The alert index, persisted with the row: the normalized keyword terms
+    # and the key the search is filed under, so loading needs no re-parsing.
+    terms = db.Column(db.String(200), nullable=False, default='')
+    index_key = db.Column(db.String(200), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class Notification(db.Model, SerializerMixin):
+    """A new job that matched one of the seeker's saved searches."""
+    __tablename__ = 'notifications'
+
+    # One notification per (search, job), so catching up can safely re-match;
+    # (seeker_id, id) pages a seeker's inbox newest first.
+    __table_args__ = (
+        db.Index('uq_notifications_saved_search_id_job_id', 'saved_search_id', 'job_id', unique=True),
+        db.Index('ix_notifications_seeker_id_id', 'seeker_id', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    seeker_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    saved_search_id = db.Column(db.Integer, db.ForeignKey('saved_searches.id', ondelete='CASCADE'), nullable=False)
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id', ondelete='CASCADE'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    read_at = db.Column(db.DateTime)
+
+# ==========================================================
+# 8. APPLICATION STATUS HISTORY
+# ==========================================================
+class ApplicationStatusEvent(db.Model):
+    """One status change of one application. Rows are only ever inserted
+    (see applications.update_statuses), so the table is the full history."""
+    __tablename__ = 'application_status_events'
+
+    # History pages newest first, per job or per seeker.
+    __table_args__ = (
+        db.Index('ix_application_status_events_job_id_id', 'job_id', 'id'),
+        db.Index('ix_application_status_events_seeker_id_id', 'seeker_id', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    application_id = db.Column(db.Integer, db.ForeignKey('applications.id', ondelete='CASCADE'), nullable=False, index=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id', ondelete='CASCADE'), nullable=False)
+    seeker_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    from_status = db.Column(db.String(50))
+    to_status = db.Column(db.String(50), nullable=False)
+    changed_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,99 @@
+import base64
+import json
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import and_, or_, select, func
+from config import db
+
+# ==========================================================
+# KEYSET (CURSOR) PAGINATION
+# ==========================================================
+# Pages are addressed by the sort key of the last row already seen instead of
+# an OFFSET, so the database seeks straight to the next page through the index
+# and page N costs the same as page 1.
+
+class CursorError(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, keys):
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw)
+    except (ValueError, TypeError):
+        raise CursorError("Invalid cursor")
+    if not isinstance(payload, list) or len(payload) != len(keys):
+        raise CursorError("Invalid cursor")
+    return [_coerce(value, expr) for value, (expr, _) in zip(payload, keys)]
+
+
+def _coerce(value, expr):
+    try:
+        python_type = expr.type.python_type
+    except NotImplementedError:
+        return value
+    try:
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        return python_type(value)
+    except (ValueError, TypeError):
+        raise CursorError("Invalid cursor")
+
+
+def _after(keys, values):
+    # Expands (k1, k2, ...) > (v1, v2, ...) as
+    #   k1 >= v1 AND (k1 > v1 OR (k2, ...) > (v2, ...))
+    # The leading inequality gives the planner a range it can seek on, which
+    # the plain OR form hides behind the disjunction.
+    (expr, descending), value = keys[0], values[0]
+    if len(keys) == 1:
+        return expr < value if descending else expr > value
+    rest = _after(keys[1:], values[1:])
+    if descending:
+        return and_(expr <= value, or_(expr < value, rest))
+    return and_(expr >= value, or_(expr > value, rest))
+
+
+def parse_limit(args):
+    default = current_app.config['DEFAULT_PAGE_SIZE']
+    maximum = current_app.config['MAX_PAGE_SIZE']
+    try:
+        limit = int(args.get('limit', default))
+    except (TypeError, ValueError):
+        raise CursorError("limit must be an integer")
+    return max(1, min(limit, maximum))
+
+
+def keyset_query(query, keys, limit, cursor=None):
+    if cursor:
+        query = query.filter(_after(keys, decode_cursor(cursor, keys)))
+    query = query.order_by(*[expr.desc() if desc else expr.asc() for expr, desc in keys])
+    return query.limit(limit + 1)
+
+
+def paginate(query, keys, key_of, limit, cursor=None):
+    """Returns (rows, next_cursor) for one page of `query`.
+
+    `keys` is a list of (expression, descending) pairs that must end in a
+    unique column; `key_of(row)` returns the matching values for a row.
+    """
+    rows = keyset_query(query, keys, limit, cursor).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(key_of(rows[-1]))
+
+
+def approximate_total(query):
+    # Exact up to TOTAL_COUNT_CAP; past that we stop counting and report the cap
+    # so a "total" request can never degenerate into a full scan.
+    cap = current_app.config['TOTAL_COUNT_CAP']
+    capped = query.order_by(None).limit(cap + 1).subquery()
+    count = db.session.scalar(select(func.count()).select_from(capped))
+    return {"total": min(count, cap), "total_is_exact": count <= cap}
@@ -0,0 +1,202 @@
+import re
+import sys
+from datetime import datetime
+import click
+from flask.cli import AppGroup
+from sqlalchemy import select, exists, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import Executable, ClauseElement
+from config import db
+from models import User, Job, Application, ApplicationStatusEvent, JobApplicationCount
+from pagination import keyset_query, encode_cursor
+
+# ==========================================================
+# QUERY PLAN REGRESSION CHECKS
+# ==========================================================
+# Runs EXPLAIN (EXPLAIN QUERY PLAN on SQLite) for the statement behind each
+# endpoint and fails if any table is read with a full scan, or a whole index
+# is walked without a condition narrowing it, so a model or query change can't
+# silently drop an index from a hot path:
+#
+#     flask query-plans check        # exit status 1 on a full scan
+#     flask query-plans show         # print every plan
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain)
+def _explain_default(element, compiler, **kw):
+    return "EXPLAIN " + compiler.process(element.statement, **kw)
+
+
+@compiles(Explain, 'sqlite')
+def _explain_sqlite(element, compiler, **kw):
+    return "EXPLAIN QUERY PLAN " + compiler.process(element.statement, **kw)
+
+
+# SQLite: "SCAN jobs" with no index ("SCAN CONSTANT ROW" reads no table);
+# PostgreSQL: "Seq Scan on jobs"
+FULL_SCAN = {
+    'sqlite': re.compile(r'^SCAN (?!CONSTANT ROW)(\w+)(?!\w)(?! USING (COVERING )?INDEX)(?! VIRTUAL TABLE)'),
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+}
+
+# An index read end to end is no better than a table scan when the query has
+# a filter the index doesn't serve. SQLite: "SCAN jobs USING INDEX ix" (a
+# narrowed read says SEARCH); PostgreSQL: an Index Scan with no Index Cond.
+INDEX_WALK = {
+    'sqlite': re.compile(r'^SCAN (\w+) USING (?:COVERING )?INDEX (\w+)'),
+    'postgresql': re.compile(r'Index (?:Only )?Scan (?:Backward )?using (\w+) on (\w+)'),
+}
+
+# Entries that walk an index on purpose, and which one. Unfiltered listings
+# (and ?location=, a substring match no b-tree can serve) read the newest-first
+# index and stop after a page; unfiltered facets read a covering index.
+EXPECTED_WALKS = {
+    "GET /jobs (first page)": 'ix_jobs_created_at_id',
+    "GET /jobs?location": 'ix_jobs_created_at_id',
+    "GET /jobs/facets": 'ix_jobs_facets',
+}
+
+
+def endpoint_queries():
+    # Imported here: app.py registers this module's CLI at import time.
+    from app import build_jobs_query, JOB_PAGE_KEYS
+    import applications
+    import facets
+    import geo
+
+    limit = 20
+    cursor = encode_cursor([datetime(2026, 1, 1), 1000])
+    event_keys, event_cursor = [(ApplicationStatusEvent.id, True)], encode_cursor([1000])
+
+    def jobs_page(args, cursor=None):
+        query, _ = build_jobs_query(args)
+        return keyset_query(query, JOB_PAGE_KEYS, limit, cursor).statement
+
+    return {
+        "GET /jobs (first page)": jobs_page({}),
+        "GET /jobs (next page)": jobs_page({}, cursor),
+        "GET /jobs?category (first page)": jobs_page({'category': 'Technology'}),
+        "GET /jobs?category (next page)": jobs_page({'category': 'Technology'}, cursor),
+        "GET /jobs?location": jobs_page({'location': 'Nairobi'}),
+        "GET /jobs?keyword": jobs_page({'keyword': 'developer'}),
+        "GET /jobs?lat&lon&radius_km": jobs_page({'lat': '-1.29', 'lon': '36.82', 'radius_km': '50'}),
+        "GET /jobs?lat&lon&radius_km (density probe)": geo.density_probe(-1.29, 36.82, 50),
+        "GET /employer/my-jobs": keyset_query(
+            Job.query.filter_by(employer_id=1), JOB_PAGE_KEYS, limit, cursor).statement,
+        "GET /employer/my-jobs/summary (counts)": select(JobApplicationCount).where(
+            JobApplicationCount.job_id.in_([1, 2, 3])),
+        "GET /employer/my-jobs/summary (totals)": select(JobApplicationCount.status, db.func.sum(JobApplicationCount.count))
+            .join(Job, Job.id == JobApplicationCount.job_id).where(Job.employer_id == 1)
+            .group_by(JobApplicationCount.status),
+        "GET /jobs/facets": facets.grouped(Job.query).statement,
+        "GET /jobs/facets?category": facets.grouped(build_jobs_query({'category': 'Technology'})[0]).statement,
+        "GET /jobs/<id>": select(Job).where(Job.id == 1),
+        "load Job.applications": select(Application).where(Application.job_id.in_([1, 2, 3])),
+        "load User.applications": select(Application).where(Application.seeker_id.in_([1, 2, 3])),
+        "POST /jobs/<id>/apply": applications.INSERT_ON_CONFLICT.bindparams(
+            job_id=1, seeker_id=2, status='Pending', resume_url=None, applied_at=datetime(2026, 1, 1)),
+        "POST /jobs/<id>/apply (job exists)": select(exists().where(Job.id == 1)),
+        "POST /login": select(User).filter_by(email='someone@example.com').limit(1),
+        "token revocation reload": select(User.id, User.token_version, User.token_version_changed_at).where(
+            User.token_version > 0, User.token_version_changed_at > datetime(2026, 1, 1)),
+        "PATCH /employer/applications": select(Application.id, Application.status).where(
+            Application.id.in_([1, 2, 3]), Application.job_id.in_(select(Job.id).where(Job.employer_id == 1))),
+        "GET /employer/application-events?job_id": keyset_query(
+            ApplicationStatusEvent.query.filter_by(job_id=1), event_keys, limit, event_cursor).statement,
+        "GET /employer/application-events?seeker_id": keyset_query(
+            ApplicationStatusEvent.query.filter(ApplicationStatusEvent.seeker_id == 2, ApplicationStatusEvent.job_id.in_(
+                select(Job.id).where(Job.employer_id == 1))), event_keys, limit, event_cursor).statement,
+        "GET /seeker/application-events": keyset_query(
+            ApplicationStatusEvent.query.filter_by(seeker_id=2), event_keys, limit, event_cursor).statement,
+    }
+
+
+def explain(connection, statement):
+    if connection.dialect.name == 'postgresql':
+        # Tiny tables make a seq scan "cheapest"; we want to know whether an
+        # index path exists at all.
+        connection.execute(text("SET LOCAL enable_seqscan = off"))
+        return [row[0] for row in connection.execute(Explain(statement))]
+    return [row[-1] for row in connection.execute(Explain(statement))]
+
+
+def full_scans(dialect, plan):
+    pattern = FULL_SCAN.get(dialect)
+    if pattern is None:
+        return []
+    return [m.group(1) for m in (pattern.search(line.strip()) for line in plan) if m]
+
+
+def index_walks(dialect, plan):
+    """(table, index) for every index the plan reads without a condition."""
+    pattern = INDEX_WALK.get(dialect)
+    if pattern is None:
+        return []
+    if dialect == 'sqlite':
+        return [m.groups() for m in (pattern.search(line.strip()) for line in plan) if m]
+    walks, current = [], None
+    for line in plan:
+        m = pattern.search(line)
+        if m or '->' in line:
+            if current:
+                walks.append(current)
+            current = (m.group(2), m.group(1)) if m else None
+        elif current and 'Index Cond:' in line:
+            current = None
+    if current:
+        walks.append(current)
+    return walks
+
+
+def check_plans(verbose=False):
+    failures = {}
+    with db.engine.connect() as connection:
+        dialect = connection.dialect.name
+        for name, statement in endpoint_queries().items():
+            with connection.begin():
+                plan = explain(connection, statement)
+            scans = full_scans(dialect, plan) + [
+                f"{table} (walks {index})" for table, index in index_walks(dialect, plan)
+                if index != EXPECTED_WALKS.get(name)
+            ]
+            if scans:
+                failures[name] = scans
+            if verbose or scans:
+                status = "FULL SCAN on " + ", ".join(scans) if scans else "ok"
+                click.echo(f"{name}: {status}")
+                for line in plan:
+                    click.echo(f"    {line}")
+    return failures
+
+
+# ==========================================================
+# CLI: flask query-plans check|show
+# ==========================================================
+plans_cli = AppGroup('query-plans', help='Check that endpoint queries use indexes.')
+
+
+@plans_cli.command('check')
+def check_command():
+    """Exit non-zero if any endpoint query does a full table or index scan."""
+    failures = check_plans()
+    if failures:
+        click.echo(f"{len(failures)} endpoint quer{'y' if len(failures) == 1 else 'ies'} fell back to a full scan.")
+        sys.exit(1)
+    click.echo("All endpoint queries use an index.")
+
+
+@plans_cli.command('show')
+def show_command():
+    """Print the plan for every endpoint query."""
+    check_plans(verbose=True)
+
+
+def init_app(app):
+    app.cli.add_command(plans_cli)
@@ -0,0 +1,405 @@
+import json
+import math
+import os
+import re
+import shutil
+import threading
+import time
+import zlib
+from array import array
+from collections import Counter
+from datetime import datetime
+import click
+from flask import jsonify
+from flask.cli import AppGroup
+from sqlalchemy import select
+from config import db
+from models import Job, Application, Resume, ResumeText
+import cv_extraction
+
+try:
+    import numpy as np
+except ImportError:  # optional: without it /seeker/recommendations answers 503
+    np = None
+
+# ==========================================================
+# JOB RECOMMENDATIONS
+# ==========================================================
+# Every job is a TF-IDF vector over hashed features (title, category,
+# location, description), L2-normalized. The job x feature matrix is stored
+# feature-major (CSC: one posting list per feature) with each list sorted by
+# weight, heaviest first. A seeker's profile -- the jobs they applied to, most
+# recent first, plus the text of their latest CV -- is reduced to its
+# PROFILE_TERMS strongest terms, and scoring reads at most POSTINGS_PER_TERM
+# postings from each: one gather and one bincount, whatever the job count.
+#
+# `flask recommendations build` writes the model as .npy files under
+# RECOMMENDER_DIR/<version>/ and points RECOMMENDER_DIR/CURRENT at it. Workers
+# np.load() it with mmap_mode='r', so they all share one copy through the page
+# cache and pick up a new build within RECOMMENDER_RELOAD_INTERVAL seconds.
+#
+# Jobs posted after the build are folded in per process, every
+# RECOMMENDER_FOLD_INTERVAL seconds, into a small in-memory matrix scored
+# alongside the mapped one. Edits only show up after the next build; deleted
+# jobs are dropped when the results are loaded.
+
+N_FEATURES = 2 ** 20
+# Title and description share a vocabulary; category and location are
+# prefixed so they only ever match themselves.
+FIELD_WEIGHTS = (('title', '', 3.0), ('category', 'category:', 2.0),
+                 ('location', 'location:', 1.5), ('description', '', 1.0))
+TOKEN = re.compile(r'\w\w+')
+
+HISTORY_SIZE = 50         # most recent applications that shape the profile
+RECENCY_DECAY = 0.9       # weight of each older application relative to the next
+CV_WEIGHT = 1.0           # the CV counts as much as the latest application
+PROFILE_TERMS = 64        # strongest profile terms kept for scoring
+POSTINGS_PER_TERM = 2000  # heaviest postings read per term
+FOLD_BATCH = 5000
+KEEP_VERSIONS = 2
+
+
+class RecommendationsUnavailable(Exception):
+    pass
+
+
+def available():
+    return np is not None
+
+
+def model_root(app):
+    return app.config['RECOMMENDER_DIR'] or os.path.join(app.instance_path, 'recommender')
+
+
+# ==========================================================
+# 1. FEATURES
+# ==========================================================
+
+def term_weights(fields):
+    """{feature index: weighted sublinear tf} for a job-like mapping."""
+    weights = {}
+    for field, prefix, field_weight in FIELD_WEIGHTS:
+        text = fields.get(field)
+        if not text:
+            continue
+        for token, n in Counter(TOKEN.findall(text.lower())).items():
+            index = zlib.crc32((prefix + token).encode()) & (N_FEATURES - 1)
+            weights[index] = weights.get(index, 0.0) + field_weight * (1.0 + math.log(n))
+    return weights
+
+
+def _vectorize(fields, idf):
+    """(indices, values) of one L2-normalized TF-IDF vector."""
+    weights = term_weights(fields)
+    indices = np.fromiter(weights.keys(), dtype=np.int32, count=len(weights))
+    values = np.fromiter(weights.values(), dtype=np.float32, count=len(weights)) * idf[indices]
+    norm = np.linalg.norm(values)
+    return indices, (values / norm if norm else values)
+
+
+def _job_rows():
+    return select(Job.id, Job.title, Job.category, Job.location, Job.description)
+
+
+def _invert(rows, columns, values):
+    """CSC arrays (indptr, job positions, weights) for the given entries, each
+    feature's postings ordered heaviest first (newest job on ties)."""
+    order = np.lexsort((-rows, -values, columns))
+    indptr = np.zeros(N_FEATURES + 1, dtype=np.int64)
+    np.cumsum(np.bincount(columns, minlength=N_FEATURES), out=indptr[1:])
+    return indptr, rows[order], values[order]
+
+
+def _score(index, n_jobs, terms, weights):
+    """Dot product of every job with the profile (terms, weights), reading
+    only the first POSTINGS_PER_TERM postings of each term."""
+    indptr, positions, data = index
+    starts = indptr[terms]
+    lengths = np.minimum(indptr[terms + 1] - starts, POSTINGS_PER_TERM)
+    total = int(lengths.sum())
+    if total == 0:
+        return np.zeros(n_jobs)
+    # Offsets of every posting to read: starts[i] .. starts[i] + lengths[i]
+    ends = np.cumsum(lengths)
+    offsets = np.repeat(starts - (ends - lengths), lengths) + np.arange(total)
+    contributions = data[offsets] * np.repeat(weights, lengths)
+    return np.bincount(positions[offsets], weights=contributions, minlength=n_jobs)
+
+
+# ==========================================================
+# 2. BUILD
+# ==========================================================
+
+def build(root, chunk_size=10000):
+    """Vectorize every job and publish a new model version under `root`.
+    Returns its metadata."""
+    if not available():
+        raise RecommendationsUnavailable("numpy is required to build recommendations")
+    started = time.perf_counter()
+    job_ids, rows, cols, weights = array('q'), array('i'), array('i'), array('f')
+    result = db.session.execute(_job_rows().order_by(Job.id).execution_options(yield_per=chunk_size))
+    for position, job in enumerate(result):
+        job_ids.append(job.id)
+        terms = term_weights(job._mapping)
+        rows.extend([position] * len(terms))
+        cols.extend(terms.keys())
+        weights.extend(terms.values())
+
+    n_jobs = len(job_ids)
+    job_ids = np.frombuffer(job_ids, dtype=np.int64)
+    rows = np.frombuffer(rows, dtype=np.int32)
+    cols = np.frombuffer(cols, dtype=np.int32)
+    document_frequency = np.bincount(cols, minlength=N_FEATURES)
+    idf = (np.log((1.0 + n_jobs) / (1.0 + document_frequency)) + 1.0).astype(np.float32)
+    values = np.frombuffer(weights, dtype=np.float32) * idf[cols]
+    norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=n_jobs)).astype(np.float32)
+    values /= np.maximum(norms, 1e-12)[rows]
+    indptr, positions, data = _invert(rows, cols, values)
+
+    version = datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')
+    os.makedirs(root, exist_ok=True)
+    staging = os.path.join(root, f'.{version}.tmp')
+    os.makedirs(staging)
+    meta = {
+        "version": version,
+        "built_at": datetime.utcnow().isoformat(),
+        "jobs": n_jobs,
+        "max_job_id": int(job_ids[-1]) if n_jobs else 0,
+        "nnz": int(data.size),
+    }
+    np.save(os.path.join(staging, 'job_ids.npy'), job_ids)
+    np.save(os.path.join(staging, 'idf.npy'), idf)
+    np.save(os.path.join(staging, 'indptr.npy'), indptr)
+    np.save(os.path.join(staging, 'positions.npy'), positions)
+    np.save(os.path.join(staging, 'data.npy'), data)
+    with open(os.path.join(staging, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+    os.rename(staging, os.path.join(root, version))
+
+    pointer = os.path.join(root, '.CURRENT.tmp')
+    with open(pointer, 'w') as f:
+        f.write(version)
+    os.replace(pointer, os.path.join(root, 'CURRENT'))
+    _prune(root, version)
+    meta["seconds"] = round(time.perf_counter() - started, 2)
+    return meta
+
+
+def _prune(root, current):
+    # Workers still mapping an older version keep it readable after unlink.
+    versions = sorted(name for name in os.listdir(root) if not name.startswith('.') and name != 'CURRENT')
+    for name in versions[:-KEEP_VERSIONS]:
+        if name != current:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+# ==========================================================
+# 3. SERVING
+# ==========================================================
+
+class Model:
+    def __init__(self, directory):
+        with open(os.path.join(directory, 'meta.json')) as f:
+            self.meta = json.load(f)
+        load = lambda name: np.load(os.path.join(directory, name), mmap_mode='r')
+        self.version = self.meta['version']
+        self.max_job_id = self.meta['max_job_id']
+        self.job_ids = load('job_ids.npy')
+        self.idf = load('idf.npy')
+        self.index = (load('indptr.npy'), load('positions.npy'), load('data.npy'))
+
+
+class Delta:
+    """Jobs newer than the model, vectorized in this process. Immutable:
+    folding more jobs in returns a new Delta."""
+
+    def __init__(self, last_id, job_ids=(), columns=(), values=()):
+        self.last_id = last_id
+        self._columns, self._values = list(columns), list(values)
+        self.job_ids = np.array(job_ids, dtype=np.int64)
+        self.index = None
+        if self._columns:
+            rows = np.repeat(np.arange(len(self._columns), dtype=np.int32), [len(c) for c in self._columns])
+            self.index = _invert(rows, np.concatenate(self._columns), np.concatenate(self._values))
+
+    def extended(self, jobs, idf):
+        job_ids, columns, values = self.job_ids.tolist(), list(self._columns), list(self._values)
+        for job in jobs:
+            indices, weights = _vectorize(job._mapping, idf)
+            job_ids.append(job.id)
+            columns.append(indices)
+            values.append(weights)
+        return Delta(jobs[-1].id, job_ids, columns, values)
+
+
+class Recommender:
+    def __init__(self, root, reload_interval, fold_interval):
+        self.root = root
+        self.reload_interval = reload_interval
+        self.fold_interval = fold_interval
+        self._lock = threading.Lock()
+        # (Model, Delta), replaced as a pair so a request never mixes builds.
+        self._state = None
+        self._checked_at = 0.0
+        self._folded_at = 0.0
+        self.served = 0
+        self.reloads = 0
+
+    def _current_version(self):
+        try:
+            with open(os.path.join(self.root, 'CURRENT')) as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return None
+
+    def _refresh(self):
+        now = time.monotonic()
+        if now - self._checked_at >= self.reload_interval:
+            with self._lock:
+                if now - self._checked_at >= self.reload_interval:
+                    version = self._current_version()
+                    if version and (self._state is None or self._state[0].version != version):
+                        model = Model(os.path.join(self.root, version))
+                        self._state = (model, Delta(model.max_job_id))
+                        self._folded_at = 0.0
+                        self.reloads += 1
+                    self._checked_at = now
+        if self._state is None:
+            raise RecommendationsUnavailable(
+                "Recommendations have not been built yet; run `flask recommendations build`")
+
+        if now - self._folded_at >= self.fold_interval:
+            with self._lock:
+                if now - self._folded_at >= self.fold_interval:
+                    self._fold()
+                    self._folded_at = now
+        return self._state
+
+    def warm_up(self):
+        """Map the current build now rather than on the first request."""
+        try:
+            self._refresh()
+        except RecommendationsUnavailable:
+            pass
+
+    def _fold(self):
+        while True:
+            model, delta = self._state
+            jobs = db.session.execute(
+                _job_rows().where(Job.id > delta.last_id).order_by(Job.id).limit(FOLD_BATCH)
+            ).all()
+            if not jobs:
+                return
+            # Swapped whole: requests keep scoring the pair they already took.
+            self._state = (model, delta.extended(jobs, model.idf))
+            if len(jobs) < FOLD_BATCH:
+                return
+
+    def _profile(self, history, cv_text, idf):
+        profile = Counter()
+        for rank, job in enumerate(history):
+            indices, values = _vectorize(job._mapping, idf)
+            profile.update(dict(zip(indices.tolist(), (values * RECENCY_DECAY ** rank).tolist())))
+        if cv_text:
+            indices, values = _vectorize({'description': cv_text}, idf)
+            profile.update(dict(zip(indices.tolist(), (values * CV_WEIGHT).tolist())))
+
+        indices = np.fromiter(profile.keys(), dtype=np.int32, count=len(profile))
+        values = np.fromiter(profile.values(), dtype=np.float32, count=len(profile))
+        if len(values) > PROFILE_TERMS:
+            strongest = np.argpartition(-values, PROFILE_TERMS)[:PROFILE_TERMS]
+            indices, values = indices[strongest], values[strongest]
+        norm = np.linalg.norm(values)
+        return indices, (values / norm if norm else values)
+
+    def recommend(self, seeker_id, limit):
+        """[(job_id, score)] best first, at most `limit` (over-fetched a little
+        so the caller can drop jobs deleted since the build), and
+        {'applications': n, 'cv': bool} describing what the profile used."""
+        if not available():
+            raise RecommendationsUnavailable("Recommendations need numpy installed")
+        model, delta = self._refresh()
+
+        applied = np.fromiter(
+            db.session.scalars(select(Application.job_id).where(Application.seeker_id == seeker_id)), dtype=np.int64)
+        history = db.session.execute(
+            _job_rows().join(Application, Application.job_id == Job.id)
+            .where(Application.seeker_id == seeker_id)
+            .order_by(Application.applied_at.desc(), Application.id.desc())
+            .limit(HISTORY_SIZE)
+        ).all()
+        cv_text = db.session.scalar(
+            select(ResumeText.text).join(Resume, Resume.sha256 == ResumeText.sha256)
+            .where(Resume.seeker_id == seeker_id, ResumeText.status == cv_extraction.DONE)
+            .order_by(Resume.id.desc()).limit(1)
+        )
+        basis = {"applications": len(applied), "cv": bool(cv_text)}
+        if not history and not cv_text:
+            return [], basis
+
+        indices, values = self._profile(history, cv_text, model.idf)
+        k = limit + max(10, limit)
+        results = _top_k(_score(model.index, len(model.job_ids), indices, values), model.job_ids, applied, k)
+        if delta.index is not None:
+            results += _top_k(_score(delta.index, len(delta.job_ids), indices, values), delta.job_ids, applied, k)
+            results.sort(key=lambda item: -item[1])
+        self.served += 1
+        return results[:k], basis
+
+    def stats(self):
+        model, delta = self._state or (None, None)
+        return {
+            "model_jobs": model.meta['jobs'] if model else 0,
+            "folded_jobs": len(delta.job_ids) if delta else 0,
+            "reloads": self.reloads,
+            "served": self.served,
+        }
+
+
+def _top_k(scores, job_ids, exclude, k):
+    """[(job_id, score)] of the k best positive scores, skipping `exclude`.
+    `job_ids` is sorted, so excluded jobs are found by binary search."""
+    if exclude.size and job_ids.size:
+        positions = np.minimum(np.searchsorted(job_ids, exclude), job_ids.size - 1)
+        scores[positions[job_ids[positions] == exclude]] = 0.0
+    k = min(k, scores.size)
+    if k == 0:
+        return []
+    # Selecting from the front: introselect crawls when most scores are 0.
+    best = np.argpartition(-scores, k - 1)[:k]
+    best = best[scores[best] > 0]
+    best = best[np.argsort(-scores[best], kind='stable')]
+    return list(zip(job_ids[best].tolist(), scores[best].tolist()))
+
+
+recommender = None
+
+
+# ==========================================================
+# CLI: flask recommendations build
+# ==========================================================
+recommendations_cli = AppGroup('recommendations', help='Manage the job recommendation model.')
+
+
+@recommendations_cli.command('build')
+@click.option('--chunk-size', default=10000, show_default=True, help='Jobs read per round trip.')
+def build_command(chunk_size):
+    """Vectorize every job and publish a new model for the workers to map."""
+    meta = build(recommender.root, chunk_size)
+    click.echo(f"Built model {meta['version']}: {meta['jobs']:,} jobs, {meta['nnz']:,} weights "
+               f"in {meta['seconds']}s.")
+
+
+def _unavailable(e):
+    return jsonify({"msg": str(e)}), 503
+
+
+def init_app(app):
+    global recommender
+    recommender = Recommender(
+        model_root(app),
+        reload_interval=app.config['RECOMMENDER_RELOAD_INTERVAL'],
+        fold_interval=app.config['RECOMMENDER_FOLD_INTERVAL'],
+    )
+    app.register_error_handler(RecommendationsUnavailable, _unavailable)
+    app.cli.add_command(recommendations_cli)
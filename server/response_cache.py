@@ -0,0 +1,233 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import g, request, current_app, make_response
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from models import User, Job, Application
+import database
+
+# ==========================================================
+# IN-PROCESS RESPONSE CACHE
+# ==========================================================
+# Caches the serialized body of hot GET endpoints keyed on path + normalized
+# query string. Entries are tagged ("jobs" for listings, "job:<id>" for a
+# detail) and dropped as soon as a commit touches a Job or an Application
+# embedded in one. Every cached response carries a strong ETag, so a matching
+# If-None-Match is answered with a 304 straight from memory.
+#
+# The cache is per process: other workers only see a change once their own
+# entry expires (RESPONSE_CACHE_TTL), which bounds the staleness.
+#
+# With read replicas, a client inside its read-your-writes window bypasses
+# the cache both ways, and a page read from a replica is only stored once
+# the last invalidation is older than READ_YOUR_WRITES_SECONDS (the replica
+# lag allowed for), so a lagging replica can't put a pre-write page back.
+
+LISTING_TAG = 'jobs'
+
+
+def job_tag(job_id):
+    return f'job:{job_id}'
+
+
+class _Entry:
+    __slots__ = ('body', 'mimetype', 'etag', 'expires_at', 'tags')
+
+    def __init__(self, body, mimetype, etag, expires_at, tags):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = etag
+        self.expires_at = expires_at
+        self.tags = tags
+
+
+class ResponseCache:
+    def __init__(self, max_entries=2048, ttl=30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._by_tag = {}
+        self._lock = threading.Lock()
+        # Bumped on every invalidation; a response computed across one is not stored.
+        self.version = 0
+        self.invalidated_at = float('-inf')  # time.monotonic() of the last one
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key, entry, version):
+        with self._lock:
+            if version != self.version:
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            for tag in entry.tags:
+                self._by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, tags):
+        with self._lock:
+            self.version += 1
+            self.invalidated_at = time.monotonic()
+            for tag in tags:
+                for key in self._by_tag.pop(tag, ()):
+                    if key in self._entries:
+                        self._drop(key)
+                        self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.version += 1
+            self.invalidated_at = time.monotonic()
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._by_tag.clear()
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        for tag in entry.tags:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+cache = ResponseCache()
+
+
+def _cache_key():
+    args = sorted((k, v) for k, v in request.args.items(multi=True) if v != '')
+    return (request.path, tuple(args))
+
+
+def _from_entry(entry):
+    response = current_app.response_class(entry.body, mimetype=entry.mimetype)
+    response.set_etag(entry.etag)
+    response.make_conditional(request)
+    if response.status_code == 304:
+        cache.not_modified += 1
+    return response
+
+
+def cached_response(tags):
+    """Serve GETs of the wrapped view from the cache; `tags(**view_args)` names
+    what a change must invalidate."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if (request.method != 'GET' or not current_app.config['RESPONSE_CACHE_ENABLED']
+                    or database.pinned_to_primary()):
+                return view(*args, **kwargs)
+
+            key = _cache_key()
+            entry = cache.get(key)
+            if entry is not None:
+                return _from_entry(entry)
+
+            version = cache.version
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.is_streamed:
+                return response
+            if (g.get('db_replica') is not None
+                    and time.monotonic() - cache.invalidated_at < current_app.config['READ_YOUR_WRITES_SECONDS']):
+                return response
+
+            body = response.get_data()
+            etag = hashlib.sha256(body).hexdigest()[:32]
+            entry = _Entry(body, response.mimetype, etag, time.monotonic() + cache.ttl, frozenset(tags(**kwargs)))
+            cache.set(key, entry, version)
+            response.set_etag(etag)
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
+
+
+# ==========================================================
+# INVALIDATION
+# ==========================================================
+# ORM writes are picked up from the session automatically. Core statements
+# (bulk inserts, INSERT ... ON CONFLICT) bypass the session and must call
+# invalidate_jobs() themselves.
+
+def invalidate_jobs(job_ids=()):
+    cache.invalidate([LISTING_TAG, *(job_tag(i) for i in job_ids)])
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changes(session, flush_context):
+    pending = session.info.setdefault('response_cache_tags', set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Job):
+            pending.update((LISTING_TAG, job_tag(obj.id)))
+        elif isinstance(obj, Application):
+            pending.update((LISTING_TAG, job_tag(obj.job_id)))
+        elif isinstance(obj, User) and obj not in session.new and _serialized_change(obj):
+            # Employer details are embedded in every one of their jobs.
+            pending.add(None)
+
+
+def _serialized_change(user):
+    state = inspect(user)
+    if state.deleted or state.was_deleted:
+        return True
+    return any(
+        state.attrs[key].history.has_changes()
+        for key in state.mapper.column_attrs.keys() if key not in ('password_hash', 'token_version', 'token_version_changed_at')
+    )
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_on_commit(session):
+    pending = session.info.pop('response_cache_tags', None)
+    if not pending:
+        return
+    if None in pending:
+        cache.clear()
+    else:
+        cache.invalidate(pending)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_on_rollback(session):
+    session.info.pop('response_cache_tags', None)
+
+
+def init_app(app):
+    cache.max_entries = app.config['RESPONSE_CACHE_MAX_ENTRIES']
+    cache.ttl = app.config['RESPONSE_CACHE_TTL']
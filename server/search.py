@@ -0,0 +1,155 @@
+import re
+import click
+from flask.cli import AppGroup
+from sqlalchemy import select, func, literal_column, inspect, text, table, column
+from config import db
+from models import Job
+
+# ==========================================================
+# FULL-TEXT JOB SEARCH
+# ==========================================================
+# SQLite: an external-content FTS5 table (`jobs_fts`) kept in sync with `jobs`
+#         by triggers, ranked with bm25().
+# PostgreSQL: a generated `search_vector` tsvector column with a GIN index,
+#         ranked with ts_rank_cd().
+# Anything else (or a database that has not been migrated yet) falls back to
+# ILIKE over the same columns so the `keyword` filter keeps working.
+
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+        title, company, description,
+        content='jobs', content_rowid='id', tokenize='porter unicode61')""",
+    """CREATE TRIGGER IF NOT EXISTS jobs_fts_ai AFTER INSERT ON jobs BEGIN
+        INSERT INTO jobs_fts(rowid, title, company, description)
+        VALUES (new.id, new.title, new.company, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS jobs_fts_ad AFTER DELETE ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, company, description)
+        VALUES ('delete', old.id, old.title, old.company, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS jobs_fts_au AFTER UPDATE OF title, company, description ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, company, description)
+        VALUES ('delete', old.id, old.title, old.company, old.description);
+        INSERT INTO jobs_fts(rowid, title, company, description)
+        VALUES (new.id, new.title, new.company, new.description);
+    END""",
+]
+
+POSTGRES_DDL = [
+    """ALTER TABLE jobs ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(company, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'C')
+        ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_search_vector ON jobs USING GIN (search_vector)",
+]
+
+# bm25() column weights for title, company, description
+SQLITE_WEIGHTS = (10.0, 5.0, 1.0)
+
+jobs_fts = table('jobs_fts', column('rowid'))
+
+_backend_cache = {}
+
+
+def search_backend():
+    engine = db.engine
+    if engine.url not in _backend_cache:
+        _backend_cache[engine.url] = _detect_backend(engine)
+    return _backend_cache[engine.url]
+
+
+def _detect_backend(engine):
+    inspector = inspect(engine)
+    if engine.dialect.name == 'sqlite' and inspector.has_table('jobs_fts'):
+        return 'fts5'
+    if engine.dialect.name == 'postgresql':
+        columns = {c['name'] for c in inspector.get_columns('jobs')}
+        if 'search_vector' in columns:
+            return 'tsvector'
+    return None
+
+
+class KeywordError(ValueError):
+    pass
+
+
+def _terms(keyword):
+    return re.findall(r'\w+', keyword)
+
+
+def keyword_filter(query, keyword):
+    """Restricts a Job query to `keyword` matches.
+
+    Returns (query, rank) where `rank` sorts best matches first in ascending
+    order, or None when only the ILIKE fallback is available. Raises
+    KeywordError when `keyword` has no word to search for.
+    """
+    terms = _terms(keyword)
+    if not terms:
+        raise KeywordError("keyword must contain a letter or digit")
+
+    backend = search_backend()
+    if backend == 'fts5':
+        match = ' '.join('"%s"*' % t for t in terms)
+        hits = (
+            select(
+                jobs_fts.c.rowid.label('job_id'),
+                func.bm25(literal_column('jobs_fts'), *SQLITE_WEIGHTS).label('rank'),
+            )
+            .where(literal_column('jobs_fts').op('MATCH')(match))
+            .subquery()
+        )
+        return query.join(hits, hits.c.job_id == Job.id), hits.c.rank
+
+    if backend == 'tsvector':
+        vector = literal_column('jobs.search_vector')
+        tsquery = func.to_tsquery('english', ' & '.join('%s:*' % t for t in terms))
+        query = query.filter(vector.op('@@')(tsquery))
+        return query, -func.ts_rank_cd(vector, tsquery)
+
+    pattern = f'%{keyword}%'
+    query = query.filter(
+        Job.title.ilike(pattern) | Job.company.ilike(pattern) | Job.description.ilike(pattern)
+    )
+    return query, None
+
+
+def ensure_search_index(connection):
+    if connection.dialect.name == 'sqlite':
+        statements = SQLITE_DDL
+    elif connection.dialect.name == 'postgresql':
+        statements = POSTGRES_DDL
+    else:
+        return
+    for statement in statements:
+        connection.execute(text(statement))
+
+
+def rebuild_search_index():
+    with db.engine.begin() as connection:
+        ensure_search_index(connection)
+        if connection.dialect.name == 'sqlite':
+            connection.execute(text("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')"))
+            connection.execute(text("INSERT INTO jobs_fts(jobs_fts) VALUES ('optimize')"))
+        elif connection.dialect.name == 'postgresql':
+            connection.execute(text("REINDEX INDEX ix_jobs_search_vector"))
+    _backend_cache.clear()
+
+
+# ==========================================================
+# CLI: flask search rebuild
+# ==========================================================
+search_cli = AppGroup('search', help='Manage the job full-text search index.')
+
+
+@search_cli.command('rebuild')
+def rebuild_command():
+    """Create the search index if missing and rebuild it from the jobs table."""
+    rebuild_search_index()
+    click.echo(f"Search index rebuilt ({search_backend() or 'no full-text backend'}).")
+
+
+def init_app(app):
+    app.cli.add_command(search_cli)
@@ -1,78 +1,301 @@
-from config import app, db, bcrypt
-from models import User, Job, Application
+import argparse
+import math
+import os
+import random
+import re
+import shutil
+import time
+from datetime import datetime, timedelta
+from config import db, bcrypt
+from app import create_app
+from models import (User, Job, Application, ApplicationStatusEvent, JobApplicationCount, SavedSearch, Notification,
+                    Resume, ResumeText, ContactMessage)
+import application_counts
+import cv_storage
+import recommendations
+import geo
 
-def run_seed():
+# ==========================================================
+# 0. DEMO FIXTURES
+# ==========================================================
+DEMO_JOBS = [
+    {
+        "title": "Junior Software Developer",
+        "company": "Bausch, Schuppe and Schmit Co",
+        "location": "New York, USA",
+        "category": "Technology",
+        "salary_max": 60000,
+        "description": "Work on cutting-edge systems for guest management."
+    },
+    {
+        "title": "Social Media Manager",
+        "company": "Knoeck - Becker Co",
+        "location": "Los Angeles, USA",
+        "category": "Marketing",
+        "salary_max": 52000,
+        "description": "Drive engagement and manage digital presence."
+    },
+    {
+        "title": "Internal Integration Planner",
+        "company": "Hirst, Quigley and Feest Inc",
+        "location": "Texas, USA",
+        "category": "Design",
+        "salary_max": 150000,
+        "description": "Oversee large-scale infrastructure integration."
+    },
+    {
+        "title": "District Intranet Director",
+        "company": "VonRueden - Weber Co",
+        "location": "Florida, USA",
+        "category": "Technology",
+        "salary_max": 140000,
+        "description": "Lead digital communication strategies."
+    }
+]
+
+# ==========================================================
+# 1. SYNTHETIC DATA DISTRIBUTIONS
+# ==========================================================
+# (value, weight) pairs; weights are relative.
+CATEGORIES = [
+    ("Technology", 30), ("Marketing", 12), ("Design", 8), ("Finance", 10), ("Sales", 14),
+    ("Healthcare", 9), ("Education", 6), ("Operations", 7), ("Customer Service", 4),
+]
+
+# Median salary per category; individual salaries are log-normal around it.
+MEDIAN_SALARY = {
+    "Technology": 95000, "Marketing": 62000, "Design": 70000, "Finance": 85000, "Sales": 58000,
+    "Healthcare": 75000, "Education": 48000, "Operations": 60000, "Customer Service": 40000,
+}
+
+ROLES = {
+    "Technology": ["Software Engineer", "Data Engineer", "DevOps Engineer", "QA Analyst", "Frontend Developer", "Backend Developer"],
+    "Marketing": ["Social Media Manager", "Content Strategist", "SEO Specialist", "Brand Manager"],
+    "Design": ["Product Designer", "UX Researcher", "Graphic Designer", "Design Lead"],
+    "Finance": ["Accountant", "Financial Analyst", "Auditor", "Controller"],
+    "Sales": ["Account Executive", "Sales Representative", "Business Development Manager"],
+    "Healthcare": ["Registered Nurse", "Medical Assistant", "Pharmacist", "Clinical Coordinator"],
+    "Education": ["Teacher", "Curriculum Designer", "Tutor", "Academic Advisor"],
+    "Operations": ["Operations Manager", "Logistics Coordinator", "Project Manager"],
+    "Customer Service": ["Support Specialist", "Call Centre Agent", "Customer Success Manager"],
+}
+
+SENIORITY = [("Junior", 25), ("", 40), ("Senior", 25), ("Lead", 7), ("Principal", 3)]
+
+# Job locations follow a long tail: a few big hubs take most postings.
+LOCATIONS = [
+    "New York, USA", "San Francisco, USA", "London, UK", "Nairobi, Kenya", "Los Angeles, USA",
+    "Berlin, Germany", "Toronto, Canada", "Lagos, Nigeria", "Austin, USA", "Chicago, USA",
+    "Amsterdam, Netherlands", "Bangalore, India", "Sydney, Australia", "Seattle, USA",
+    "Cape Town, South Africa", "Paris, France", "Dublin, Ireland", "Singapore, Singapore",
+    "Boston, USA", "Kigali, Rwanda", "Florida, USA", "Texas, USA", "Remote", "Mombasa, Kenya",
+]
+LOCATION_WEIGHTS = [1 / (rank + 1) for rank in range(len(LOCATIONS))]
+
+JOB_TYPES = [("Full-time", 70), ("Part-time", 10), ("Contract", 15), ("Internship", 5)]
+
+APPLICATION_STATUSES = [("Pending", 65), ("Interviewing", 12), ("Accepted", 5), ("Rejected", 18)]
+
+COMPANY_WORDS = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Tyrell",
+                 "Cyberdyne", "Soylent", "Vandelay", "Wonka", "Gringotts", "Aperture", "Oscorp"]
+COMPANY_SUFFIXES = ["Inc", "Co", "Ltd", "Group", "Labs", "Partners"]
+
+SKILLS = ["python", "sql", "react", "excel", "communication", "leadership", "negotiation",
+          "figma", "kubernetes", "budgeting", "analytics", "writing", "customer care", "aws"]
+
+EMPLOYER_SHARE = 0.1  # fraction of synthetic users that are employers
+HISTORY_DAYS = 365
+
+
+def _picker(pairs):
+    values = [v for v, _ in pairs]
+    cumulative = []
+    total = 0
+    for _, weight in pairs:
+        total += weight
+        cumulative.append(total)
+    return values, cumulative
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _bulk_insert(table, rows, chunk_size, label):
+    inserted = 0
+    for chunk in _chunks(rows, chunk_size):
+        db.session.execute(table.insert(), chunk)
+        db.session.commit()
+        inserted += len(chunk)
+        print(f"   ... {inserted:,} {label}", end="\r", flush=True)
+    print(f"   ... {inserted:,} {label}")
+    return inserted
+
+
+def _next_id(model):
+    return (db.session.query(db.func.max(model.id)).scalar() or 0) + 1
+
+
+def _clear_cv_blobs():
+    # The reset leaves every stored CV unreferenced. Only the <aa>/ blob
+    # directories are removed, not whatever else shares CV_STORAGE_DIR.
+    root = cv_storage.storage_root()
+    if not os.path.isdir(root):
+        return
+    for name in os.listdir(root):
+        if re.fullmatch(r'[0-9a-f]{2}', name):
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+def _sync_sequence(table):
+    # Rows inserted with explicit ids don't advance a PostgreSQL serial, so
+    # the next app-level insert would reuse one of them.
+    if db.session.get_bind().dialect.name == 'postgresql':
+        db.session.execute(db.text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"(SELECT COALESCE(MAX(id), 1) FROM {table.name}))"
+        ))
+        db.session.commit()
+
+
+def _employer_count(users):
+    return max(1, int(users * EMPLOYER_SHARE)) if users else 0
+
+
+def generate_users(rng, count, pw_hash, first_id, now):
+    employers = _employer_count(count)
+    for n in range(count):
+        user_id = first_id + n
+        is_employer = n < employers
+        kind = "employer" if is_employer else "seeker"
+        yield {
+            "id": user_id,
+            "username": f"{kind}{user_id}",
+            "email": f"{kind}{user_id}@example.com",
+            "password_hash": pw_hash,
+            "role": "employer" if is_employer else "job_seeker",
+            "full_name": f"{kind.title()} {user_id}",
+            "company_name": f"{rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_SUFFIXES)}" if is_employer else None,
+            "created_at": now - timedelta(days=rng.random() * HISTORY_DAYS),
+        }
+
+
+def generate_jobs(rng, count, employer_ids, first_id, now):
+    categories, category_cum = _picker(CATEGORIES)
+    seniority, seniority_cum = _picker(SENIORITY)
+    job_types, job_type_cum = _picker(JOB_TYPES)
+    seniority_bump = {"Junior": 0.7, "": 1.0, "Senior": 1.3, "Lead": 1.5, "Principal": 1.8}
+
+    for n in range(count):
+        category = rng.choices(categories, cum_weights=category_cum)[0]
+        level = rng.choices(seniority, cum_weights=seniority_cum)[0]
+        role = rng.choice(ROLES[category])
+        median = MEDIAN_SALARY[category] * seniority_bump[level]
+        salary = int(round(rng.lognormvariate(math.log(median), 0.25), -3))
+        skills = rng.sample(SKILLS, 3)
+        company = f"{rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_SUFFIXES)}"
+        location = rng.choices(LOCATIONS, weights=LOCATION_WEIGHTS)[0]
+        yield {
+            "id": first_id + n,
+            "title": f"{level} {role}".strip(),
+            "company": company,
+            "location": location,
+            "category": category,
+            "salary_max": salary,
+            "job_type": rng.choices(job_types, cum_weights=job_type_cum)[0],
+            "description": (
+                f"{company} is hiring a {role.lower()} to join our {category.lower()} team. "
+                f"You will work with {skills[0]}, {skills[1]} and {skills[2]}."
+            ),
+            **geo.location_columns(location),
+            "employer_id": rng.choice(employer_ids),
+            # Skewed towards recent postings, like a live board.
+            "created_at": now - timedelta(days=HISTORY_DAYS * rng.random() ** 2),
+        }
+
+
+def generate_applications(rng, count, seeker_ids, job_ids, now):
+    # Seekers get uneven quotas (a few apply everywhere, most apply a little)
+    # and popular jobs attract most applicants: jobs are drawn through a power
+    # law over their position. A seeker never applies to the same job twice.
+    statuses, status_cum = _picker(APPLICATION_STATUSES)
+    if not seeker_ids or not job_ids:
+        return
+    count = min(count, len(seeker_ids) * len(job_ids))
+    weights = [rng.expovariate(1.0) for _ in seeker_ids]
+    scale = count / sum(weights)
+    quotas = [min(len(job_ids), int(w * scale)) for w in weights]
+    shortfall = count - sum(quotas)
+    while shortfall > 0:
+        for i in range(len(quotas)):
+            if shortfall and quotas[i] < len(job_ids):
+                quotas[i] += 1
+                shortfall -= 1
+
+    for seeker_id, quota in zip(seeker_ids, quotas):
+        if quota * 2 > len(job_ids):
+            chosen = rng.sample(job_ids, quota)
+        else:
+            chosen = set()
+            while len(chosen) < quota:
+                chosen.add(job_ids[int(len(job_ids) * rng.random() ** 3)])
+        for job_id in chosen:
+            yield {
+                "job_id": job_id,
+                "seeker_id": seeker_id,
+                "status": rng.choices(statuses, cum_weights=status_cum)[0],
+                "resume_url": f"https://example.com/cv/{seeker_id}.pdf",
+                "applied_at": now - timedelta(days=rng.random() * 60),
+            }
+
+
+# ==========================================================
+# 2. SEED
+# ==========================================================
+
+def run_seed(users=0, jobs=0, applications=0, seed=42, chunk_size=5000):
+    app = create_app()
     with app.app_context():
         print("🚀 Starting seed process...")
+        started = time.perf_counter()
 
         try:
             print("🗑️ Deleting existing data...")
             # Delete in order of dependency
+            ApplicationStatusEvent.query.delete()
+            Notification.query.delete()
+            SavedSearch.query.delete()
+            JobApplicationCount.query.delete()
             Application.query.delete()
             Job.query.delete()
+            ResumeText.query.delete()
+            Resume.query.delete()
+            ContactMessage.query.delete()
             User.query.delete()
             db.session.commit()
+            _clear_cv_blobs()
 
             print("👤 Creating users...")
+            # bcrypt is slow on purpose; every generated user shares one hash.
             pw_hash = bcrypt.generate_password_hash('password123').decode('utf-8')
-            
+
             # Default users for testing
             employer = User(username="Jane Recruiter", email="jane@techcorp.com", password_hash=pw_hash, role="employer")
             seeker = User(username="John Doe", email="john@moringa.com", password_hash=pw_hash, role="job_seeker")
-            
+
             db.session.add_all([employer, seeker])
             db.session.commit() # Commit to get IDs for foreign keys
 
             print("💼 Creating Figma-style jobs...")
-            jobs_data = [
-                {
-                    "title": "Junior Software Developer",
-                    "company": "Bausch, Schuppe and Schmit Co",
-                    "location": "New York, USA",
-                    "category": "Technology",
-                    "salary_max": 60000,
-                    "description": "Work on cutting-edge systems for guest management."
-                },
-                {
-                    "title": "Social Media Manager",
-                    "company": "Knoeck - Becker Co",
-                    "location": "Los Angeles, USA",
-                    "category": "Marketing",
-                    "salary_max": 52000,
-                    "description": "Drive engagement and manage digital presence."
-                },
-                {
-                    "title": "Internal Integration Planner",
-                    "company": "Hirst, Quigley and Feest Inc",
-                    "location": "Texas, USA",
-                    "category": "Design",
-                    "salary_max": 150000,
-                    "description": "Oversee large-scale infrastructure integration."
-                },
-                {
-                    "title": "District Intranet Director",
-                    "company": "VonRueden - Weber Co",
-                    "location": "Florida, USA",
-                    "category": "Technology",
-                    "salary_max": 140000,
-                    "description": "Lead digital communication strategies."
-                }
-            ]
-
-            created_jobs = []
-            for data in jobs_data:
-                job = Job(
-                    title=data["title"],
-                    company=data["company"],
-                    location=data["location"],
-                    category=data["category"],
-                    salary_max=data["salary_max"],
-                    description=data["description"],
-                    employer_id=employer.id
-                )
-                db.session.add(job)
-                created_jobs.append(job)
-            
+            created_jobs = [Job(employer_id=employer.id, **data) for data in DEMO_JOBS]
+            db.session.add_all(created_jobs)
             db.session.commit()
 
             print("📝 Creating sample applications...")
@@ -86,13 +309,62 @@ def run_seed():
             db.session.add(sample_app)
             db.session.commit()
 
-            print("✨ Seeding complete! Login info:")
+            if users or jobs or applications:
+                seed_synthetic(users, jobs, applications, seed, chunk_size, pw_hash, employer.id, seeker.id)
+
+            if recommendations.available():
+                print("🧭 Building the recommendation model...")
+                recommendations.build(recommendations.model_root(app), chunk_size)
+
+            print(f"✨ Seeding complete in {time.perf_counter() - started:.1f}s! Login info:")
             print("   Employer: jane@techcorp.com | password123")
             print("   Seeker:   john@moringa.com | password123")
-            
+            if users:
+                print("   Generated users: employer<id>@example.com / seeker<id>@example.com | password123")
+
         except Exception as e:
             print(f"❌ Error during seeding: {e}")
             db.session.rollback()
 
+
+def seed_synthetic(users, jobs, applications, seed, chunk_size, pw_hash, demo_employer_id, demo_seeker_id):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+
+    print(f"🏭 Generating {users:,} users, {jobs:,} jobs, {applications:,} applications (seed={seed})...")
+    first_user = _next_id(User)
+    _bulk_insert(User.__table__, generate_users(rng, users, pw_hash, first_user, now), chunk_size, "users")
+    _sync_sequence(User.__table__)
+
+    employers = _employer_count(users)
+    employer_ids = [demo_employer_id] + list(range(first_user, first_user + employers))
+    seeker_ids = [demo_seeker_id] + list(range(first_user + employers, first_user + users))
+
+    first_job = _next_id(Job)
+    _bulk_insert(Job.__table__, generate_jobs(rng, jobs, employer_ids, first_job, now), chunk_size, "jobs")
+    _sync_sequence(Job.__table__)
+    job_ids = list(range(first_job, first_job + jobs))
+
+    _bulk_insert(Application.__table__, generate_applications(rng, applications, seeker_ids, job_ids, now),
+                 chunk_size, "applications")
+
+    # The bulk inserts bypass the ORM, so count applications in one pass.
+    application_counts.refresh(db.session.connection())
+    db.session.commit()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Reset the database to the demo fixtures, optionally adding synthetic load-test data."
+    )
+    parser.add_argument('--users', type=int, default=0, help="synthetic users to generate (10%% employers)")
+    parser.add_argument('--jobs', type=int, default=0, help="synthetic jobs to generate")
+    parser.add_argument('--applications', type=int, default=0, help="synthetic applications to generate")
+    parser.add_argument('--seed', type=int, default=42, help="RNG seed; the same seed gives the same data")
+    parser.add_argument('--chunk-size', type=int, default=5000, help="rows per INSERT batch")
+    return parser.parse_args()
+
+
 if __name__ == '__main__':
-    run_seed()
\ No newline at end of file
+    args = parse_args()
+    run_seed(args.users, args.jobs, args.applications, args.seed, args.chunk_size)
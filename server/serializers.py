@@ -0,0 +1,156 @@
+from datetime import datetime
+from functools import lru_cache
+from flask import current_app
+from sqlalchemy import inspect
+from sqlalchemy_serializer.lib.schema import Schema
+from models import User, Job, Application, SavedSearch
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder Flask uses
+    orjson = None
+
+# ==========================================================
+# COMPILED SERIALIZERS
+# ==========================================================
+# SerializerMixin.to_dict() re-walks the serialize_rules tree for every row it
+# serializes. The rules only depend on the model classes, so we walk them once
+# here (with sqlalchemy_serializer's own Schema, so the merge semantics are
+# identical) and generate one flat function per model that just reads
+# attributes. The output dicts are equal to to_dict()'s.
+
+MAX_DEPTH = 8
+
+
+class UnknownFieldError(ValueError):
+    pass
+
+
+def _format_datetime(value, fmt):
+    return None if value is None else value.strftime(fmt)
+
+
+def _compile_node(cls, schema, lines, helpers, indent, target, depth):
+    # Mirrors Serializer.serialize_model for a class instead of an instance.
+    schema.update(only=cls.serialize_only, extend=cls.serialize_rules)
+    mapper = inspect(cls)
+    keys = schema.keys
+    if schema.is_greedy:
+        keys.update(cls.serializable_keys or {a.key for a in mapper.attrs})
+
+    pad = '    ' * indent
+    lines.append(f"{pad}{target} = {{}}")
+    for key in sorted(keys):
+        if not schema.is_included(key):
+            continue
+        if key in mapper.relationships:
+            rel = mapper.relationships[key]
+            child = schema.fork(key)
+            item = f"_r{depth}"
+            if depth >= MAX_DEPTH:
+                raise RecursionError(f"serialize_rules for {cls.__name__}.{key} nest too deeply to compile")
+            if rel.uselist:
+                lines.append(f"{pad}_l{depth} = []")
+                lines.append(f"{pad}for {item} in {_obj(depth)}.{key}:")
+                _compile_child(rel.mapper.class_, child, lines, helpers, indent + 1, item, depth + 1)
+                lines.append(f"{pad}    _l{depth}.append(_d{depth + 1})")
+                lines.append(f"{pad}{target}[{key!r}] = _l{depth}")
+            else:
+                lines.append(f"{pad}{item} = {_obj(depth)}.{key}")
+                lines.append(f"{pad}if {item} is None:")
+                lines.append(f"{pad}    {target}[{key!r}] = None")
+                lines.append(f"{pad}else:")
+                _compile_child(rel.mapper.class_, child, lines, helpers, indent + 1, item, depth + 1)
+                lines.append(f"{pad}    {target}[{key!r}] = _d{depth + 1}")
+        elif _is_datetime(mapper, key):
+            helpers['_dt_fmt'] = cls.datetime_format
+            lines.append(f"{pad}{target}[{key!r}] = _format_datetime({_obj(depth)}.{key}, _dt_fmt)")
+        else:
+            lines.append(f"{pad}{target}[{key!r}] = {_obj(depth)}.{key}")
+
+
+def _compile_child(cls, schema, lines, helpers, indent, item, depth):
+    pad = '    ' * indent
+    lines.append(f"{pad}_o{depth} = {item}")
+    _compile_node(cls, schema, lines, helpers, indent, f"_d{depth}", depth)
+
+
+def _obj(depth):
+    return f"_o{depth}"
+
+
+def _is_datetime(mapper, key):
+    column = mapper.columns.get(key)
+    try:
+        return column is not None and column.type.python_type is datetime
+    except NotImplementedError:
+        return False
+
+
+def compile_serializer(cls, only=()):
+    schema = Schema()
+    schema.update(only=only)
+    lines = []
+    helpers = {'_format_datetime': _format_datetime}
+    _compile_node(cls, schema, lines, helpers, 1, '_d0', 0)
+    source = f"def serialize_{cls.__tablename__}(_o0):\n" + '\n'.join(lines) + "\n    return _d0\n"
+    namespace = dict(helpers)
+    exec(compile(source, f"<serializer {cls.__name__}>", 'exec'), namespace)
+    return namespace[f"serialize_{cls.__tablename__}"]
+
+
+SERIALIZERS = {cls: compile_serializer(cls) for cls in (User, Job, Application, SavedSearch)}
+
+
+@lru_cache(maxsize=256)
+def _projected(cls, fields):
+    return compile_serializer(cls, only=fields)
+
+
+def parse_fields(cls, raw):
+    # ?fields=id,title,company -> a validated, canonical tuple (or None)
+    if not raw:
+        return None
+    fields = tuple(sorted({f.strip() for f in raw.split(',') if f.strip()}))
+    allowed = set(cls.serializable_keys or {a.key for a in inspect(cls).attrs}) - _excluded(cls)
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise UnknownFieldError(f"Unknown field(s): {', '.join(unknown)}")
+    return fields or None
+
+
+def _excluded(cls):
+    return {rule[1:] for rule in cls.serialize_rules if rule.startswith('-') and '.' not in rule}
+
+
+def serializer_for(cls, fields=None):
+    if fields:
+        return _projected(cls, fields)
+    return SERIALIZERS[cls]
+
+
+def serialize(obj, fields=None):
+    return serializer_for(type(obj), fields)(obj)
+
+
+# ==========================================================
+# JSON RESPONSES
+# ==========================================================
+
+def json_response(payload, status=200):
+    """Same bytes as jsonify(payload), encoded with orjson when available."""
+    provider = current_app.json
+    if orjson is None or not (provider.sort_keys and provider.ensure_ascii):
+        return provider.response(payload), status
+
+    option = orjson.OPT_SORT_KEYS
+    if (provider.compact is None and current_app.debug) or provider.compact is False:
+        option |= orjson.OPT_INDENT_2
+    try:
+        body = orjson.dumps(payload, option=option)
+    except TypeError:
+        return provider.response(payload), status
+    # orjson writes raw UTF-8; Flask escapes non-ASCII, so defer to it there.
+    if not body.isascii():
+        return provider.response(payload), status
+    return current_app.response_class(body + b"\n", mimetype=provider.mimetype), status
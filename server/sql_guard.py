@@ -0,0 +1,57 @@
+import logging
+from functools import wraps
+from flask import g, request, current_app, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# ==========================================================
+# SQL STATEMENT BUDGETS (N+1 GUARD)
+# ==========================================================
+# Counts the statements each request sends to the database. Routes declare a
+# budget with @query_budget(n); going over it logs a warning, and fails the
+# request outright when SQL_QUERY_BUDGET_ENFORCE is set or the app is in
+# TESTING mode, so an N+1 regression shows up as a failing request in tests.
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.sql_statements = g.get('sql_statements', 0) + 1
+
+
+def query_budget(limit, **per_method):
+    """Declare the max statements a view may run, optionally per HTTP method."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            g.sql_budget = per_method.get(request.method, limit)
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def statement_count():
+    return g.get('sql_statements', 0)
+
+
+def _check_budget(response):
+    budget = g.get('sql_budget')
+    used = statement_count()
+    if budget is None or used <= budget:
+        return response
+
+    message = f"{request.method} {request.path} ran {used} SQL statements (budget {budget})"
+    if current_app.config['SQL_QUERY_BUDGET_ENFORCE'] or current_app.testing:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+    return response
+
+
+def init_app(app):
+    app.after_request(_check_budget)
@@ -0,0 +1,25 @@
+"""Production entry point.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+With preload_app (the default in gunicorn.conf.py) this module is imported
+once, in the gunicorn master: every module is loaded, the engines are
+created and warm_up() runs there, and the workers are forked from that
+state. Each worker then opens its own database connections (post_fork).
+"""
+import logging
+import time
+
+_started = time.perf_counter()
+
+from app import create_app, warm_up, startup_timings  # noqa: E402
+
+logger = logging.getLogger('wsgi')
+
+startup_timings['import'] = time.perf_counter() - _started
+app = create_app()
+if app.config['WARM_UP_ON_START']:
+    warm_up(app)
+startup_timings['total'] = time.perf_counter() - _started
+logger.info("App ready in %.0f ms (%s)", startup_timings['total'] * 1000,
+               ', '.join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in startup_timings.items() if name != 'total'))